@@ -0,0 +1,125 @@
+"""
+Micro-benchmark of the hourly forecast aggregation in
+``mcpagentai.tools.weather_aggregate`` against the row-wise approach it
+replaces: one dict per hour, grouped by day and aggregated in Python loops.
+
+Both paths compute the same summary from the same synthetic Open-Meteo
+payload (per-day min/max/mean, peak rolling-window mean and threshold
+crossings for every variable); the check at start-up asserts they agree.
+
+    PYTHONPATH=src python -m benchmarks.aggregate --days 16 --window 3
+"""
+
+import argparse
+import math
+import random
+import timeit
+from typing import Optional
+
+from mcpagentai.tools import weather_aggregate as agg
+
+VARIABLES = ["temperature_2m", "precipitation", "precipitation_probability", "wind_speed_10m"]
+
+
+def make_payload(days: int, missing: float, seed: int = 1) -> dict:
+    """
+    An Open-Meteo "hourly" block of ``days`` days; ``missing`` is the share
+    of values returned as null.
+    """
+    rnd = random.Random(seed)
+    hours = days * 24
+    hourly: dict[str, list] = {
+        "time": [f"2025-01-{1 + h // 24:02d}T{h % 24:02d}:00" for h in range(hours)],
+    }
+    for name in VARIABLES:
+        hourly[name] = [None if rnd.random() < missing else round(rnd.uniform(0, 20), 1) for _ in range(hours)]
+    return {"hourly": hourly}
+
+
+def columnar(payload: dict, window: int, threshold: float) -> dict:
+    block = payload["hourly"]
+    times = block["time"]
+    dates, bounds = agg.day_bounds(times)
+    summary = {}
+    for name in VARIABLES:
+        column = agg.to_column(block[name])
+        mins, maxs, means = agg.daily_stats(column, bounds)
+        index, value = agg.peak(agg.rolling_mean(column, window))
+        hours, crossings = agg.threshold_crossings(column, threshold)
+        summary[name] = (list(mins), list(maxs), list(means), index, value, hours, crossings)
+    return summary
+
+
+def row_wise(payload: dict, window: int, threshold: float) -> dict:
+    block = payload["hourly"]
+    rows = [
+        {"time": stamp, **{name: block[name][i] for name in VARIABLES}}
+        for i, stamp in enumerate(block["time"])
+    ]
+    days: dict[str, list[dict]] = {}
+    for row in rows:
+        days.setdefault(row["time"][:10], []).append(row)
+
+    summary = {}
+    for name in VARIABLES:
+        mins, maxs, means = [], [], []
+        for day_rows in days.values():
+            values = [row[name] for row in day_rows if row[name] is not None]
+            mins.append(min(values) if values else math.nan)
+            maxs.append(max(values) if values else math.nan)
+            means.append(math.fsum(values) / len(values) if values else math.nan)
+
+        best_index: Optional[int] = None
+        best = math.nan
+        for start in range(len(rows) - window + 1):
+            values = [row[name] for row in rows[start:start + window] if row[name] is not None]
+            if values:
+                mean = sum(values) / len(values)
+                if best_index is None or mean > best:
+                    best_index, best = start, mean
+
+        hours, crossings, before = 0, [], False
+        for index, row in enumerate(rows):
+            now = row[name] is not None and row[name] >= threshold
+            hours += now
+            if now and not before:
+                crossings.append(index)
+            before = now
+        summary[name] = (mins, maxs, means, best_index, best, hours, crossings)
+    return summary
+
+
+def _agree(a: dict, b: dict) -> bool:
+    def close(x, y):
+        if isinstance(x, list):
+            return len(x) == len(y) and all(close(i, j) for i, j in zip(x, y))
+        if isinstance(x, float) and isinstance(y, float):
+            return (math.isnan(x) and math.isnan(y)) or abs(x - y) < 1e-9
+        return x == y
+    return all(close(list(a[name]), list(b[name])) for name in VARIABLES)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark hourly forecast aggregation.")
+    parser.add_argument("--days", type=int, default=16, help="Forecast days (24 hours each)")
+    parser.add_argument("--window", type=int, default=3, help="Rolling window in hours")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Threshold for crossings")
+    parser.add_argument("--missing", type=float, default=0.0, help="Share of null values (0-1)")
+    parser.add_argument("--number", type=int, default=200, help="Calls per timing")
+    args = parser.parse_args()
+
+    payload = make_payload(args.days, args.missing)
+    if not _agree(columnar(payload, args.window, args.threshold), row_wise(payload, args.window, args.threshold)):
+        raise SystemExit("columnar and row-wise results differ")
+
+    timings = {}
+    for label, fn in (("row-wise", row_wise), ("columnar", columnar)):
+        best = min(timeit.repeat(lambda: fn(payload, args.window, args.threshold), number=args.number, repeat=5))
+        timings[label] = best / args.number * 1000
+        print(f"{label:10} {timings[label]:8.3f} ms per forecast")
+    print(f"speedup    {timings['row-wise'] / timings['columnar']:8.2f}x "
+          f"({args.days} days, {len(VARIABLES)} variables, window {args.window} h, missing {args.missing:.0%})")
+
+
+if __name__ == "__main__":
+    main()
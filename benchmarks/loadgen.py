@@ -0,0 +1,367 @@
+"""
+End-to-end load generator for the MCP server over stdio.
+
+Starts the server (the ``mcpagentai`` entry point, i.e. ``main:main``) as a
+subprocess and drives it through the MCP client protocol, so the numbers
+include the server's JSON-RPC framing, serialization and dispatch rather
+than just agent code. Requests are drawn from a weighted mix of
+``list_tools`` and ``call_tool`` operations, either closed-loop (a fixed
+number of concurrent workers) or open-loop (a target arrival rate, with
+latency measured from the scheduled send time so queueing is not hidden).
+
+Reports throughput, latency percentiles per operation, error rates and the
+server's RSS over time, and writes them as JSON.
+
+    PYTHONPATH=src python -m benchmarks.loadgen --stubs --latency-ms 20 \\
+        --mix list_tools:1,get_crypto_price:5,get_current_weather:5 \\
+        --concurrency 16 --duration 30
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from benchmarks.run import RESULTS_DIR, SCENARIOS
+from benchmarks.stub_upstreams import StubUpstreams
+
+DEFAULT_MIX = "list_tools:1,get_current_time:2,calculate_expression:2,get_current_weather:4,get_crypto_price:4"
+DEFAULT_AGENTS = "time,calculator,weather,crypto,stock,currency,eliza"
+
+TOOL_ARGUMENTS: dict[str, Callable[[int], dict]] = {s.tool: s.arguments for s in SCENARIOS}
+
+
+@dataclass(frozen=True)
+class Operation:
+    name: str
+    weight: float
+
+    @property
+    def is_list_tools(self) -> bool:
+        return self.name == "list_tools"
+
+
+@dataclass
+class Sample:
+    operation: str
+    sent_at: float
+    latency: float
+    error: Optional[str]
+
+
+@dataclass
+class LoadState:
+    samples: list[Sample] = field(default_factory=list)
+    rss: list[tuple[float, int]] = field(default_factory=list)
+    counter: int = 0
+
+
+def parse_mix(spec: str) -> list[Operation]:
+    operations = []
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition(":")
+        if name != "list_tools" and name not in TOOL_ARGUMENTS:
+            raise SystemExit(
+                f"Unknown operation '{name}'. Known: list_tools, {', '.join(sorted(TOOL_ARGUMENTS))}"
+            )
+        operations.append(Operation(name, float(weight or 1)))
+    return operations
+
+
+# -------------------------------------------------------------------------
+# Server process
+# -------------------------------------------------------------------------
+
+def server_command(args: argparse.Namespace) -> list[str]:
+    if args.server_cmd:
+        return args.server_cmd.split()
+    entry_point = shutil.which("mcpagentai")
+    if entry_point:
+        return [entry_point]
+    return [sys.executable, "-c", "from mcpagentai.main import main; main()"]
+
+
+def server_env(args: argparse.Namespace, stubs: Optional[StubUpstreams]) -> dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("MCPAGENTAI_AGENTS", DEFAULT_AGENTS)
+    env["LOG_LEVEL"] = args.server_log_level
+    env["RUN_AGENT"] = "false"
+    if stubs is not None:
+        env.update(stubs.env())
+    if args.cache_ttls is not None:
+        env["CACHE_TTLS"] = args.cache_ttls
+    return env
+
+
+def child_pids() -> list[int]:
+    try:
+        output = subprocess.run(
+            ["pgrep", "-P", str(os.getpid())], capture_output=True, text=True, check=False
+        ).stdout
+    except OSError:
+        return []
+    return [int(pid) for pid in output.split()]
+
+
+def rss_kb(pid: int) -> Optional[int]:
+    status = Path(f"/proc/{pid}/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+        return None
+    try:
+        output = subprocess.run(["ps", "-o", "rss=", "-p", str(pid)], capture_output=True, text=True).stdout
+        return int(output.strip()) if output.strip() else None
+    except (OSError, ValueError):
+        return None
+
+
+# -------------------------------------------------------------------------
+# Load
+# -------------------------------------------------------------------------
+
+async def issue(session: ClientSession, operation: Operation, index: int) -> Optional[str]:
+    """
+    Send one request; return an error label, or None on success.
+    """
+    try:
+        if operation.is_list_tools:
+            await session.list_tools()
+            return None
+        result = await session.call_tool(operation.name, TOOL_ARGUMENTS[operation.name](index))
+        return "tool_error" if result.isError else None
+    except Exception as e:
+        return type(e).__name__
+
+
+async def closed_loop(session, operations, args, state: LoadState, deadline: float) -> None:
+    rng = random.Random(args.seed)
+    weights = [op.weight for op in operations]
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            operation = rng.choices(operations, weights)[0]
+            state.counter += 1
+            start = time.perf_counter()
+            error = await issue(session, operation, state.counter)
+            state.samples.append(Sample(operation.name, start, time.perf_counter() - start, error))
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+
+async def open_loop(session, operations, args, state: LoadState, deadline: float) -> None:
+    rng = random.Random(args.seed)
+    weights = [op.weight for op in operations]
+    outstanding = asyncio.Semaphore(args.max_outstanding)
+    tasks = set()
+
+    async def one(operation: Operation, scheduled: float, index: int) -> None:
+        async with outstanding:
+            error = await issue(session, operation, index)
+        # Latency from the scheduled send time, so a backed-up server shows up
+        # as latency instead of a silently lower request rate.
+        state.samples.append(Sample(operation.name, scheduled, time.perf_counter() - scheduled, error))
+
+    next_send = time.perf_counter()
+    while next_send < deadline:
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        state.counter += 1
+        task = asyncio.create_task(one(rng.choices(operations, weights)[0], next_send, state.counter))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        interval = 1.0 / args.rate
+        next_send += rng.expovariate(1.0 / interval) if args.poisson else interval
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+async def sample_rss(pids: list[int], state: LoadState, interval: float, begin: float) -> None:
+    while True:
+        total = sum(rss or 0 for rss in map(rss_kb, pids))
+        state.rss.append((round(time.perf_counter() - begin, 2), total))
+        await asyncio.sleep(interval)
+
+
+async def report_progress(state: LoadState, interval: float, begin: float) -> None:
+    seen = 0
+    while True:
+        await asyncio.sleep(interval)
+        window = state.samples[seen:]
+        seen += len(window)
+        errors = sum(1 for s in window if s.error)
+        latencies = sorted(s.latency for s in window)
+        p99 = latencies[int(0.99 * (len(latencies) - 1))] * 1000 if latencies else 0.0
+        rss = state.rss[-1][1] / 1024 if state.rss else 0.0
+        print(
+            f"[{time.perf_counter() - begin:7.1f}s] {len(window) / interval:9.1f} req/s  "
+            f"p99 {p99:8.2f} ms  errors {errors:<5} rss {rss:7.1f} MiB",
+            flush=True,
+        )
+
+
+async def run_load(args: argparse.Namespace, operations: list[Operation], stubs: Optional[StubUpstreams]) -> dict:
+    command = server_command(args)
+    params = StdioServerParameters(command=command[0], args=command[1:], env=server_env(args, stubs))
+    state = LoadState()
+
+    spawn_start = time.perf_counter()
+    async with stdio_client(params) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            startup_seconds = time.perf_counter() - spawn_start
+            pids = child_pids()
+
+            begin = time.perf_counter()
+            background = [asyncio.create_task(sample_rss(pids, state, args.rss_interval, begin))]
+            if args.report_interval > 0:
+                background.append(asyncio.create_task(report_progress(state, args.report_interval, begin)))
+
+            deadline = begin + args.warmup + args.duration
+            try:
+                if args.rate:
+                    await open_loop(session, operations, args, state, deadline)
+                else:
+                    await closed_loop(session, operations, args, state, deadline)
+            finally:
+                for task in background:
+                    task.cancel()
+            end = time.perf_counter()
+
+    measured = [s for s in state.samples if s.sent_at >= begin + args.warmup]
+    return build_report(args, measured, state.rss, end - begin - args.warmup, startup_seconds, pids)
+
+
+# -------------------------------------------------------------------------
+# Reporting
+# -------------------------------------------------------------------------
+
+def _stats(samples: list[Sample], seconds: float) -> dict[str, Any]:
+    latencies = sorted(s.latency for s in samples)
+    errors: dict[str, int] = {}
+    for s in samples:
+        if s.error:
+            errors[s.error] = errors.get(s.error, 0) + 1
+
+    def pct(q: float) -> float:
+        return round(latencies[min(int(round(q * (len(latencies) - 1))), len(latencies) - 1)] * 1000, 3) if latencies else 0.0
+
+    return {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / seconds, 2) if seconds > 0 else 0.0,
+        "error_rate": round(sum(errors.values()) / len(samples), 4) if samples else 0.0,
+        "errors": errors,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": pct(0.50),
+        "p90_ms": pct(0.90),
+        "p99_ms": pct(0.99),
+        "p999_ms": pct(0.999),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+
+def build_report(args, samples: list[Sample], rss: list[tuple[float, int]], seconds: float, startup_seconds: float, pids: list[int]) -> dict:
+    by_operation: dict[str, list[Sample]] = {}
+    for s in samples:
+        by_operation.setdefault(s.operation, []).append(s)
+    rss_values = [value for _, value in rss if value]
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "server_command": server_command(args),
+            "server_pids": pids,
+            "mode": "open" if args.rate else "closed",
+            "rate": args.rate,
+            "concurrency": None if args.rate else args.concurrency,
+            "mix": args.mix,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "stubs": args.stubs,
+            "latency_ms": args.latency_ms if args.stubs else None,
+        },
+        "startup_seconds": round(startup_seconds, 3),
+        "overall": _stats(samples, seconds),
+        "operations": {name: _stats(group, seconds) for name, group in sorted(by_operation.items())},
+        "rss": {
+            "start_kb": rss_values[0] if rss_values else None,
+            "end_kb": rss_values[-1] if rss_values else None,
+            "peak_kb": max(rss_values) if rss_values else None,
+            "series": [{"t": t, "kb": kb} for t, kb in rss],
+        },
+    }
+
+
+def print_report(report: dict) -> None:
+    overall = report["overall"]
+    print(
+        f"\nServer startup {report['startup_seconds'] * 1000:.0f} ms; "
+        f"{overall['requests']} requests, {overall['throughput_rps']:.1f} req/s, "
+        f"error rate {overall['error_rate'] * 100:.2f}%"
+    )
+    print(f"{'operation':28} {'req/s':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for name, stats in [("ALL", overall), *report["operations"].items()]:
+        print(
+            f"{name:28} {stats['throughput_rps']:9.1f} {stats['p50_ms']:9.2f} {stats['p90_ms']:9.2f} "
+            f"{stats['p99_ms']:9.2f} {stats['max_ms']:9.2f} {sum(stats['errors'].values()):7}"
+        )
+    rss = report["rss"]
+    if rss["peak_kb"]:
+        print(
+            f"Server RSS: start {rss['start_kb'] / 1024:.1f} MiB, end {rss['end_kb'] / 1024:.1f} MiB, "
+            f"peak {rss['peak_kb'] / 1024:.1f} MiB"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Drive the mcpagentai MCP server over stdio.")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted operations, e.g. list_tools:1,get_crypto_price:5")
+    parser.add_argument("--concurrency", type=int, default=8, help="Closed-loop workers (ignored with --rate)")
+    parser.add_argument("--rate", type=float, help="Open-loop target request rate per second")
+    parser.add_argument("--poisson", action="store_true", help="Poisson instead of evenly spaced arrivals")
+    parser.add_argument("--max-outstanding", type=int, default=1024, help="Open-loop cap on in-flight requests")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of load excluded from the results")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the operation mix")
+    parser.add_argument("--stubs", action="store_true", help="Point the server at local upstream stand-ins")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Stub upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=2.0, help="Stub upstream jitter")
+    parser.add_argument("--cache-ttls", help="CACHE_TTLS for the server, e.g. get_crypto_price=0 to disable caching")
+    parser.add_argument("--server-cmd", help="Command that starts the server (default: the mcpagentai entry point)")
+    parser.add_argument("--server-log-level", default="WARNING", help="LOG_LEVEL for the server process")
+    parser.add_argument("--rss-interval", type=float, default=1.0, help="Seconds between RSS samples")
+    parser.add_argument("--report-interval", type=float, default=5.0, help="Seconds between progress lines (0 disables)")
+    parser.add_argument("--output", type=Path, help="Results file (default benchmarks/results/loadgen-<time>.json)")
+    args = parser.parse_args()
+
+    operations = parse_mix(args.mix)
+    if args.stubs:
+        with StubUpstreams(args.latency_ms, args.jitter_ms) as stubs:
+            report = asyncio.run(run_load(args, operations, stubs))
+            report["meta"]["upstream_requests"] = stubs.request_counts()
+    else:
+        report = asyncio.run(run_load(args, operations, None))
+
+    print_report(report)
+    output = args.output or RESULTS_DIR / f"loadgen-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Replay a captured tool-call trace against the MCP server.
+
+Traces are recorded by the server when TRACE_TOOL_CALLS=true (see
+``mcpagentai.core.trace``). Replay starts the server over stdio like
+``benchmarks.loadgen`` and re-issues every call at its original offset,
+divided by --speed (1 = real time, 10 = ten times faster, 0 = as fast as
+--max-outstanding allows). It then compares per-tool latency and errors
+with the original capture, and can summarize a trace without replaying it
+(--summary) to size caches: call mix, argument cardinality and repeat rate.
+
+    PYTHONPATH=src python -m benchmarks.replay store/traces/trace-....jsonl --stubs --speed 5
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from benchmarks.loadgen import Sample, _stats, child_pids, rss_kb, server_command, server_env
+from benchmarks.run import RESULTS_DIR
+from benchmarks.stub_upstreams import StubUpstreams
+from mcpagentai.core.trace import TraceEntry, read_trace
+
+
+def summarize_trace(entries: list[TraceEntry]) -> dict:
+    """
+    Describe the traffic in a trace: per-tool volume, distinct arguments and
+    how often a call repeats one already seen (the ceiling on cache hit rate).
+    """
+    if not entries:
+        return {"calls": 0, "tools": {}}
+    duration = max(entries[-1].ts - entries[0].ts, 1e-9)
+    by_tool: dict[str, list[TraceEntry]] = defaultdict(list)
+    for entry in entries:
+        by_tool[entry.tool].append(entry)
+
+    tools = {}
+    for tool, calls in sorted(by_tool.items()):
+        distinct = Counter(entry.args for entry in calls)
+        latencies = sorted(entry.ms for entry in calls)
+        tools[tool] = {
+            "calls": len(calls),
+            "rate_per_s": round(len(calls) / duration, 3),
+            "distinct_arguments": len(distinct),
+            "repeat_ratio": round(1 - len(distinct) / len(calls), 4),
+            "errors": sum(1 for entry in calls if entry.err),
+            "p50_ms": round(latencies[len(latencies) // 2], 3),
+            "p99_ms": round(latencies[min(int(0.99 * len(latencies)), len(latencies) - 1)], 3),
+            "mean_bytes": round(sum(entry.bytes for entry in calls) / len(calls), 1),
+        }
+    return {"calls": len(entries), "duration_s": round(duration, 3), "tools": tools}
+
+
+async def replay(args: argparse.Namespace, entries: list[TraceEntry], stubs: Optional[StubUpstreams]) -> dict:
+    command = server_command(args)
+    # Don't let the replayed server record a trace of the replay itself.
+    env = {**server_env(args, stubs), "TRACE_TOOL_CALLS": "false"}
+    params = StdioServerParameters(command=command[0], args=command[1:], env=env)
+    samples: list[Sample] = []
+    outstanding = asyncio.Semaphore(args.max_outstanding)
+
+    async with stdio_client(params) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            pids = child_pids()
+            rss_start = sum(rss or 0 for rss in map(rss_kb, pids))
+
+            async def one(entry: TraceEntry, scheduled: float) -> None:
+                error = None
+                async with outstanding:
+                    try:
+                        result = await session.call_tool(entry.tool, entry.arguments)
+                        error = "tool_error" if result.isError else None
+                    except Exception as e:
+                        error = type(e).__name__
+                samples.append(Sample(entry.tool, scheduled, time.perf_counter() - scheduled, error))
+
+            begin = time.perf_counter()
+            origin = entries[0].ts
+            tasks = []
+            for entry in entries:
+                if args.speed > 0:
+                    # Measured from the scheduled time so server backlog shows up as latency.
+                    scheduled = begin + (entry.ts - origin) / args.speed
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                else:
+                    scheduled = time.perf_counter()
+                tasks.append(asyncio.create_task(one(entry, scheduled)))
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - begin
+            rss_end = sum(rss or 0 for rss in map(rss_kb, pids))
+
+    by_tool: dict[str, list[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_tool[sample.operation].append(sample)
+    return {
+        "seconds": round(elapsed, 3),
+        "overall": _stats(samples, elapsed),
+        "tools": {tool: _stats(group, elapsed) for tool, group in sorted(by_tool.items())},
+        "rss_kb": {"start": rss_start, "end": rss_end},
+    }
+
+
+def print_comparison(summary: dict, result: dict) -> None:
+    print(f"\nReplayed {result['overall']['requests']} calls in {result['seconds']:.1f}s "
+          f"({result['overall']['throughput_rps']:.1f} req/s)")
+    print(f"{'tool':28} {'calls':>6} {'orig p50':>9} {'p50':>9} {'orig p99':>9} {'p99':>9} {'orig err':>8} {'err':>5}")
+    for tool, replayed in result["tools"].items():
+        original = summary["tools"].get(tool, {})
+        print(
+            f"{tool:28} {replayed['requests']:6} {original.get('p50_ms', 0):9.2f} {replayed['p50_ms']:9.2f} "
+            f"{original.get('p99_ms', 0):9.2f} {replayed['p99_ms']:9.2f} {original.get('errors', 0):8} "
+            f"{sum(replayed['errors'].values()):5}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a captured mcpagentai tool-call trace.")
+    parser.add_argument("trace", type=Path, help="Trace file recorded with TRACE_TOOL_CALLS=true")
+    parser.add_argument("--speed", type=float, default=1.0, help="Time compression (1 = original, 0 = no delays)")
+    parser.add_argument("--limit", type=int, help="Only replay the first N calls")
+    parser.add_argument("--tool", action="append", help="Only replay calls to this tool (repeatable)")
+    parser.add_argument("--summary", action="store_true", help="Print the trace summary and exit")
+    parser.add_argument("--max-outstanding", type=int, default=256, help="Cap on in-flight calls")
+    parser.add_argument("--stubs", action="store_true", help="Point the server at local upstream stand-ins")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Stub upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=2.0, help="Stub upstream jitter")
+    parser.add_argument("--cache-ttls", help="CACHE_TTLS for the server, e.g. get_crypto_price=30")
+    parser.add_argument("--server-cmd", help="Command that starts the server (default: the mcpagentai entry point)")
+    parser.add_argument("--server-log-level", default="WARNING", help="LOG_LEVEL for the server process")
+    parser.add_argument("--output", type=Path, help="Results file (default benchmarks/results/replay-<time>.json)")
+    args = parser.parse_args()
+
+    entries = [e for e in read_trace(args.trace) if not args.tool or e.tool in args.tool]
+    if args.limit:
+        entries = entries[:args.limit]
+    summary = summarize_trace(entries)
+    if args.summary or not entries:
+        print(json.dumps(summary, indent=2))
+        return
+
+    if args.stubs:
+        with StubUpstreams(args.latency_ms, args.jitter_ms) as stubs:
+            result = asyncio.run(replay(args, entries, stubs))
+    else:
+        result = asyncio.run(replay(args, entries, None))
+
+    print_comparison(summary, result)
+    report = {"trace": str(args.trace), "speed": args.speed, "original": summary, "replay": result}
+    output = args.output or RESULTS_DIR / f"replay-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Offline benchmark suite for the agents and the MultiToolAgent dispatch path.
+
+Every upstream API is replaced by the local stand-ins in
+``benchmarks.stub_upstreams``, so the suite needs no network. For each
+scenario it measures throughput and latency percentiles in four modes:
+
+    agent       the sub-agent's own ``call_tool``, sequentially
+    dispatch    ``MultiToolAgent.call_tool``, sequentially, cache disabled
+    concurrent  ``MultiToolAgent.call_tool_async`` at each --concurrency level,
+                cache disabled
+    cached      ``MultiToolAgent.call_tool_async`` at each --concurrency level
+                with the default response cache (the hot path after warm-up)
+
+"Cache disabled" includes the weather agent's grid cache, which the agent
+mode runs without as well.
+
+Results are written as JSON; pass --compare with an earlier results file to
+print the change in throughput and p99 latency per run and fail on
+regressions beyond --threshold.
+
+    PYTHONPATH=src python -m benchmarks.run --latency-ms 20 --requests 100
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from benchmarks.stub_upstreams import StubUpstreams
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# p99 changes smaller than this are scheduling noise, not regressions.
+P99_NOISE_FLOOR_MS = 1.0
+
+COORDINATES = ["52.52,13.41", "40.71,-74.01", "35.68,139.69", "51.51,-0.13", "-33.87,151.21"]
+CRYPTO_SYMBOLS = ["BTC", "ETH", "SOL", "DOGE", "ADA"]
+TICKERS = ["AAPL", "MSFT", "TSLA", "NVDA", "AMZN"]
+CURRENCY_PAIRS = [("USD", "EUR"), ("EUR", "JPY"), ("GBP", "USD"), ("USD", "PLN"), ("CHF", "CAD")]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """
+    One tool call pattern; ``arguments(i)`` gives the arguments of the i-th call.
+    """
+    name: str
+    agent: str
+    tool: str
+    arguments: Callable[[int], dict]
+
+
+def _pick(values: list, i: int):
+    return values[i % len(values)]
+
+
+SCENARIOS = [
+    Scenario("time.current", "time", "get_current_time", lambda i: {"timezone": "Europe/Warsaw"}),
+    Scenario("calculator.expression", "calculator", "calculate_expression", lambda i: {"expression": f"{i} * 3 + 7"}),
+    Scenario("weather.current", "weather", "get_current_weather", lambda i: {"location": _pick(COORDINATES, i)}),
+    Scenario("weather.forecast", "weather", "get_weather_forecast", lambda i: {"location": _pick(COORDINATES, i), "days": 7}),
+    Scenario("crypto.price", "crypto", "get_crypto_price", lambda i: {"symbol": _pick(CRYPTO_SYMBOLS, i)}),
+    Scenario("crypto.info", "crypto", "get_crypto_info", lambda i: {"symbol": _pick(CRYPTO_SYMBOLS, i)}),
+    Scenario("stock.price", "stock", "get_stock_price", lambda i: {"ticker": _pick(TICKERS, i)}),
+    Scenario("stock.history", "stock", "get_stock_price_history", lambda i: {"ticker": _pick(TICKERS, i)}),
+    Scenario("currency.rate", "currency", "get_exchange_rate", lambda i: {
+        "base_currency": _pick(CURRENCY_PAIRS, i)[0], "symbols": [_pick(CURRENCY_PAIRS, i)[1]],
+    }),
+    Scenario("currency.convert", "currency", "convert_currency", lambda i: {
+        "base_currency": _pick(CURRENCY_PAIRS, i)[0], "target_currency": _pick(CURRENCY_PAIRS, i)[1], "amount": 100,
+    }),
+    Scenario("eliza.agents", "eliza", "get_eliza_agents", lambda i: {"question": "list agents"}),
+    Scenario("eliza.message", "eliza", "message_eliza_agent", lambda i: {"agent": "Eliza", "message": f"hello {i}"}),
+    Scenario("core.batch_call", "crypto", "batch_call", lambda i: {"calls": [
+        {"name": "get_crypto_price", "arguments": {"symbol": symbol}} for symbol in CRYPTO_SYMBOLS
+    ]}),
+]
+
+
+# -------------------------------------------------------------------------
+# Measurement
+# -------------------------------------------------------------------------
+
+def _percentile(sorted_values: list[float], quantile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(quantile * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def _summarize(
+    scenario: Scenario,
+    mode: str,
+    concurrency: int,
+    latencies: list[float],
+    errors: int,
+    elapsed: float,
+) -> dict[str, Any]:
+    latencies = sorted(latencies)
+    requests = len(latencies)
+    return {
+        "scenario": scenario.name,
+        "tool": scenario.tool,
+        "mode": mode,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "p90_ms": round(_percentile(latencies, 0.90) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+
+def run_sequential(call: Callable[[str, dict], Any], scenario: Scenario, requests: int) -> tuple[list[float], int, float]:
+    latencies, errors = [], 0
+    begin = time.perf_counter()
+    for i in range(requests):
+        start = time.perf_counter()
+        try:
+            call(scenario.tool, scenario.arguments(i))
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, errors, time.perf_counter() - begin
+
+
+async def run_concurrent(multi_tool_agent, scenario: Scenario, requests: int, concurrency: int) -> tuple[list[float], int, float]:
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await multi_tool_agent.call_tool_async(scenario.tool, scenario.arguments(i))
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    begin = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, errors, time.perf_counter() - begin
+
+
+# -------------------------------------------------------------------------
+# Suite
+# -------------------------------------------------------------------------
+
+def _configure(stubs: StubUpstreams) -> None:
+    from mcpagentai.core.config import load_settings, set_settings
+
+    os.environ.update(stubs.env())
+    set_settings(dataclasses.replace(load_settings(), run_agent=False, **stubs.settings_overrides()))
+
+
+def run_suite(args: argparse.Namespace) -> dict[str, Any]:
+    from mcpagentai.core.agent_loader import AgentLoader, get_agent_loader
+    from mcpagentai.core.cache import ResponseCache
+    from mcpagentai.core.config import get_settings
+    from mcpagentai.core.logging import configure_logging
+    from mcpagentai.core.multi_tool_agent import MultiToolAgent
+
+    configure_logging(args.log_level)
+    scenarios = [
+        s for s in SCENARIOS
+        if not args.scenario or any(fnmatch.fnmatch(s.name, pattern) for pattern in args.scenario)
+    ]
+    concurrency_levels = [int(c) for c in args.concurrency.split(",")]
+
+    loader = get_agent_loader()
+    # Without its grid cache the weather agent reaches the upstream on every call.
+    uncached_loader = AgentLoader()
+    uncached_loader.configure("weather", settings=dataclasses.replace(get_settings(), weather_grid=0))
+    agent_names = sorted({s.agent for s in scenarios})
+    uncached = MultiToolAgent([uncached_loader.get(name) for name in agent_names], cache=ResponseCache(policies={}))
+    cached = MultiToolAgent([loader.get(name) for name in agent_names])
+
+    results = []
+    for scenario in scenarios:
+        runs = []
+        if scenario.tool != "batch_call":
+            runs.append(("agent", 1, lambda s=scenario: run_sequential(uncached_loader.get(s.agent).call_tool, s, args.requests)))
+        runs.append(("dispatch", 1, lambda s=scenario: run_sequential(uncached.call_tool, s, args.requests)))
+        for level in concurrency_levels:
+            runs.append(("concurrent", level, lambda s=scenario, c=level: asyncio.run(
+                run_concurrent(uncached, s, args.requests, c))))
+        for level in concurrency_levels:
+            runs.append(("cached", level, lambda s=scenario, c=level: asyncio.run(
+                run_concurrent(cached, s, args.requests, c))))
+
+        for mode, level, run in runs:
+            # One untimed call per run so imports and connection setup stay out of the numbers.
+            try:
+                uncached.call_tool(scenario.tool, scenario.arguments(0))
+            except Exception:
+                pass
+            latencies, errors, elapsed = run()
+            result = _summarize(scenario, mode, level, latencies, errors, elapsed)
+            results.append(result)
+            print(
+                f"{scenario.name:24} {mode:10} c={level:<4} {result['throughput_rps']:>10.1f} req/s  "
+                f"p50 {result['p50_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms  errors {errors}",
+                flush=True,
+            )
+    return {"meta": _metadata(args), "results": results}
+
+
+def _metadata(args: argparse.Namespace) -> dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """
+    Print per-run deltas against ``baseline`` and return the regressions
+    (throughput drop or p99 increase larger than ``threshold`` percent; p99
+    increases below P99_NOISE_FLOOR_MS are ignored).
+    """
+    def key(result: dict) -> tuple:
+        return result["scenario"], result["mode"], result["concurrency"]
+
+    previous = {key(result): result for result in baseline["results"]}
+    regressions = []
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'}:")
+    for result in current["results"]:
+        old = previous.get(key(result))
+        if old is None or not old["throughput_rps"] or not old["p99_ms"]:
+            continue
+        rps_delta = (result["throughput_rps"] - old["throughput_rps"]) / old["throughput_rps"] * 100
+        p99_delta = (result["p99_ms"] - old["p99_ms"]) / old["p99_ms"] * 100
+        flag = ""
+        p99_regressed = p99_delta > threshold and result["p99_ms"] - old["p99_ms"] > P99_NOISE_FLOOR_MS
+        if rps_delta < -threshold or p99_regressed:
+            flag = "  REGRESSION"
+            regressions.append(f"{result['scenario']} {result['mode']} c={result['concurrency']}")
+        print(
+            f"{result['scenario']:24} {result['mode']:10} c={result['concurrency']:<4} "
+            f"throughput {rps_delta:+7.1f}%  p99 {p99_delta:+7.1f}%{flag}"
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the offline mcpagentai benchmark suite.")
+    parser.add_argument("--requests", type=int, default=50, help="Calls per run (default 50)")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Injected upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=2.0, help="Uniform extra upstream latency")
+    parser.add_argument("--scenario", action="append", help="Only run scenarios matching this glob (repeatable)")
+    parser.add_argument("--output", type=Path, help="Results file (default benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    parser.add_argument("--log-level", default="WARNING", help="Log level for the agents while benchmarking")
+    args = parser.parse_args()
+
+    with StubUpstreams(args.latency_ms, args.jitter_ms) as stubs:
+        _configure(stubs)
+        report = run_suite(args)
+        report["meta"]["upstream_requests"] = stubs.request_counts()
+
+    output = args.output
+    if output is None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{report['meta']['commit'] or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        regressions = compare(report, json.loads(args.compare.read_text()), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:g}%")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Soak test: look for memory growth over many simulated hours of traffic.
+
+Starts the server over stdio like ``benchmarks.loadgen`` (with tracemalloc
+enabled), then for each simulated hour issues --calls-per-hour requests from
+the weighted --mix as fast as --concurrency allows and takes a report with the
+``get_memory_report`` tool. After --warmup-hours (caches filling, lazy
+imports), the least-squares growth per hour of RSS, traced Python memory and
+every watched collection is compared with the thresholds; the run exits with
+status 1 if any is exceeded, and prints the allocation sites that grew most.
+
+Time is compressed, so entries that would expire by TTL within an hour are
+not expired here; bounded structures still have to plateau.
+
+    PYTHONPATH=src python -m benchmarks.soak --stubs --latency-ms 1 --hours 8 --calls-per-hour 2000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from benchmarks.loadgen import DEFAULT_MIX, Operation, issue, parse_mix, server_command, server_env
+from benchmarks.run import RESULTS_DIR
+from benchmarks.stub_upstreams import StubUpstreams
+
+MB = 1024 * 1024
+
+
+async def memory_report(session: ClientSession) -> dict:
+    result = await session.call_tool("get_memory_report", {})
+    return json.loads(result.content[0].text)
+
+
+async def simulate_hour(session: ClientSession, operations: list[Operation], args, rng: random.Random, first_index: int) -> int:
+    """
+    Issue one simulated hour of calls; return the number of failed calls.
+    """
+    weights = [op.weight for op in operations]
+    indexes = iter(range(first_index, first_index + args.calls_per_hour))
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in indexes:
+            if await issue(session, rng.choices(operations, weights)[0], index) is not None:
+                errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return errors
+
+
+async def run_soak(args: argparse.Namespace, operations: list[Operation], stubs: Optional[StubUpstreams]) -> dict:
+    command = server_command(args)
+    env = {
+        **server_env(args, stubs),
+        "MEMORY_TRACEMALLOC_FRAMES": str(args.tracemalloc_frames),
+        "MEMORY_REPORT_INTERVAL": "0",
+        "TRACE_TOOL_CALLS": "false",
+    }
+    params = StdioServerParameters(command=command[0], args=command[1:], env=env)
+    rng = random.Random(args.seed)
+    points = []
+
+    async with stdio_client(params) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            report = await memory_report(session)
+            points.append({"hour": 0, "errors": 0, "report": report})
+            for hour in range(1, args.hours + 1):
+                errors = await simulate_hour(session, operations, args, rng, hour * args.calls_per_hour)
+                report = await memory_report(session)
+                points.append({"hour": hour, "errors": errors, "report": report})
+                print(
+                    f"hour {hour:3}: rss {(report['rss_bytes'] or 0) / MB:8.1f} MB  "
+                    f"traced {(report['traced_bytes'] or 0) / MB:7.2f} MB  errors {errors:5}  "
+                    + "  ".join(f"{name}={size}" for name, size in report["collections"].items())
+                )
+            final = report
+
+    return {"points": points, "final": final}
+
+
+def slope_per_hour(series: list[tuple[float, float]]) -> float:
+    """
+    Least-squares slope of (hour, value) pairs; 0 with fewer than two points.
+    """
+    if len(series) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in series) / len(series)
+    mean_y = sum(y for _, y in series) / len(series)
+    denominator = sum((x - mean_x) ** 2 for x, _ in series)
+    return sum((x - mean_x) * (y - mean_y) for x, y in series) / denominator if denominator else 0.0
+
+
+def evaluate(points: list[dict], args: argparse.Namespace) -> tuple[dict, list[str]]:
+    measured = [p for p in points if p["hour"] >= args.warmup_hours]
+
+    def series(value) -> list[tuple[float, float]]:
+        return [(p["hour"], value(p["report"])) for p in measured if value(p["report"]) is not None]
+
+    growth = {
+        "rss_mb_per_hour": slope_per_hour(series(lambda r: r["rss_bytes"] and r["rss_bytes"] / MB)),
+        "traced_mb_per_hour": slope_per_hour(series(lambda r: r["traced_bytes"] and r["traced_bytes"] / MB)),
+        "collections_per_hour": {
+            name: slope_per_hour(series(lambda r, name=name: r["collections"].get(name)))
+            for name in points[-1]["report"]["collections"]
+        },
+    }
+    failures = []
+    if growth["rss_mb_per_hour"] > args.max_rss_growth_mb:
+        failures.append(f"RSS grows {growth['rss_mb_per_hour']:.2f} MB/hour (limit {args.max_rss_growth_mb})")
+    if growth["traced_mb_per_hour"] > args.max_traced_growth_mb:
+        failures.append(
+            f"Traced memory grows {growth['traced_mb_per_hour']:.2f} MB/hour (limit {args.max_traced_growth_mb})"
+        )
+    for name, rate in growth["collections_per_hour"].items():
+        if rate > args.max_collection_growth:
+            failures.append(f"{name} grows {rate:.1f} entries/hour (limit {args.max_collection_growth})")
+    return growth, failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Soak-test the mcpagentai server for memory growth.")
+    parser.add_argument("--hours", type=int, default=6, help="Simulated hours")
+    parser.add_argument("--calls-per-hour", type=int, default=1800, help="Requests per simulated hour")
+    parser.add_argument("--warmup-hours", type=int, default=1, help="Hours excluded from the growth fit")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted operations, as for benchmarks.loadgen")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent client workers")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the operation mix")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=2.0, help="RSS growth limit, MB per hour")
+    parser.add_argument("--max-traced-growth-mb", type=float, default=1.0, help="Traced memory growth limit, MB per hour")
+    parser.add_argument("--max-collection-growth", type=float, default=50.0, help="Entries per hour any collection may grow")
+    parser.add_argument("--tracemalloc-frames", type=int, default=1, help="Frames kept per allocation (0 disables)")
+    parser.add_argument("--stubs", action="store_true", help="Point the server at local upstream stand-ins")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Stub upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Stub upstream jitter")
+    parser.add_argument("--cache-ttls", help="CACHE_TTLS for the server")
+    parser.add_argument("--server-cmd", help="Command that starts the server (default: the mcpagentai entry point)")
+    parser.add_argument("--server-log-level", default="WARNING", help="LOG_LEVEL for the server process")
+    parser.add_argument("--output", type=Path, help="Results file (default benchmarks/results/soak-<time>.json)")
+    args = parser.parse_args()
+
+    operations = parse_mix(args.mix)
+    if args.stubs:
+        with StubUpstreams(args.latency_ms, args.jitter_ms) as stubs:
+            result = asyncio.run(run_soak(args, operations, stubs))
+    else:
+        result = asyncio.run(run_soak(args, operations, None))
+
+    growth, failures = evaluate(result["points"], args)
+    print(f"\nGrowth after {args.warmup_hours} warm-up hour(s): "
+          f"RSS {growth['rss_mb_per_hour']:+.2f} MB/h, traced {growth['traced_mb_per_hour']:+.2f} MB/h")
+    top = result["final"]["growth_since_start"][:5]
+    if top:
+        print("Largest allocation growth since start:")
+        for site in top:
+            print(f"  {site['size_diff_bytes'] / 1024:10.1f} KiB  {site['count_diff']:+8}  {site['site']}")
+
+    report = {"args": vars(args) | {"output": str(args.output)}, "growth": growth, "failures": failures, **result}
+    output = args.output or RESULTS_DIR / f"soak-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {output}")
+
+    if failures:
+        print("\nFAIL")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nPASS")
+
+
+if __name__ == "__main__":
+    main()
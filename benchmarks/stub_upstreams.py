@@ -0,0 +1,477 @@
+"""
+Local stand-ins for the upstream APIs used by the agents.
+
+Each upstream (Open-Meteo, CoinGecko, Alpha Vantage, FreeCurrencyAPI and an
+Eliza server) is served by its own HTTP/1.1 keep-alive server on 127.0.0.1,
+so the shared HttpClient keeps one connection pool per upstream exactly as it
+does in production. Responses follow the shape and rough size of the real
+APIs and are deterministic for a given request. Every response can be
+delayed by a configurable latency (plus uniform jitter) to model the network.
+
+Run standalone to get a set of upstreams for manual testing or the load
+generator:
+
+    python -m benchmarks.stub_upstreams --latency-ms 40 --jitter-ms 10
+
+It prints the environment variables that point mcpagentai at the stubs.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+UPSTREAMS = ("open_meteo", "coingecko", "alphavantage", "freecurrency", "eliza")
+
+# Environment variable and URL suffix used to point the agents at each stub.
+UPSTREAM_ENV = {
+    "open_meteo": ("OPEN_METEO_URL", "/v1"),
+    "coingecko": ("COINGECKO_URL", "/api/v3"),
+    "alphavantage": ("ALPHA_VANTAGE_URL", "/query"),
+    "freecurrency": ("FREECURRENCY_URL", "/v1"),
+    "eliza": ("ELIZA_API_URL", ""),
+}
+
+CURRENCIES = [
+    "EUR", "USD", "JPY", "BGN", "CZK", "DKK", "GBP", "HUF", "PLN", "RON",
+    "SEK", "CHF", "ISK", "NOK", "HRK", "RUB", "TRY", "AUD", "BRL", "CAD",
+    "CNY", "HKD", "IDR", "ILS", "INR", "KRW", "MXN", "MYR", "NZD", "PHP",
+    "SGD", "THB", "ZAR",
+]
+
+ELIZA_AGENTS = [
+    {"id": "b850bc30-45f8-0041-a00a-83df46d8555d", "name": "Eliza", "clients": ["twitter"]},
+    {"id": "e0e10e6f-ff2b-0d4c-8011-1fc1eee7cb32", "name": "Trump", "clients": []},
+    {"id": "c3bd776c-4465-037f-9c7a-bf94dfba78d9", "name": "Snoop", "clients": ["discord"]},
+]
+
+WEATHER_CODES = [0, 1, 2, 3, 45, 51, 61, 63, 71, 80, 95]
+
+
+def _seed(*parts: Any) -> int:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _split(value: Optional[str]) -> list[str]:
+    return [item for item in (value or "").split(",") if item]
+
+
+# -------------------------------------------------------------------------
+# Response builders
+# -------------------------------------------------------------------------
+
+def _weather_variable(name: str, rng: random.Random) -> Any:
+    if "weathercode" in name or "weather_code" in name:
+        return rng.choice(WEATHER_CODES)
+    if "temperature" in name:
+        return round(rng.uniform(-10, 35), 1)
+    if "precipitation_probability" in name or "humidity" in name or "cloud" in name:
+        return rng.randint(0, 100)
+    if "precipitation" in name or "rain" in name or "snow" in name:
+        return round(max(rng.gauss(0.5, 1.5), 0.0), 1)
+    if "direction" in name:
+        return rng.randint(0, 359)
+    if "wind" in name or "gust" in name:
+        return round(rng.uniform(0, 40), 1)
+    if "pressure" in name:
+        return round(rng.uniform(980, 1040), 1)
+    return round(rng.uniform(0, 100), 2)
+
+
+def open_meteo_forecast(params: dict[str, str]) -> Any:
+    latitudes = _split(params.get("latitude"))
+    longitudes = _split(params.get("longitude"))
+    if not latitudes or len(latitudes) != len(longitudes):
+        return 400, {"error": True, "reason": "Parameter 'latitude' and 'longitude' must have the same number of elements"}
+
+    days = int(params.get("forecast_days") or 7)
+    today = date(2025, 1, 7)
+    now = datetime(2025, 1, 7, 12, 0)
+    locations = []
+    for lat_str, lon_str in zip(latitudes, longitudes):
+        lat, lon = float(lat_str), float(lon_str)
+        rng = random.Random(_seed("open_meteo", round(lat, 2), round(lon, 2)))
+        location: dict[str, Any] = {
+            "latitude": round(lat, 4),
+            "longitude": round(lon, 4),
+            "generationtime_ms": 0.62,
+            "utc_offset_seconds": 0,
+            "timezone": "GMT",
+            "timezone_abbreviation": "GMT",
+            "elevation": 38.0,
+        }
+        if params.get("current_weather") == "true":
+            location["current_weather"] = {
+                "temperature": _weather_variable("temperature", rng),
+                "windspeed": _weather_variable("windspeed", rng),
+                "winddirection": _weather_variable("winddirection", rng),
+                "weathercode": _weather_variable("weathercode", rng),
+                "is_day": 1,
+                "time": now.strftime("%Y-%m-%dT%H:%M"),
+            }
+        if params.get("current"):
+            location["current"] = {"time": now.strftime("%Y-%m-%dT%H:%M"), "interval": 900}
+            for name in _split(params["current"]):
+                location["current"][name] = _weather_variable(name, rng)
+        if params.get("hourly"):
+            hours = [now.replace(hour=0) + timedelta(hours=h) for h in range(days * 24)]
+            location["hourly"] = {"time": [h.strftime("%Y-%m-%dT%H:%M") for h in hours]}
+            for name in _split(params["hourly"]):
+                location["hourly"][name] = [_weather_variable(name, rng) for _ in hours]
+        if params.get("daily"):
+            days_list = [today + timedelta(days=d) for d in range(days)]
+            location["daily"] = {"time": [d.isoformat() for d in days_list]}
+            for name in _split(params["daily"]):
+                location["daily"][name] = [_weather_variable(name, rng) for _ in days_list]
+        locations.append(location)
+
+    return 200, locations[0] if len(locations) == 1 else locations
+
+
+def coingecko_simple_price(params: dict[str, str]) -> Any:
+    result = {}
+    for coin_id in _split(params.get("ids")):
+        rng = random.Random(_seed("coingecko", coin_id))
+        entry = {"usd": round(rng.uniform(0.05, 90000), 2)}
+        if params.get("include_24hr_change") == "true":
+            entry["usd_24h_change"] = round(rng.uniform(-8, 8), 6)
+        result[coin_id] = entry
+    return 200, result
+
+
+def coingecko_coin(coin_id: str) -> Any:
+    rng = random.Random(_seed("coingecko", coin_id))
+    price = round(rng.uniform(0.05, 90000), 2)
+    name = coin_id.replace("-", " ").title()
+    description = " ".join(
+        f"{name} is a decentralized digital currency, paragraph {i}." for i in range(80)
+    )
+    currencies = [c.lower() for c in CURRENCIES]
+    return 200, {
+        "id": coin_id,
+        "symbol": coin_id[:4],
+        "name": name,
+        "description": {"en": description},
+        "links": {
+            "homepage": [f"https://{coin_id}.org", "", ""],
+            "blockchain_site": [f"https://explorer.{coin_id}.org", "", "", ""],
+        },
+        "market_cap_rank": rng.randint(1, 100),
+        "market_data": {
+            "current_price": {c: round(price * rng.uniform(0.5, 150), 4) for c in currencies},
+            "market_cap": {c: rng.randint(10**8, 10**12) for c in currencies},
+            "total_volume": {c: rng.randint(10**6, 10**10) for c in currencies},
+            "total_supply": float(rng.randint(10**6, 10**11)),
+            "circulating_supply": float(rng.randint(10**6, 10**10)),
+            "price_change_percentage_24h": round(rng.uniform(-8, 8), 5),
+        },
+    }
+
+
+def alphavantage_query(params: dict[str, str]) -> Any:
+    function = params.get("function")
+    if function == "SYMBOL_SEARCH":
+        keywords = params.get("keywords", "").upper()
+        matches = [
+            {
+                "1. symbol": f"{keywords[:4]}{suffix}",
+                "2. name": f"{keywords.title()} {kind}",
+                "3. type": "Equity",
+                "4. region": region,
+                "5. marketOpen": "09:30",
+                "6. marketClose": "16:00",
+                "7. timezone": "UTC-04",
+                "8. currency": "USD",
+                "9. matchScore": score,
+            }
+            for suffix, kind, region, score in (
+                ("", "Inc", "United States", "1.0000"),
+                (".LON", "PLC", "United Kingdom", "0.8000"),
+                (".DEX", "AG", "XETRA", "0.6000"),
+            )
+        ]
+        return 200, {"bestMatches": matches}
+    if function == "TIME_SERIES_DAILY":
+        symbol = params.get("symbol", "")
+        rng = random.Random(_seed("alphavantage", symbol))
+        price = rng.uniform(10, 500)
+        series = {}
+        day = date(2025, 1, 7)
+        while len(series) < 100:
+            if day.weekday() < 5:
+                open_ = price
+                price = max(price * rng.uniform(0.97, 1.03), 1.0)
+                series[day.isoformat()] = {
+                    "1. open": f"{open_:.4f}",
+                    "2. high": f"{max(open_, price) * 1.01:.4f}",
+                    "3. low": f"{min(open_, price) * 0.99:.4f}",
+                    "4. close": f"{price:.4f}",
+                    "5. volume": str(rng.randint(10**5, 10**8)),
+                }
+            day -= timedelta(days=1)
+        return 200, {
+            "Meta Data": {
+                "1. Information": "Daily Prices (open, high, low, close) and Volumes",
+                "2. Symbol": symbol,
+                "3. Last Refreshed": "2025-01-07",
+                "4. Output Size": "Compact",
+                "5. Time Zone": "US/Eastern",
+            },
+            "Time Series (Daily)": series,
+        }
+    return 200, {"Error Message": f"Invalid API call: unknown function {function}"}
+
+
+def freecurrency_latest(params: dict[str, str]) -> Any:
+    base = params.get("base_currency") or "USD"
+    targets = _split(params.get("currencies")) or CURRENCIES
+    rng = random.Random(_seed("freecurrency", base))
+    rates = {currency: round(rng.uniform(0.01, 400), 6) for currency in CURRENCIES}
+    return 200, {"data": {currency: rates.get(currency, 1.0) for currency in targets}}
+
+
+def eliza_agents() -> Any:
+    return 200, {"agents": ELIZA_AGENTS}
+
+
+def eliza_message(agent_id: str) -> Any:
+    for agent in ELIZA_AGENTS:
+        if agent["id"] == agent_id:
+            return 200, [{"user": agent["name"], "text": f"Hello from {agent['name']}!", "action": "NONE"}]
+    return 404, {"error": "Agent not found"}
+
+
+# -------------------------------------------------------------------------
+# HTTP plumbing
+# -------------------------------------------------------------------------
+
+Route = Callable[[str, str, dict[str, str]], Optional[tuple[int, Any]]]
+
+
+def _route_open_meteo(method: str, path: str, params: dict[str, str]):
+    if method == "GET" and path == "/v1/forecast":
+        return open_meteo_forecast(params)
+    return None
+
+
+def _route_coingecko(method: str, path: str, params: dict[str, str]):
+    if method != "GET":
+        return None
+    if path == "/api/v3/simple/price":
+        return coingecko_simple_price(params)
+    match = re.fullmatch(r"/api/v3/coins/([\w-]+)", path)
+    if match:
+        return coingecko_coin(match.group(1))
+    return None
+
+
+def _route_alphavantage(method: str, path: str, params: dict[str, str]):
+    if method == "GET" and path == "/query":
+        return alphavantage_query(params)
+    return None
+
+
+def _route_freecurrency(method: str, path: str, params: dict[str, str]):
+    if method == "GET" and path == "/v1/latest":
+        return freecurrency_latest(params)
+    return None
+
+
+def _route_eliza(method: str, path: str, params: dict[str, str]):
+    if method == "GET" and path == "/api/agents":
+        return eliza_agents()
+    match = re.fullmatch(r"/api/([\w-]+)/message", path)
+    if method == "POST" and match:
+        return eliza_message(match.group(1))
+    return None
+
+
+ROUTES: dict[str, Route] = {
+    "open_meteo": _route_open_meteo,
+    "coingecko": _route_coingecko,
+    "alphavantage": _route_alphavantage,
+    "freecurrency": _route_freecurrency,
+    "eliza": _route_eliza,
+}
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, upstream: str, latency: Callable[[], float]):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.upstream = upstream
+        self.route = ROUTES[upstream]
+        self.latency = latency
+        self.requests = 0
+        self._count_lock = threading.Lock()
+
+    def count(self) -> None:
+        with self._count_lock:
+            self.requests += 1
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, delayed
+    # ACKs would add ~40 ms to every keep-alive response.
+    disable_nagle_algorithm = True
+    server: _StubServer
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self._handle("POST")
+
+    def _handle(self, method: str) -> None:
+        self.server.count()
+        parts = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+
+        delay = self.server.latency()
+        if delay > 0:
+            time.sleep(delay)
+
+        result = self.server.route(method, parts.path, params)
+        status, payload = result if result is not None else (404, {"error": "Not found"})
+        body = json.dumps(payload).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class StubUpstreams:
+    """
+    Start every upstream stand-in on an ephemeral local port.
+
+    Args:
+        latency_ms: Delay added to every response.
+        jitter_ms: Uniform random delay added on top of ``latency_ms``.
+        latencies_ms: Per-upstream overrides of ``latency_ms``, keyed by
+            upstream name (see ``UPSTREAMS``).
+
+    Use as a context manager, then point the agents at the stubs with
+    ``env()`` (environment variables) or ``settings_overrides()`` (keyword
+    arguments for ``dataclasses.replace`` on a Settings object).
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        latencies_ms: Optional[dict[str, float]] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.latencies_ms = dict(latencies_ms or {})
+        self._servers: dict[str, _StubServer] = {}
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> "StubUpstreams":
+        for upstream in UPSTREAMS:
+            server = _StubServer(upstream, self._latency_for(upstream))
+            thread = threading.Thread(
+                target=server.serve_forever, name=f"stub-{upstream}", daemon=True
+            )
+            thread.start()
+            self._servers[upstream] = server
+            self._threads.append(thread)
+        return self
+
+    def stop(self) -> None:
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._servers.clear()
+        self._threads.clear()
+
+    def __enter__(self) -> "StubUpstreams":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def base_url(self, upstream: str) -> str:
+        host, port = self._servers[upstream].server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, upstream: str) -> str:
+        return self.base_url(upstream) + UPSTREAM_ENV[upstream][1]
+
+    def env(self) -> dict[str, str]:
+        return {UPSTREAM_ENV[upstream][0]: self.url(upstream) for upstream in UPSTREAMS}
+
+    def settings_overrides(self) -> dict[str, str]:
+        return {
+            "open_meteo_url": self.url("open_meteo"),
+            "coingecko_url": self.url("coingecko"),
+            "alphavantage_url": self.url("alphavantage"),
+            "freecurrency_url": self.url("freecurrency"),
+            "eliza_api_url": self.url("eliza"),
+        }
+
+    def request_counts(self) -> dict[str, int]:
+        return {upstream: server.requests for upstream, server in self._servers.items()}
+
+    def _latency_for(self, upstream: str) -> Callable[[], float]:
+        base = self.latencies_ms.get(upstream, self.latency_ms) / 1000
+        jitter = self.jitter_ms / 1000
+        if jitter <= 0:
+            return lambda: base
+        return lambda: base + random.uniform(0, jitter)
+
+
+def _parse_latencies(values: list[str]) -> dict[str, float]:
+    latencies = {}
+    for value in values:
+        upstream, _, ms = value.partition("=")
+        if upstream not in UPSTREAMS:
+            raise argparse.ArgumentTypeError(f"Unknown upstream: {upstream}")
+        latencies[upstream] = float(ms)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve local stand-ins for the mcpagentai upstream APIs.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform random extra delay")
+    parser.add_argument(
+        "--upstream-latency", action="append", default=[], metavar="NAME=MS",
+        help=f"Per-upstream latency override; NAME is one of {', '.join(UPSTREAMS)}",
+    )
+    args = parser.parse_args()
+
+    stubs = StubUpstreams(args.latency_ms, args.jitter_ms, _parse_latencies(args.upstream_latency))
+    with stubs:
+        for key, value in stubs.env().items():
+            print(f"export {key}={value}")
+        print("# Serving; press Ctrl+C to stop.", flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
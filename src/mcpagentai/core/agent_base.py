@@ -1,8 +1,10 @@
 import abc
-from typing import Sequence, Union
-from dotenv import load_dotenv
+import inspect
+from typing import Optional, Sequence, Union
 from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 
+from .config import Settings, get_settings
+from .executor import run_blocking
 from .logging import get_logger
 
 class MCPAgent(abc.ABC):
@@ -10,10 +12,10 @@ class MCPAgent(abc.ABC):
     Master abstract base class for MCP Agents of any type.
     """
 
-    def __init__(self):
-        load_dotenv()
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or get_settings()
         self.logger = get_logger(self.__class__.__name__)
-        self.logger.debug(f"Initializing agent: {self.__class__.__name__}")
+        self.logger.debug("Initializing agent: %s", self.__class__.__name__)
 
     @abc.abstractmethod
     def list_tools(self) -> list[Tool]:
@@ -34,6 +36,29 @@ class MCPAgent(abc.ABC):
         """
         pass
 
+    @property
+    def is_async_native(self) -> bool:
+        """
+        True if this agent implements ``call_tool`` as a coroutine function.
+        """
+        return inspect.iscoroutinefunction(self.call_tool)
+
+    async def call_tool_async(
+        self,
+        name: str,
+        arguments: dict
+    ) -> Sequence[Union[TextContent, ImageContent, EmbeddedResource]]:
+        """
+        Async entry point used by the server and MultiToolAgent.
+
+        Native async agents are awaited directly on the event loop. Legacy sync
+        agents run on the shared bounded executor so that blocking upstream I/O
+        does not stall the event loop.
+        """
+        if self.is_async_native:
+            return await self.call_tool(name, arguments)
+        return await run_blocking(self.call_tool, name, arguments)
+
     def has_tool(self, tool_name: str) -> bool:
         """
         Determine if this agent implements a tool by the given name.
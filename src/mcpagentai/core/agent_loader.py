@@ -0,0 +1,176 @@
+import importlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence, Union
+
+from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
+
+from .agent_base import MCPAgent
+from .logging import get_logger
+
+# Agent name -> "module:ClassName". Modules are only imported when the
+# agent is first used.
+AGENT_SPECS: dict[str, str] = {
+    "time": "mcpagentai.tools.time_agent:TimeAgent",
+    "weather": "mcpagentai.tools.weather_agent:WeatherAgent",
+    "dictionary": "mcpagentai.tools.dictionary_agent:DictionaryAgent",
+    "calculator": "mcpagentai.tools.calculator_agent:CalculatorAgent",
+    "currency": "mcpagentai.tools.currency_agent:CurrencyAgent",
+    "crypto": "mcpagentai.tools.crypto_agent:CryptoAgent",
+    "stock": "mcpagentai.tools.stock_agent:StockAgent",
+    "eliza": "mcpagentai.tools.eliza.agent:ElizaAgent",
+    "eliza_mcp": "mcpagentai.tools.eliza.mcp_agent:ElizaMCPAgent",
+    "twitter": "mcpagentai.tools.twitter.agent:TwitterAgent",
+}
+
+
+@dataclass
+class AgentTiming:
+    """
+    Wall-clock cost of materializing one agent.
+    """
+    import_ms: float
+    init_ms: float
+
+
+class AgentLoader:
+    """
+    Imports and constructs agents by name on first use.
+
+    Each name maps to a single shared instance, so the server, the Twitter
+    query handlers and anything else asking for e.g. "weather" reuse the same
+    agent (and its state) instead of building their own.
+    """
+
+    def __init__(self, specs: Optional[dict[str, str]] = None):
+        self.specs = dict(AGENT_SPECS if specs is None else specs)
+        self.logger = get_logger("mcpagentai.agent_loader")
+        self._kwargs: dict[str, dict[str, Any]] = {}
+        self._instances: dict[str, MCPAgent] = {}
+        self._timings: dict[str, AgentTiming] = {}
+        self._lock = threading.RLock()
+
+    def configure(self, name: str, **kwargs: Any) -> None:
+        """
+        Set constructor keyword arguments for an agent that has not been built yet.
+        """
+        self._check_name(name)
+        with self._lock:
+            if name in self._instances:
+                raise RuntimeError(f"Agent '{name}' is already loaded; configure it before first use")
+            self._kwargs[name] = kwargs
+
+    def get(self, name: str) -> MCPAgent:
+        """
+        Return the shared instance for ``name``, importing and constructing it if needed.
+        """
+        agent = self._instances.get(name)
+        if agent is not None:
+            return agent
+
+        self._check_name(name)
+        with self._lock:
+            agent = self._instances.get(name)
+            if agent is None:
+                agent = self._load(name)
+                self._instances[name] = agent
+        return agent
+
+    def lazy(self, name: str) -> "LazyAgent":
+        """
+        Return a proxy that materializes the agent on first use.
+        """
+        self._check_name(name)
+        return LazyAgent(name, self)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def timings(self) -> dict[str, AgentTiming]:
+        with self._lock:
+            return dict(self._timings)
+
+    def _check_name(self, name: str) -> None:
+        if name not in self.specs:
+            raise ValueError(
+                f"Unknown agent: {name}. Available agents: {', '.join(sorted(self.specs))}"
+            )
+
+    def _load(self, name: str) -> MCPAgent:
+        module_name, class_name = self.specs[name].split(":")
+
+        start = time.perf_counter()
+        agent_cls = getattr(importlib.import_module(module_name), class_name)
+        imported = time.perf_counter()
+        agent = agent_cls(**self._kwargs.get(name, {}))
+        done = time.perf_counter()
+
+        timing = AgentTiming(import_ms=(imported - start) * 1000, init_ms=(done - imported) * 1000)
+        self._timings[name] = timing
+        self.logger.info(
+            "Loaded agent '%s' (%s): import %.1f ms, init %.1f ms",
+            name, class_name, timing.import_ms, timing.init_ms,
+        )
+        return agent
+
+
+class LazyAgent(MCPAgent):
+    """
+    Stand-in for an agent that is imported and constructed on first use.
+    """
+
+    def __init__(self, name: str, loader: AgentLoader):
+        # Deliberately skip MCPAgent.__init__: the proxy itself holds no state
+        # worth initializing and must stay cheap to create.
+        self.name = name
+        self._loader = loader
+        self.logger = get_logger(f"LazyAgent[{name}]")
+
+    @property
+    def agent(self) -> MCPAgent:
+        return self._loader.get(self.name)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loader.is_loaded(self.name)
+
+    @property
+    def is_async_native(self) -> bool:
+        return self.agent.is_async_native
+
+    def list_tools(self) -> list[Tool]:
+        return self.agent.list_tools()
+
+    def call_tool(
+        self,
+        name: str,
+        arguments: dict
+    ) -> Sequence[Union[TextContent, ImageContent, EmbeddedResource]]:
+        return self.agent.call_tool(name, arguments)
+
+    async def call_tool_async(
+        self,
+        name: str,
+        arguments: dict
+    ) -> Sequence[Union[TextContent, ImageContent, EmbeddedResource]]:
+        return await self.agent.call_tool_async(name, arguments)
+
+    def __repr__(self) -> str:
+        return f"LazyAgent({self.name!r}, loaded={self.is_loaded})"
+
+
+_loader: Optional[AgentLoader] = None
+_loader_lock = threading.Lock()
+
+
+def get_agent_loader() -> AgentLoader:
+    """
+    Return the process-wide AgentLoader.
+    """
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                _loader = AgentLoader()
+    return _loader
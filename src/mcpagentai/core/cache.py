@@ -0,0 +1,303 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+from mcpagentai.defs import (
+    WeatherTools,
+    CurrencyTools,
+    CryptoTools,
+    StockTools,
+    ElizaTools,
+)
+
+if TYPE_CHECKING:
+    from .config import Settings
+
+CACHE_BACKENDS = ("auto", "memory", "sqlite")
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+# Size charged for content items whose payload size cannot be measured.
+OPAQUE_ITEM_BYTES = 1024
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    How long a tool's results stay fresh, and for how long afterwards a stale
+    result may still be served while it is refreshed in the background.
+    """
+    ttl: float
+    stale_ttl: float = 0.0
+
+
+# Tools not listed here are never cached.
+DEFAULT_CACHE_POLICIES: dict[str, CachePolicy] = {
+    WeatherTools.GET_CURRENT_WEATHER.value: CachePolicy(ttl=300, stale_ttl=300),
+    WeatherTools.FORECAST.value: CachePolicy(ttl=1800, stale_ttl=1800),
+    WeatherTools.GET_CURRENT_WEATHER_BATCH.value: CachePolicy(ttl=300, stale_ttl=300),
+    WeatherTools.FORECAST_BATCH.value: CachePolicy(ttl=1800, stale_ttl=1800),
+    WeatherTools.HOURLY_FORECAST.value: CachePolicy(ttl=1800, stale_ttl=1800),
+    CurrencyTools.GET_EXCHANGE_RATE.value: CachePolicy(ttl=3600, stale_ttl=3600),
+    CurrencyTools.CONVERT_CURRENCY.value: CachePolicy(ttl=3600, stale_ttl=3600),
+    CryptoTools.GET_CRYPTO_PRICE.value: CachePolicy(ttl=60, stale_ttl=60),
+    CryptoTools.GET_CRYPTO_INFO.value: CachePolicy(ttl=86400, stale_ttl=86400),
+    StockTools.GET_TICKER_BY_NAME.value: CachePolicy(ttl=86400, stale_ttl=86400),
+    StockTools.GET_STOCK_PRICE_TODAY.value: CachePolicy(ttl=300, stale_ttl=600),
+    StockTools.GET_STOCK_PRICE_HISTORY.value: CachePolicy(ttl=3600, stale_ttl=3600),
+    ElizaTools.GET_AGENTS.value: CachePolicy(ttl=60, stale_ttl=60),
+}
+
+
+# Served from the weather agent's grid cache, whose entries expire with
+# Open-Meteo's data; a fixed TTL in front of it would outlive that expiry.
+WEATHER_GRID_TOOLS = frozenset({
+    WeatherTools.GET_CURRENT_WEATHER.value,
+    WeatherTools.FORECAST.value,
+    WeatherTools.GET_CURRENT_WEATHER_BATCH.value,
+    WeatherTools.FORECAST_BATCH.value,
+    WeatherTools.HOURLY_FORECAST.value,
+})
+
+
+def build_cache_policies(ttl_overrides: Optional[dict[str, float]] = None) -> dict[str, CachePolicy]:
+    """
+    Return the default policies with per-tool TTL overrides applied.
+
+    An override keeps the tool's default stale window (or uses the TTL itself
+    for tools without a default); a TTL of 0 or less disables caching.
+    """
+    policies = dict(DEFAULT_CACHE_POLICIES)
+    for tool_name, ttl in (ttl_overrides or {}).items():
+        if ttl <= 0:
+            policies.pop(tool_name, None)
+            continue
+        default = policies.get(tool_name)
+        policies[tool_name] = CachePolicy(ttl=ttl, stale_ttl=default.stale_ttl if default else ttl)
+    return policies
+
+
+def canonical_arguments(arguments: Optional[dict]) -> str:
+    """
+    Serialize tool arguments to a stable string (sorted keys, no whitespace),
+    so logically identical calls map to the same key.
+    """
+    return json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def estimate_size(value: Sequence[Any]) -> int:
+    """
+    Approximate the memory footprint of a tool result in bytes.
+    """
+    size = 0
+    for item in value:
+        text = getattr(item, "text", None)
+        if isinstance(text, str):
+            size += len(text)
+        else:
+            size += OPAQUE_ITEM_BYTES
+    return size
+
+
+def is_error_result(value: Sequence[Any]) -> bool:
+    """
+    Whether a tool result reports a failure: an item flagged ``isError``, or
+    a JSON object with an "error" key (how the agents report caught errors).
+    Such results must not be cached, or the failure would be served as the
+    answer for a whole TTL.
+    """
+    for item in value:
+        if getattr(item, "isError", False):
+            return True
+        text = getattr(item, "text", None)
+        if isinstance(text, str) and text.lstrip().startswith("{") and '"error"' in text:
+            try:
+                data = json.loads(text)
+            except ValueError:
+                continue
+            if isinstance(data, dict) and "error" in data:
+                return True
+    return False
+
+
+@dataclass
+class _Entry:
+    value: Sequence[Any]
+    size: int
+    fresh_until: float
+    stale_until: float
+
+
+@dataclass
+class ToolCacheStats:
+    """
+    Per-tool cache counters.
+    """
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+
+@dataclass
+class CacheLookup:
+    """
+    Result of ``ResponseCache.lookup``. ``value`` is None on a miss.
+    """
+    value: Optional[Sequence[Any]] = None
+    stale: bool = False
+
+
+class ResponseCache:
+    """
+    Memory-bounded LRU cache for tool results, keyed by tool name and
+    canonicalized arguments, with a per-tool TTL policy.
+
+    Entries past their TTL but within ``stale_ttl`` are returned flagged as
+    stale so the caller can serve them immediately and refresh in the
+    background (stale-while-revalidate). When the total estimated size
+    exceeds ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        policies: Optional[dict[str, CachePolicy]] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.policies = dict(DEFAULT_CACHE_POLICIES if policies is None else policies)
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._stats: dict[str, ToolCacheStats] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        return tool_name in self.policies
+
+    def lookup(self, tool_name: str, key: str) -> CacheLookup:
+        """
+        Look up a cached result. Expired entries are dropped and count as a miss.
+        """
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats_for(tool_name)
+            entry = self._entries.get((tool_name, key))
+            if entry is None:
+                stats.misses += 1
+                return CacheLookup()
+
+            if now < entry.fresh_until:
+                self._entries.move_to_end((tool_name, key))
+                stats.hits += 1
+                return CacheLookup(value=entry.value)
+
+            if now < entry.stale_until:
+                self._entries.move_to_end((tool_name, key))
+                stats.stale_hits += 1
+                return CacheLookup(value=entry.value, stale=True)
+
+            self._remove((tool_name, key))
+            stats.misses += 1
+            return CacheLookup()
+
+    def store(self, tool_name: str, key: str, value: Sequence[Any]) -> None:
+        """
+        Store a result under the tool's policy. No-op for uncacheable tools
+        or results larger than the whole cache.
+        """
+        policy = self.policies.get(tool_name)
+        if policy is None:
+            return
+
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        now = time.monotonic()
+        entry = _Entry(
+            value=tuple(value),
+            size=size,
+            fresh_until=now + policy.ttl,
+            stale_until=now + policy.ttl + policy.stale_ttl,
+        )
+        with self._lock:
+            self._remove((tool_name, key))
+            self._entries[(tool_name, key)] = entry
+            self._total_bytes += size
+            stats = self._stats_for(tool_name)
+            stats.entries += 1
+            stats.bytes += size
+            self._evict()
+
+    def invalidate(self, tool_name: Optional[str] = None) -> None:
+        """
+        Drop all entries, or only those belonging to ``tool_name``.
+        """
+        with self._lock:
+            keys = [k for k in self._entries if tool_name is None or k[0] == tool_name]
+            for k in keys:
+                self._remove(k)
+
+    def stats(self) -> dict[str, dict]:
+        """
+        Return per-tool hit/miss/eviction counters plus current occupancy.
+        """
+        with self._lock:
+            return {name: vars(s).copy() for name, s in self._stats.items()}
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # -------------------------------------------------------------------
+    # Internal Methods (caller holds the lock)
+    # -------------------------------------------------------------------
+
+    def _stats_for(self, tool_name: str) -> ToolCacheStats:
+        stats = self._stats.get(tool_name)
+        if stats is None:
+            stats = self._stats[tool_name] = ToolCacheStats()
+        return stats
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry.size
+            stats = self._stats_for(key[0])
+            stats.entries -= 1
+            stats.bytes -= entry.size
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self._stats_for(key[0]).evictions += 1
+
+
+def build_response_cache(settings: "Settings") -> ResponseCache:
+    """
+    Create the response cache selected by ``settings.cache_backend``: "memory"
+    (per process), "sqlite" (shared by every process using the same store
+    directory) or "auto" (sqlite when running several workers).
+
+    With the weather grid cache enabled the weather tools are left to it,
+    unless ``settings.cache_ttls`` sets a TTL for them explicitly.
+    """
+    backend = settings.cache_backend
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"Invalid cache backend: {backend}. Expected one of: {', '.join(CACHE_BACKENDS)}")
+    policies = build_cache_policies(settings.cache_ttls)
+    if settings.weather_grid > 0:
+        for tool_name in WEATHER_GRID_TOOLS - settings.cache_ttls.keys():
+            policies.pop(tool_name, None)
+    if backend == "sqlite" or (backend == "auto" and settings.server_workers > 1):
+        from .sqlite_cache import SQLiteResponseCache
+        return SQLiteResponseCache(Path(settings.store_dir) / settings.cache_file, policies, settings.cache_max_bytes)
+    return ResponseCache(policies=policies, max_bytes=settings.cache_max_bytes)
@@ -0,0 +1,445 @@
+import os
+import threading
+import tomllib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar
+
+from dotenv import load_dotenv
+
+from .logging import get_logger
+
+DEFAULT_CONFIG_FILE = "mcpagentai.toml"
+DEFAULT_ENABLED_AGENTS = ["twitter"]
+
+T = TypeVar("T")
+
+logger = get_logger("mcpagentai.config")
+
+
+@dataclass
+class AgentConfig:
+    """
+    Which agents the server exposes and how they are constructed.
+
+    Attributes:
+        enabled: Agent names (see ``AGENT_SPECS``) registered with the server.
+        preload: Agents constructed at startup rather than on first use.
+        options: Per-agent constructor keyword arguments.
+    """
+    enabled: list[str] = field(default_factory=lambda: list(DEFAULT_ENABLED_AGENTS))
+    preload: list[str] = field(default_factory=list)
+    options: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Process-wide configuration, parsed once at startup and shared by every agent.
+
+    Values come from environment variables (including ``.env``), then from
+    the TOML config file, then from the defaults below.
+    """
+    # -- General --------------------------------------------------------
+    local_timezone: Optional[str] = None
+    run_agent: bool = False
+    personality_config: str = "tech_expert.json"
+    store_dir: str = "store"
+
+    # -- Server transport -----------------------------------------------
+    server_transport: str = "stdio"
+    server_workers: int = 1
+    server_host: str = "127.0.0.1"
+    server_port: int = 8000
+    server_max_connections: int = 100
+    server_connection_rate: float = 20.0
+    server_connection_burst: int = 40
+    server_drain_timeout: float = 30.0
+
+    # -- API keys -------------------------------------------------------
+    anthropic_api_key: Optional[str] = None
+    freecurrency_api_key: str = "<your_key>"
+    alphavantage_api_key: Optional[str] = None
+    twitter_bearer_token: Optional[str] = None
+    twitter_api_key: Optional[str] = None
+    twitter_api_secret: Optional[str] = None
+    twitter_access_token: Optional[str] = None
+    twitter_access_secret: Optional[str] = None
+
+    # -- Upstream endpoints ---------------------------------------------
+    open_meteo_url: str = "https://api.open-meteo.com/v1"
+    coingecko_url: str = "https://api.coingecko.com/api/v3"
+    alphavantage_url: str = "https://www.alphavantage.co/query"
+    freecurrency_url: str = "https://api.freecurrencyapi.com/v1"
+    eliza_api_url: Optional[str] = None
+    eliza_path: Optional[str] = None
+
+    # -- HTTP client ----------------------------------------------------
+    http_connect_timeout: float = 5.0
+    http_read_timeout: float = 15.0
+    http_pool_maxsize: int = 10
+
+    # -- Upstream resilience --------------------------------------------
+    upstream_failure_threshold: int = 5
+    upstream_open_seconds: float = 30.0
+    upstream_max_open_seconds: float = 300.0
+    upstream_max_attempts: int = 3
+    upstream_backoff_base: float = 0.2
+    upstream_backoff_max: float = 5.0
+    upstream_retry_budget: float = 0.1
+    upstream_max_retry_after: float = 10.0
+    upstream_max_concurrency: int = 32
+    upstream_queue_timeout: float = 2.0
+
+    # -- Concurrency ----------------------------------------------------
+    agent_max_workers: int = 16
+    tool_timeout: float = 30.0
+    tool_timeouts: dict[str, float] = field(default_factory=dict)
+    batch_max_parallel: int = 8
+    batch_max_items: int = 50
+
+    # -- Scheduling -----------------------------------------------------
+    scheduler_max_concurrent: int = 0   # 0: agent_max_workers
+    scheduler_interactive_reserve: int = 4
+    scheduler_queue_interactive: int = 64
+    scheduler_queue_background: int = 16
+    scheduler_queue_prefetch: int = 8
+
+    # -- Response cache -------------------------------------------------
+    cache_max_bytes: int = 32 * 1024 * 1024
+    cache_ttls: dict[str, float] = field(default_factory=dict)
+    cache_backend: str = "auto"
+    cache_file: str = "cache.sqlite3"
+
+    # -- Weather --------------------------------------------------------
+    weather_batch_size: int = 100
+    weather_batch_max_locations: int = 1000
+    weather_grid: float = 0.05   # degrees; 0 disables the grid cache
+    weather_cache_max_entries: int = 4096
+    weather_forecast_update_interval: float = 3600.0
+
+    # -- Gazetteer ------------------------------------------------------
+    gazetteer_source: str = ""   # empty: the bundled city list
+    gazetteer_index: str = "gazetteer.idx"
+
+    # -- Logging --------------------------------------------------------
+    log_level: str = "INFO"
+    log_format: str = "color"
+    log_debug_sample_rate: int = 1
+
+    # -- Metrics --------------------------------------------------------
+    metrics_file: str = "metrics.prom"
+    metrics_export_interval: float = 15.0
+
+    # -- Tracing --------------------------------------------------------
+    trace_enabled: bool = False
+    trace_dir: str = "traces"
+
+    # -- Profiling ------------------------------------------------------
+    profile_enabled: bool = False
+    profile_sample_every: int = 100
+    profile_slow_ms: float = 0.0
+    profile_interval_ms: float = 5.0
+    profile_dir: str = "profiles"
+    profile_max_files: int = 500
+
+    # -- Memory ---------------------------------------------------------
+    memory_file: str = "memory.jsonl"
+    memory_report_interval: float = 300.0
+    memory_tracemalloc_frames: int = 0
+    memory_top_sites: int = 15
+
+    # -- Agents ---------------------------------------------------------
+    agents: AgentConfig = field(default_factory=AgentConfig)
+
+
+def _split_list(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _parse_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _parse_ttls(value: Any) -> dict[str, float]:
+    """
+    Per-tool seconds (cache TTLs, timeouts). Accept either a TOML table or
+    an env string like ``get_crypto_price=30,get_crypto_info=3600``.
+    """
+    if isinstance(value, dict):
+        return {str(k): float(v) for k, v in value.items()}
+    ttls = {}
+    for item in _split_list(str(value)):
+        tool, _, seconds = item.partition("=")
+        ttls[tool.strip()] = float(seconds)
+    return ttls
+
+
+def _read_config_file(path: Optional[str]) -> dict[str, Any]:
+    config_path = path or os.getenv("MCPAGENTAI_CONFIG")
+    if config_path is None and Path(DEFAULT_CONFIG_FILE).is_file():
+        config_path = DEFAULT_CONFIG_FILE
+    if not config_path:
+        return {}
+    with open(config_path, "rb") as f:
+        data = tomllib.load(f)
+    logger.debug("Loaded config file %s", config_path)
+    return data
+
+
+def _load_agent_config(file_data: dict[str, Any], run_agent: bool) -> AgentConfig:
+    config = AgentConfig()
+
+    preload_set = False
+    agents_table = dict(file_data.get("agents", {}))
+    if "enabled" in agents_table:
+        config.enabled = list(agents_table.pop("enabled"))
+    if "preload" in agents_table:
+        config.preload = list(agents_table.pop("preload"))
+        preload_set = True
+    config.options = {
+        name: dict(value) for name, value in agents_table.items() if isinstance(value, dict)
+    }
+
+    if os.getenv("MCPAGENTAI_AGENTS"):
+        config.enabled = _split_list(os.environ["MCPAGENTAI_AGENTS"])
+    if os.getenv("MCPAGENTAI_PRELOAD") is not None:
+        config.preload = _split_list(os.environ["MCPAGENTAI_PRELOAD"])
+        preload_set = True
+
+    # Preload the Twitter agent so its background loops start with the server.
+    if not preload_set and run_agent and "twitter" in config.enabled:
+        config.preload = ["twitter"]
+
+    return config
+
+
+def load_settings(path: Optional[str] = None) -> Settings:
+    """
+    Parse ``.env``, the TOML config file and the environment into a Settings object.
+
+    The TOML file is ``path``, else $MCPAGENTAI_CONFIG, else ``mcpagentai.toml``
+    in the working directory if it exists. Its layout mirrors the sections of
+    Settings::
+
+        [general]   local_timezone, run_agent, personality_config, store_dir
+        [server]    transport (stdio | sse | http), workers, host, port, max_connections,
+                    connection_rate, connection_burst, drain_timeout
+        [api_keys]  anthropic, freecurrency, alphavantage, twitter_*
+        [upstreams] open_meteo, coingecko, alphavantage, freecurrency, eliza_api, eliza_path
+        [http]      connect_timeout, read_timeout, pool_maxsize
+        [resilience] failure_threshold, open_seconds, max_open_seconds, max_attempts,
+                    backoff_base, backoff_max, retry_budget, max_retry_after,
+                    max_concurrency, queue_timeout (all per upstream host)
+        [executor]  max_workers
+        [timeouts]  default (per tool call, 0 disables), tools = { create_tweet = 120, ... }
+        [batch]     max_parallel, max_items
+        [scheduler] max_concurrent (0: executor size), interactive_reserve,
+                    queue_interactive, queue_background, queue_prefetch
+        [cache]     max_bytes, ttl = { get_crypto_price = 30, ... },
+                    backend (auto | memory | sqlite), file (relative to store_dir)
+        [weather]   batch_size (locations per Open-Meteo request), max_locations (per batch tool call),
+                    grid (degrees, 0 disables), cache_max_entries, forecast_update_interval
+        [gazetteer] source (city TSV or GeoNames dump), index (relative to store_dir)
+        [logging]   level, format (color | plain | json), debug_sample_rate
+        [metrics]   file (relative to store_dir), export_interval (0 disables)
+        [trace]     enabled, dir (relative to store_dir)
+        [profiling] enabled, sample_every, slow_ms, interval_ms, dir (relative to store_dir), max_files
+        [memory]    file (relative to store_dir), report_interval (0 disables), tracemalloc_frames, top_sites
+        [agents]    enabled, preload, [agents.<name>] constructor options
+    """
+    load_dotenv()
+    file_data = _read_config_file(path)
+    defaults = Settings()
+
+    def pick(env: str, section: str, key: str, default: T, cast: Callable[[Any], T] = str) -> T:
+        raw = os.getenv(env)
+        if raw is not None and raw != "":
+            return cast(raw)
+        value = file_data.get(section, {}).get(key)
+        return cast(value) if value is not None else default
+
+    run_agent = pick("RUN_AGENT", "general", "run_agent", defaults.run_agent, _parse_bool)
+
+    return Settings(
+        local_timezone=pick("LOCAL_TIMEZONE", "general", "local_timezone", defaults.local_timezone),
+        run_agent=run_agent,
+        personality_config=pick("PERSONALITY_CONFIG", "general", "personality_config", defaults.personality_config),
+        store_dir=pick("STORE_DIR", "general", "store_dir", defaults.store_dir),
+
+        server_transport=pick("SERVER_TRANSPORT", "server", "transport", defaults.server_transport),
+        server_workers=pick("SERVER_WORKERS", "server", "workers", defaults.server_workers, int),
+        server_host=pick("SERVER_HOST", "server", "host", defaults.server_host),
+        server_port=pick("SERVER_PORT", "server", "port", defaults.server_port, int),
+        server_max_connections=pick(
+            "SERVER_MAX_CONNECTIONS", "server", "max_connections", defaults.server_max_connections, int
+        ),
+        server_connection_rate=pick(
+            "SERVER_CONNECTION_RATE", "server", "connection_rate", defaults.server_connection_rate, float
+        ),
+        server_connection_burst=pick(
+            "SERVER_CONNECTION_BURST", "server", "connection_burst", defaults.server_connection_burst, int
+        ),
+        server_drain_timeout=pick(
+            "SERVER_DRAIN_TIMEOUT", "server", "drain_timeout", defaults.server_drain_timeout, float
+        ),
+
+        anthropic_api_key=pick("ANTHROPIC_API_KEY", "api_keys", "anthropic", defaults.anthropic_api_key),
+        freecurrency_api_key=pick("FREECURRENCY_API_KEY", "api_keys", "freecurrency", defaults.freecurrency_api_key),
+        alphavantage_api_key=pick("ALPHA_VANTAGE_API_KEY", "api_keys", "alphavantage", defaults.alphavantage_api_key),
+        twitter_bearer_token=pick("TWITTER_BEARER_TOKEN", "api_keys", "twitter_bearer_token", defaults.twitter_bearer_token),
+        twitter_api_key=pick("TWITTER_API_KEY", "api_keys", "twitter_api_key", defaults.twitter_api_key),
+        twitter_api_secret=pick("TWITTER_API_SECRET", "api_keys", "twitter_api_secret", defaults.twitter_api_secret),
+        twitter_access_token=pick("TWITTER_ACCESS_TOKEN", "api_keys", "twitter_access_token", defaults.twitter_access_token),
+        twitter_access_secret=pick("TWITTER_ACCESS_SECRET", "api_keys", "twitter_access_secret", defaults.twitter_access_secret),
+
+        open_meteo_url=pick("OPEN_METEO_URL", "upstreams", "open_meteo", defaults.open_meteo_url),
+        coingecko_url=pick("COINGECKO_URL", "upstreams", "coingecko", defaults.coingecko_url),
+        alphavantage_url=pick("ALPHA_VANTAGE_URL", "upstreams", "alphavantage", defaults.alphavantage_url),
+        freecurrency_url=pick("FREECURRENCY_URL", "upstreams", "freecurrency", defaults.freecurrency_url),
+        eliza_api_url=pick("ELIZA_API_URL", "upstreams", "eliza_api", defaults.eliza_api_url),
+        eliza_path=pick("ELIZA_PATH", "upstreams", "eliza_path", defaults.eliza_path),
+
+        http_connect_timeout=pick("HTTP_CONNECT_TIMEOUT", "http", "connect_timeout", defaults.http_connect_timeout, float),
+        http_read_timeout=pick("HTTP_READ_TIMEOUT", "http", "read_timeout", defaults.http_read_timeout, float),
+        http_pool_maxsize=pick("HTTP_POOL_MAXSIZE", "http", "pool_maxsize", defaults.http_pool_maxsize, int),
+
+        upstream_failure_threshold=pick(
+            "UPSTREAM_FAILURE_THRESHOLD", "resilience", "failure_threshold", defaults.upstream_failure_threshold, int
+        ),
+        upstream_open_seconds=pick(
+            "UPSTREAM_OPEN_SECONDS", "resilience", "open_seconds", defaults.upstream_open_seconds, float
+        ),
+        upstream_max_open_seconds=pick(
+            "UPSTREAM_MAX_OPEN_SECONDS", "resilience", "max_open_seconds", defaults.upstream_max_open_seconds, float
+        ),
+        upstream_max_attempts=pick(
+            "UPSTREAM_MAX_ATTEMPTS", "resilience", "max_attempts", defaults.upstream_max_attempts, int
+        ),
+        upstream_backoff_base=pick(
+            "UPSTREAM_BACKOFF_BASE", "resilience", "backoff_base", defaults.upstream_backoff_base, float
+        ),
+        upstream_backoff_max=pick(
+            "UPSTREAM_BACKOFF_MAX", "resilience", "backoff_max", defaults.upstream_backoff_max, float
+        ),
+        upstream_retry_budget=pick(
+            "UPSTREAM_RETRY_BUDGET", "resilience", "retry_budget", defaults.upstream_retry_budget, float
+        ),
+        upstream_max_retry_after=pick(
+            "UPSTREAM_MAX_RETRY_AFTER", "resilience", "max_retry_after", defaults.upstream_max_retry_after, float
+        ),
+        upstream_max_concurrency=pick(
+            "UPSTREAM_MAX_CONCURRENCY", "resilience", "max_concurrency", defaults.upstream_max_concurrency, int
+        ),
+        upstream_queue_timeout=pick(
+            "UPSTREAM_QUEUE_TIMEOUT", "resilience", "queue_timeout", defaults.upstream_queue_timeout, float
+        ),
+
+        agent_max_workers=pick("AGENT_MAX_WORKERS", "executor", "max_workers", defaults.agent_max_workers, int),
+        tool_timeout=pick("TOOL_TIMEOUT", "timeouts", "default", defaults.tool_timeout, float),
+        tool_timeouts=pick("TOOL_TIMEOUTS", "timeouts", "tools", {}, _parse_ttls),
+        batch_max_parallel=pick("BATCH_MAX_PARALLEL", "batch", "max_parallel", defaults.batch_max_parallel, int),
+        batch_max_items=pick("BATCH_MAX_ITEMS", "batch", "max_items", defaults.batch_max_items, int),
+
+        scheduler_max_concurrent=pick(
+            "SCHEDULER_MAX_CONCURRENT", "scheduler", "max_concurrent", defaults.scheduler_max_concurrent, int
+        ),
+        scheduler_interactive_reserve=pick(
+            "SCHEDULER_INTERACTIVE_RESERVE", "scheduler", "interactive_reserve",
+            defaults.scheduler_interactive_reserve, int,
+        ),
+        scheduler_queue_interactive=pick(
+            "SCHEDULER_QUEUE_INTERACTIVE", "scheduler", "queue_interactive", defaults.scheduler_queue_interactive, int
+        ),
+        scheduler_queue_background=pick(
+            "SCHEDULER_QUEUE_BACKGROUND", "scheduler", "queue_background", defaults.scheduler_queue_background, int
+        ),
+        scheduler_queue_prefetch=pick(
+            "SCHEDULER_QUEUE_PREFETCH", "scheduler", "queue_prefetch", defaults.scheduler_queue_prefetch, int
+        ),
+
+        cache_max_bytes=pick("RESPONSE_CACHE_MAX_BYTES", "cache", "max_bytes", defaults.cache_max_bytes, int),
+        cache_ttls=pick("CACHE_TTLS", "cache", "ttl", {}, _parse_ttls),
+        cache_backend=pick("CACHE_BACKEND", "cache", "backend", defaults.cache_backend),
+        cache_file=pick("CACHE_FILE", "cache", "file", defaults.cache_file),
+
+        weather_batch_size=pick("WEATHER_BATCH_SIZE", "weather", "batch_size", defaults.weather_batch_size, int),
+        weather_batch_max_locations=pick(
+            "WEATHER_BATCH_MAX_LOCATIONS", "weather", "max_locations", defaults.weather_batch_max_locations, int
+        ),
+        weather_grid=pick("WEATHER_GRID", "weather", "grid", defaults.weather_grid, float),
+        weather_cache_max_entries=pick(
+            "WEATHER_CACHE_MAX_ENTRIES", "weather", "cache_max_entries", defaults.weather_cache_max_entries, int
+        ),
+        weather_forecast_update_interval=pick(
+            "WEATHER_FORECAST_UPDATE_INTERVAL", "weather", "forecast_update_interval",
+            defaults.weather_forecast_update_interval, float,
+        ),
+
+        gazetteer_source=pick("GAZETTEER_SOURCE", "gazetteer", "source", defaults.gazetteer_source),
+        gazetteer_index=pick("GAZETTEER_INDEX", "gazetteer", "index", defaults.gazetteer_index),
+
+        log_level=pick("LOG_LEVEL", "logging", "level", defaults.log_level),
+        log_format=pick("LOG_FORMAT", "logging", "format", defaults.log_format),
+        log_debug_sample_rate=pick(
+            "LOG_DEBUG_SAMPLE_RATE", "logging", "debug_sample_rate", defaults.log_debug_sample_rate, int
+        ),
+
+        metrics_file=pick("METRICS_FILE", "metrics", "file", defaults.metrics_file),
+        metrics_export_interval=pick(
+            "METRICS_EXPORT_INTERVAL", "metrics", "export_interval", defaults.metrics_export_interval, float
+        ),
+
+        trace_enabled=pick("TRACE_TOOL_CALLS", "trace", "enabled", defaults.trace_enabled, _parse_bool),
+        trace_dir=pick("TRACE_DIR", "trace", "dir", defaults.trace_dir),
+
+        profile_enabled=pick("PROFILE_TOOL_CALLS", "profiling", "enabled", defaults.profile_enabled, _parse_bool),
+        profile_sample_every=pick(
+            "PROFILE_SAMPLE_EVERY", "profiling", "sample_every", defaults.profile_sample_every, int
+        ),
+        profile_slow_ms=pick("PROFILE_SLOW_MS", "profiling", "slow_ms", defaults.profile_slow_ms, float),
+        profile_interval_ms=pick(
+            "PROFILE_INTERVAL_MS", "profiling", "interval_ms", defaults.profile_interval_ms, float
+        ),
+        profile_dir=pick("PROFILE_DIR", "profiling", "dir", defaults.profile_dir),
+        profile_max_files=pick("PROFILE_MAX_FILES", "profiling", "max_files", defaults.profile_max_files, int),
+
+        memory_file=pick("MEMORY_FILE", "memory", "file", defaults.memory_file),
+        memory_report_interval=pick(
+            "MEMORY_REPORT_INTERVAL", "memory", "report_interval", defaults.memory_report_interval, float
+        ),
+        memory_tracemalloc_frames=pick(
+            "MEMORY_TRACEMALLOC_FRAMES", "memory", "tracemalloc_frames", defaults.memory_tracemalloc_frames, int
+        ),
+        memory_top_sites=pick("MEMORY_TOP_SITES", "memory", "top_sites", defaults.memory_top_sites, int),
+
+        agents=_load_agent_config(file_data, run_agent),
+    )
+
+
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """
+    Return the process-wide Settings, loading them on first use.
+    """
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = load_settings()
+    return _settings
+
+
+def set_settings(settings: Optional[Settings]) -> None:
+    """
+    Replace the process-wide Settings (e.g. after loading an explicit config
+    file). Passing None forces a reload on next access.
+    """
+    global _settings
+    with _settings_lock:
+        _settings = settings
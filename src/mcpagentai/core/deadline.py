@@ -0,0 +1,134 @@
+import asyncio
+import subprocess
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from mcpagentai.defs import ElizaTools, TwitterTools
+
+# Absolute time.monotonic() deadline of the request being served in this
+# context. Context variables are copied into executor threads by
+# ``run_blocking`` and into tasks on creation, so the deadline follows the
+# work wherever it runs.
+_deadline: ContextVar[Optional[float]] = ContextVar("mcpagentai_deadline", default=None)
+
+# Tools that need more than the server default (LLM generation plus a
+# Node.js subprocess, or a remote agent that generates its answer).
+DEFAULT_TOOL_TIMEOUTS: dict[str, float] = {
+    TwitterTools.CREATE_TWEET.value: 120.0,
+    TwitterTools.REPLY_TWEET.value: 120.0,
+    ElizaTools.MESSAGE_AGENT.value: 60.0,
+}
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when the request's time budget runs out before ``what`` could finish.
+    """
+
+    def __init__(self, what: str):
+        self.what = what
+        super().__init__(f"Deadline exceeded: {what}")
+
+
+def build_tool_timeouts(overrides: Optional[dict[str, float]] = None) -> dict[str, float]:
+    """
+    Return the per-tool defaults with configured overrides applied
+    (0 or less removes the bound for that tool).
+    """
+    timeouts = dict(DEFAULT_TOOL_TIMEOUTS)
+    timeouts.update(overrides or {})
+    return timeouts
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float], inherit: bool = True) -> Iterator[Optional[float]]:
+    """
+    Bound the enclosed work to ``seconds`` (None or <= 0: unbounded).
+
+    A scope never extends an enclosing deadline unless ``inherit`` is False,
+    which starts a fresh budget (for background work that outlives the
+    request that triggered it). Yields the absolute monotonic deadline.
+    """
+    deadline = time.monotonic() + seconds if seconds is not None and seconds > 0 else None
+    if inherit:
+        current = _deadline.get()
+        if current is not None and (deadline is None or current < deadline):
+            deadline = current
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """
+    Seconds left in the current budget, or None if the work is unbounded.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline(what: str) -> None:
+    """
+    Cooperative cancellation point: raise DeadlineExceeded if the budget is spent.
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(what)
+
+
+def bound_timeout(timeout: Optional[float], what: str) -> Optional[float]:
+    """
+    Clamp a per-operation timeout to the remaining budget. Raises
+    DeadlineExceeded if nothing is left.
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded(what)
+    return left if timeout is None else min(timeout, left)
+
+
+def _clamp(timeout: Optional[float]) -> Optional[float]:
+    # Like bound_timeout, but an exhausted budget becomes a zero timeout so the
+    # caller's timeout handling (killing a subprocess) still runs.
+    left = remaining()
+    if left is None:
+        return timeout
+    left = max(left, 0.0)
+    return left if timeout is None else min(timeout, left)
+
+
+def communicate(process: subprocess.Popen, timeout: Optional[float], what: str) -> tuple[bytes, bytes]:
+    """
+    ``process.communicate()`` bounded by ``timeout`` and the current deadline;
+    the process is killed if it does not finish in time.
+    """
+    try:
+        return process.communicate(timeout=_clamp(timeout))
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        raise DeadlineExceeded(what) from None
+
+
+async def communicate_async(
+    process: asyncio.subprocess.Process,
+    timeout: Optional[float],
+    what: str,
+) -> tuple[bytes, bytes]:
+    """
+    Async variant of ``communicate`` for ``asyncio.create_subprocess_exec``.
+    """
+    try:
+        return await asyncio.wait_for(process.communicate(), _clamp(timeout))
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise DeadlineExceeded(what) from None
@@ -0,0 +1,67 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Optional
+
+from .logging import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: no workers to elect among
+    fcntl = None
+
+logger = get_logger("mcpagentai.election")
+
+
+class LeaderLock:
+    """
+    Leader election among the worker processes of one server, using an
+    exclusive ``flock`` on a file in the store directory.
+
+    Whoever holds the lock is the leader. The kernel drops the lock when the
+    holder exits (or crashes), so a standby worker polling ``try_acquire``
+    takes over without any heartbeat. Where flock is unavailable every
+    process is its own leader.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None or fcntl is None
+
+    def try_acquire(self) -> bool:
+        """
+        Take the lock without blocking; True if this process is now the leader.
+        """
+        if self.is_leader:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        # Informational only: shows which worker leads.
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is not None:
+            fd, self._fd = self._fd, None
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+
+async def wait_for_leadership(lock: LeaderLock, interval: float = 5.0) -> None:
+    """
+    Return once ``lock`` is held by this process, polling every ``interval`` seconds.
+    """
+    while not lock.try_acquire():
+        await asyncio.sleep(interval)
+    logger.info("Process %d is now the leader (%s)", os.getpid(), lock.path.name)
@@ -0,0 +1,60 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .config import get_settings
+from .logging import get_logger
+from .profiling import run_attached
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+logger = get_logger("mcpagentai.executor")
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Return the process-wide bounded thread pool used to run blocking agent code.
+
+    The pool size comes from ``Settings.agent_max_workers`` and is fixed for
+    the lifetime of the pool.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = get_settings().agent_max_workers
+                _executor = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix="mcpagentai-worker",
+                )
+                logger.debug("Created agent executor with %s workers", max_workers)
+    return _executor
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking callable on the shared executor and await its result.
+
+    The caller's context variables are copied into the worker thread so that
+    per-request state set on the event loop stays visible to the callable,
+    and a profiled tool call keeps being sampled while it runs there.
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, run_attached, func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(), call)
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """
+    Shut down the shared executor. A new one is created on next use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
@@ -0,0 +1,518 @@
+"""
+Offline gazetteer: city names and aliases to coordinates, and coordinates
+to the nearest city, without any network call.
+
+Places are compiled from a TSV (the bundled ``data/cities.tsv``) or a
+GeoNames ``cities*.txt`` dump into one binary index, which is opened with
+``mmap`` read-only: every worker process maps the same page-cache pages
+instead of holding its own copy, and opening it parses nothing. The index
+holds
+
+- a table of normalized names and aliases sorted by key, so exact and
+  prefix lookups are binary searches (a flattened trie); fuzzy lookups
+  scan only the keys that share the query's first letters, with a bounded
+  edit distance;
+- a max tree over that table's populations (an implicit segment tree of
+  key positions), so the most populous places among all keys with a
+  prefix come out in order without scanning the whole prefix range;
+- the places in implicit k-d tree order over unit vectors on the sphere
+  (each subtree is a contiguous range split at its median), so a
+  nearest-city lookup descends the tree without storing any pointers.
+
+Rebuild the index from a GeoNames dump with::
+
+    python -m mcpagentai.core.gazetteer cities15000.txt store/gazetteer.idx
+"""
+
+import argparse
+import heapq
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from mcpagentai.defs import GazetteerPlace
+from .config import get_settings
+from .logging import get_logger
+
+logger = get_logger("mcpagentai.gazetteer")
+
+BUNDLED_SOURCE = Path(__file__).resolve().parent.parent / "data" / "cities.tsv"
+
+MAGIC = b"MGAZ"
+VERSION = 2
+# magic, version, byte order (b"<" or b">"), places, keys, string bytes
+HEADER = struct.Struct("<4sHcxIII")
+BYTE_ORDER = b"<" if sys.byteorder == "little" else b">"
+ALIGN = 8
+
+EARTH_RADIUS_KM = 6371.0088
+# Column count of a GeoNames "geoname" table row.
+GEONAMES_COLUMNS = 19
+
+
+class _Place(NamedTuple):
+    name: str
+    country: str
+    lat: float
+    lon: float
+    population: int
+    aliases: tuple[str, ...]
+
+
+def normalize(text: str) -> str:
+    """
+    Lookup key of a name: accents stripped, case-folded, punctuation as
+    single spaces ("Québec" -> "quebec", "St. Louis" -> "st louis").
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+    return " ".join("".join(ch if ch.isalnum() else " " for ch in stripped).split())
+
+
+class Gazetteer:
+    """
+    Read-only view of a compiled gazetteer index. Safe to share between
+    threads; lookups allocate only their results.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, byte_order, places, keys, string_bytes = HEADER.unpack_from(self._map)
+            if magic != MAGIC or version != VERSION or byte_order != BYTE_ORDER:
+                raise ValueError(f"{self.path} is not a gazetteer index (version {VERSION}) for this platform.")
+            view = memoryview(self._map)
+            sections = _layout(places, keys, string_bytes)
+            self._points = view[sections["points"]].cast("f")
+            self._coords = view[sections["coords"]].cast("f")
+            self._population = view[sections["population"]].cast("I")
+            self._names = view[sections["names"]].cast("I")
+            self._countries = view[sections["countries"]]
+            self._keys = view[sections["keys"]].cast("I")
+            self._ranks = view[sections["ranks"]].cast("I")
+            self._strings = view[sections["strings"]]
+        except Exception:
+            self._map.close()
+            raise
+        self.places = places
+        self.keys = keys
+
+    def __len__(self) -> int:
+        return self.places
+
+    def place(self, index: int, match: str, distance_km: Optional[float] = None) -> GazetteerPlace:
+        offset, length = self._names[2 * index], self._names[2 * index + 1]
+        return GazetteerPlace(
+            name=str(self._strings[offset:offset + length], "utf-8"),
+            country=str(self._countries[2 * index:2 * index + 2], "ascii").strip(),
+            latitude=round(self._coords[2 * index], 5),
+            longitude=round(self._coords[2 * index + 1], 5),
+            population=self._population[index],
+            match=match,
+            distance_km=None if distance_km is None else round(distance_km, 2),
+        )
+
+    def lookup(self, query: str, limit: int = 5) -> list[GazetteerPlace]:
+        """
+        Places whose name or alias matches ``query``: exact matches first,
+        then names starting with it, largest population first; if neither
+        matches, names within a small edit distance. A trailing ", CC"
+        restricts matches to that ISO country code ("Paris, US").
+        """
+        name, country = _split_country(query)
+        key = normalize(name).encode()
+        if not key or limit < 1:
+            return []
+
+        # The key itself sorts first in its prefix range; keys never contain
+        # a NUL byte, so the exact matches end where ``key + NUL`` would go.
+        start, end = self._prefix_range(key)
+        exact_end = self._lower_bound(key + b"\x00")
+        ranked: dict[int, str] = {}
+        for position in range(start, exact_end):
+            # Entries of one key are stored largest population first.
+            index = self._keys[3 * position + 2]
+            if not country or self._country(index) == country:
+                ranked.setdefault(index, "exact")
+        for position in self._most_populous(exact_end, end):
+            if len(ranked) >= limit:
+                break
+            index = self._keys[3 * position + 2]
+            if not country or self._country(index) == country:
+                ranked.setdefault(index, "prefix")
+
+        if not ranked:
+            ranked = dict.fromkeys(self._fuzzy(key, country), "fuzzy")
+        return [self.place(index, match) for index, match in list(ranked.items())[:limit]]
+
+    def resolve(self, query: str) -> Optional[GazetteerPlace]:
+        """
+        The best match for ``query``, or None.
+        """
+        matches = self.lookup(query, limit=1)
+        return matches[0] if matches else None
+
+    def nearest(self, lat: float, lon: float, limit: int = 1) -> list[GazetteerPlace]:
+        """
+        The ``limit`` places closest to (lat, lon), by great-circle distance.
+        """
+        if not self.places or limit < 1:
+            return []
+        target = _unit_vector(lat, lon)
+        points = self._points
+        best: list[tuple[float, int]] = []  # max-heap of (-chord², index)
+
+        def visit(lo: int, hi: int, axis: int) -> None:
+            if lo >= hi:
+                return
+            mid = (lo + hi) // 2
+            base = 3 * mid
+            dx = target[0] - points[base]
+            dy = target[1] - points[base + 1]
+            dz = target[2] - points[base + 2]
+            chord2 = dx * dx + dy * dy + dz * dz
+            if len(best) < limit:
+                heapq.heappush(best, (-chord2, mid))
+            elif chord2 < -best[0][0]:
+                heapq.heapreplace(best, (-chord2, mid))
+
+            split = target[axis] - points[base + axis]
+            near, far = ((lo, mid), (mid + 1, hi)) if split < 0 else ((mid + 1, hi), (lo, mid))
+            next_axis = (axis + 1) % 3
+            visit(near[0], near[1], next_axis)
+            if len(best) < limit or split * split < -best[0][0]:
+                visit(far[0], far[1], next_axis)
+
+        visit(0, self.places, 0)
+        return [
+            self.place(index, "nearest", 2 * EARTH_RADIUS_KM * math.asin(min(math.sqrt(-neg) / 2, 1.0)))
+            for neg, index in sorted(best, reverse=True)
+        ]
+
+    def close(self) -> None:
+        for view in (self._points, self._coords, self._population, self._names,
+                     self._countries, self._keys, self._ranks, self._strings):
+            view.release()
+        self._map.close()
+
+    # -------------------------------------------------------------------
+    # Internal Methods
+    # -------------------------------------------------------------------
+
+    def _key(self, position: int) -> bytes:
+        offset, length = self._keys[3 * position], self._keys[3 * position + 1]
+        return bytes(self._strings[offset:offset + length])
+
+    def _country(self, index: int) -> str:
+        return str(self._countries[2 * index:2 * index + 2], "ascii").strip()
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self.keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _prefix_range(self, prefix: bytes) -> tuple[int, int]:
+        # Keys starting with ``prefix`` are contiguous; 0xFF never occurs in UTF-8.
+        return self._lower_bound(prefix), self._lower_bound(prefix + b"\xff")
+
+    def _position_population(self, position: int) -> int:
+        return self._population[self._keys[3 * position + 2]]
+
+    def _top_position(self, lo: int, hi: int) -> int:
+        # Most populous key position in [lo, hi) (the first one on ties),
+        # from the O(log n) tree nodes that exactly cover the range.
+        ranks, best, best_population = self._ranks, hi, -1
+        lo += self.keys
+        hi += self.keys
+        while lo < hi:
+            if lo & 1:
+                candidates = (ranks[lo],)
+                lo += 1
+            else:
+                candidates = ()
+            if hi & 1:
+                hi -= 1
+                candidates += (ranks[hi],)
+            for position in candidates:
+                population = self._position_population(position)
+                if population > best_population or (population == best_population and position < best):
+                    best, best_population = position, population
+            lo //= 2
+            hi //= 2
+        return best
+
+    def _most_populous(self, lo: int, hi: int):
+        # Key positions in [lo, hi), largest population first: take the
+        # range's maximum, then search the ranges on either side of it.
+        heap: list[tuple[int, int, int, int]] = []
+
+        def push(start: int, stop: int) -> None:
+            if start < stop:
+                position = self._top_position(start, stop)
+                heapq.heappush(heap, (-self._position_population(position), position, start, stop))
+
+        push(lo, hi)
+        while heap:
+            _, position, start, stop = heapq.heappop(heap)
+            yield position
+            push(start, position)
+            push(position + 1, stop)
+
+    def _fuzzy(self, key: bytes, country: str) -> list[int]:
+        # Typos rarely hit the first letters: try keys sharing the first two,
+        # then the first one.
+        if len(key) < 3:
+            return []
+        max_edits = 1 if len(key) <= 7 else 2
+        for anchor in (key[:2], key[:1]):
+            start, end = self._prefix_range(anchor)
+            best: dict[int, int] = {}
+            for position in range(start, end):
+                if abs(self._keys[3 * position + 1] - len(key)) > max_edits:
+                    continue
+                distance = _edit_distance(key, self._key(position), max_edits)
+                if distance > max_edits:
+                    continue
+                index = self._keys[3 * position + 2]
+                if country and self._country(index) != country:
+                    continue
+                if distance < best.get(index, max_edits + 1):
+                    best[index] = distance
+            if best:
+                return sorted(best, key=lambda index: (best[index], -self._population[index]))
+        return []
+
+
+def read_places(source: str | Path) -> list[_Place]:
+    """
+    Parse the bundled TSV (name, country, lat, lon, population, aliases)
+    or a GeoNames dump (detected by its column count).
+    """
+    places = []
+    with open(source, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            try:
+                if len(fields) >= GEONAMES_COLUMNS:
+                    aliases = (fields[2], *fields[3].split(","))
+                    places.append(_Place(
+                        fields[1], fields[8], float(fields[4]), float(fields[5]), int(fields[14] or 0), aliases
+                    ))
+                else:
+                    aliases = tuple(fields[5].split(",")) if len(fields) > 5 else ()
+                    places.append(_Place(
+                        fields[0], fields[1], float(fields[2]), float(fields[3]), int(fields[4] or 0), aliases
+                    ))
+            except (IndexError, ValueError):
+                raise ValueError(f"{source}:{line_number}: not a gazetteer row")
+    return places
+
+
+def write_index(places: list[_Place], path: str | Path) -> None:
+    """
+    Compile ``places`` into an index at ``path``, replacing it atomically
+    (workers may be reading the old one).
+    """
+    order = list(range(len(places)))
+    _kd_order(order, [_unit_vector(place.lat, place.lon) for place in places], 0, len(order), 0)
+    places = [places[index] for index in order]
+
+    strings = bytearray()
+    points, coords, population, names = array("f"), array("f"), array("I"), array("I")
+    countries = bytearray()
+    entries: list[tuple[bytes, int, int]] = []
+    for index, place in enumerate(places):
+        points.extend(_unit_vector(place.lat, place.lon))
+        coords.extend((place.lat, place.lon))
+        population.append(min(max(place.population, 0), 0xFFFFFFFF))
+        encoded = place.name.encode()
+        names.extend((len(strings), len(encoded)))
+        strings += encoded
+        countries += place.country.encode("ascii", "replace")[:2].ljust(2)
+        for key in dict.fromkeys(normalize(name).encode() for name in (place.name, *place.aliases)):
+            if key:
+                entries.append((key, -place.population, index))
+
+    entries.sort()
+    keys = array("I")
+    key_offsets: dict[bytes, int] = {}
+    for key, _, index in entries:
+        if key not in key_offsets:
+            key_offsets[key] = len(strings)
+            strings += key
+        keys.extend((key_offsets[key], len(key), index))
+    ranks = _rank_tree([-population for _, population, _ in entries])
+
+    sections = _layout(len(places), len(entries), len(strings))
+    blob = bytearray(sections["strings"].stop)
+    blob[:HEADER.size] = HEADER.pack(MAGIC, VERSION, BYTE_ORDER, len(places), len(entries), len(strings))
+    for name, data in (("points", points), ("coords", coords), ("population", population),
+                       ("names", names), ("countries", countries), ("keys", keys), ("ranks", ranks),
+                       ("strings", strings)):
+        blob[sections[name]] = bytes(data)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(blob)
+    os.replace(tmp, path)
+
+
+def build_index(source: str | Path, path: str | Path) -> int:
+    """
+    Compile ``source`` into an index at ``path``; returns the number of places.
+    """
+    places = read_places(source)
+    write_index(places, path)
+    logger.info("Built gazetteer index %s: %d places from %s", path, len(places), source)
+    return len(places)
+
+
+def open_gazetteer(source: str | Path, path: str | Path) -> Gazetteer:
+    """
+    Open the index at ``path``, (re)building it first if it is missing,
+    older than ``source`` or from another format version.
+    """
+    path = Path(path)
+    if not path.exists() or path.stat().st_mtime < Path(source).stat().st_mtime:
+        build_index(source, path)
+    try:
+        return Gazetteer(path)
+    except ValueError:
+        build_index(source, path)
+        return Gazetteer(path)
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """
+    Return the process-wide Gazetteer, building its index on first use.
+    """
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                settings = get_settings()
+                source = settings.gazetteer_source or BUNDLED_SOURCE
+                _gazetteer = open_gazetteer(source, Path(settings.store_dir) / settings.gazetteer_index)
+    return _gazetteer
+
+
+# -------------------------------------------------------------------
+# Internal Methods
+# -------------------------------------------------------------------
+
+def _layout(places: int, keys: int, string_bytes: int) -> dict[str, slice]:
+    # Byte range of each section, in file order, aligned to ALIGN.
+    sizes = {
+        "points": 12 * places,
+        "coords": 8 * places,
+        "population": 4 * places,
+        "names": 8 * places,
+        "countries": 2 * places,
+        "keys": 12 * keys,
+        "ranks": 8 * keys,
+        "strings": string_bytes,
+    }
+    sections = {}
+    offset = HEADER.size
+    for name, size in sizes.items():
+        offset = -(-offset // ALIGN) * ALIGN
+        sections[name] = slice(offset, offset + size)
+        offset += size
+    return sections
+
+
+def _rank_tree(populations: list[int]) -> array:
+    # Implicit segment tree over key positions: leaf n + i holds position i,
+    # node i (1 <= i < n) the more populous of nodes 2i and 2i + 1, the
+    # earlier one on ties. Node 0 is unused.
+    n = len(populations)
+    tree = array("I", bytes(8 * n))
+    for position in range(n):
+        tree[n + position] = position
+    for node in range(n - 1, 0, -1):
+        left, right = tree[2 * node], tree[2 * node + 1]
+        if populations[right] > populations[left] or (populations[right] == populations[left] and right < left):
+            left = right
+        tree[node] = left
+    return tree
+
+
+def _unit_vector(lat: float, lon: float) -> tuple[float, float, float]:
+    phi, lam = math.radians(lat), math.radians(lon)
+    return math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+def _kd_order(order: list[int], points: list[tuple[float, float, float]], lo: int, hi: int, axis: int) -> None:
+    # Sort order[lo:hi] into implicit k-d tree order: the median on ``axis``
+    # at the middle, each half recursively on the next axis.
+    if hi - lo <= 1:
+        return
+    order[lo:hi] = sorted(order[lo:hi], key=lambda index: points[index][axis])
+    mid = (lo + hi) // 2
+    _kd_order(order, points, lo, mid, (axis + 1) % 3)
+    _kd_order(order, points, mid + 1, hi, (axis + 1) % 3)
+
+
+def _split_country(query: str) -> tuple[str, str]:
+    # "Paris, US" -> ("Paris", "US"); anything else is all name.
+    name, comma, qualifier = query.rpartition(",")
+    qualifier = qualifier.strip()
+    if comma and len(qualifier) == 2 and qualifier.isalpha():
+        return name, qualifier.upper()
+    return query, ""
+
+
+def _edit_distance(a: bytes, b: bytes, limit: int) -> int:
+    # Levenshtein distance counting a swap of adjacent letters as one edit,
+    # giving up (limit + 1) once every alignment exceeds ``limit``.
+    before, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i]
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if before is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, before[j - 2] + 1)
+            current.append(value)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile a gazetteer index from a city TSV or GeoNames dump.")
+    parser.add_argument("source", nargs="?", default=str(BUNDLED_SOURCE),
+                        help="cities TSV or GeoNames cities*.txt (default: the bundled city list)")
+    parser.add_argument("index", nargs="?", help="output index (default: store_dir/gazetteer_index)")
+    args = parser.parse_args(argv)
+    settings = get_settings()
+    index = args.index or Path(settings.store_dir) / settings.gazetteer_index
+    count = build_index(args.source, index)
+    print(f"{index}: {count} places")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
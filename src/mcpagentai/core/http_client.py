@@ -0,0 +1,324 @@
+import threading
+import time
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from mcpagentai.defs import UpstreamPool
+
+from .config import get_settings
+from .deadline import bound_timeout, remaining
+from .executor import run_blocking
+from .logging import get_logger
+from .metrics import MetricsRegistry, get_metrics
+from .resilience import (
+    OVERLOAD_STATUSES,
+    RETRYABLE_STATUSES,
+    HostGuard,
+    Outcome,
+    ResiliencePolicy,
+    parse_retry_after,
+)
+
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 15.0
+DEFAULT_POOL_MAXSIZE = 10
+
+USER_AGENT = "mcpagentai"
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class HttpClient:
+    """
+    Shared HTTP client used by every agent for upstream API calls.
+
+    Each upstream host (scheme://host:port) gets its own ``requests.Session``
+    with a dedicated keep-alive connection pool, so a burst against one
+    provider cannot starve connections to another. Every request carries a
+    (connect, read) timeout. ``*_async`` variants run the same call on the
+    shared agent executor for use from async code. Request counts, errors
+    and latency are recorded per host in the metrics registry.
+
+    Each host also has a ``HostGuard``: a circuit breaker that fails requests
+    fast (UpstreamUnavailable) while the host is failing, an AIMD concurrency
+    limit that shrinks on 429/503/timeouts, and budgeted retries of idempotent
+    requests with jittered exponential backoff that honors Retry-After. Guard
+    state is reported in the metrics snapshot.
+
+    HTTP/2 is not offered: ``requests``/urllib3 only speak HTTP/1.1, and
+    keep-alive reuse already removes the per-call TCP/TLS handshake.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        metrics: Optional[MetricsRegistry] = None,
+        policy: Optional[ResiliencePolicy] = None,
+    ):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_maxsize = pool_maxsize
+        self.metrics = metrics if metrics is not None else get_metrics()
+        self.policy = policy or ResiliencePolicy()
+        self.logger = get_logger("mcpagentai.http")
+
+        self._sessions: dict[str, requests.Session] = {}
+        self._guards: dict[str, HostGuard] = {}
+        self._lock = threading.Lock()
+        self.metrics.add_upstream_state_source(self.upstream_state)
+        self.metrics.add_upstream_pool_source(self.pool_state)
+
+    # -------------------------------------------------------------------
+    # Sync API
+    # -------------------------------------------------------------------
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        timeout: Optional[float | tuple[float, float]] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """
+        Issue a request through the pool for the URL's host.
+
+        Accepts the same keyword arguments as ``requests.Session.request``.
+        ``timeout`` defaults to ``(connect_timeout, read_timeout)``.
+
+        Timeouts are clamped to the remaining budget of the current request
+        deadline, and DeadlineExceeded is raised once it is spent.
+
+        Raises UpstreamUnavailable without sending anything while the host's
+        circuit is open. Retryable failures of idempotent requests are retried
+        within the host's retry budget; after the last attempt the final
+        response is returned (or its exception raised) as usual.
+        """
+        host = self._host_key(url)
+        session = self._session_for(host)
+        guard = self.guard_for(host)
+
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        retryable = method.upper() in IDEMPOTENT_METHODS
+
+        attempt = 1
+        while True:
+            attempt_timeout = self._bounded(timeout, host)
+            probe = guard.acquire(max_wait=remaining())
+            response, error, retry_after = None, None, None
+            try:
+                with self.metrics.track_host(host):
+                    response = session.request(method, url, timeout=attempt_timeout, **kwargs)
+            except requests.Timeout as e:
+                outcome, error = Outcome.OVERLOAD, e
+            except requests.ConnectionError as e:
+                outcome, error = Outcome.FAILURE, e
+            except BaseException:
+                guard.release(Outcome.NEUTRAL, None, probe)
+                raise
+            else:
+                outcome, retry_after = self._classify(response)
+            # Released before deciding on a retry, so this attempt's failure
+            # can open the circuit and stop the retry.
+            guard.release(outcome, retry_after, probe)
+
+            delay = guard.backoff(attempt, retry_after)
+            if outcome is Outcome.SUCCESS or not self._retry(guard, retryable, attempt, retry_after, delay):
+                if error is not None:
+                    raise error
+                return response
+
+            self.logger.debug("Retrying %s %s in %.2fs (attempt %d)", method, host, delay, attempt + 1)
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    # -------------------------------------------------------------------
+    # Async API
+    # -------------------------------------------------------------------
+
+    async def request_async(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        return await run_blocking(self.request, method, url, **kwargs)
+
+    async def get_async(self, url: str, **kwargs: Any) -> requests.Response:
+        return await self.request_async("GET", url, **kwargs)
+
+    async def post_async(self, url: str, **kwargs: Any) -> requests.Response:
+        return await self.request_async("POST", url, **kwargs)
+
+    # -------------------------------------------------------------------
+    # Introspection / lifecycle
+    # -------------------------------------------------------------------
+
+    def guard_for(self, host_or_url: str) -> HostGuard:
+        """
+        Return the resilience guard of a host (scheme://host:port) or of a URL's host.
+        """
+        host = self._host_key(host_or_url)
+        guard = self._guards.get(host)
+        if guard is None:
+            with self._lock:
+                guard = self._guards.setdefault(host, HostGuard(host, self.policy))
+        return guard
+
+    def upstream_state(self) -> dict:
+        with self._lock:
+            guards = list(self._guards.items())
+        return {host: guard.state() for host, guard in guards}
+
+    def pool_state(self) -> dict[str, UpstreamPool]:
+        """
+        Return per-host connection pool occupancy and the number of
+        connections opened so far (compare with request counts for reuse).
+        """
+        with self._lock:
+            hosts = list(self._sessions.items())
+        result = {}
+        for host, session in hosts:
+            idle = opened = 0
+            pools = session.get_adapter(host).poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                idle += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+                opened += pool.num_connections
+            result[host] = UpstreamPool(maxsize=self.pool_maxsize, idle=idle, connections_opened=opened)
+        return result
+
+    def stats(self) -> dict[str, dict]:
+        """
+        Return per-host request counters and connection pool occupancy.
+        """
+        host_metrics = self.metrics.snapshot().upstream_hosts
+        result = {}
+        for host, pool in self.pool_state().items():
+            stats = host_metrics.get(host)
+            result[host] = {
+                "requests": stats.calls if stats else 0,
+                "errors": stats.errors if stats else 0,
+                "in_flight": stats.in_flight if stats else 0,
+                "avg_seconds": stats.latency.mean_ms / 1000 if stats else 0.0,
+                "pool": pool.model_dump(),
+            }
+        return result
+
+    def close(self) -> None:
+        """
+        Close every pooled session.
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    # -------------------------------------------------------------------
+    # Internal Methods
+    # -------------------------------------------------------------------
+
+    def _retry(
+        self,
+        guard: HostGuard,
+        retryable: bool,
+        attempt: int,
+        retry_after: Optional[float],
+        delay: float,
+    ) -> bool:
+        if not retryable or attempt >= self.policy.max_attempts:
+            return False
+        if retry_after is not None and retry_after > self.policy.max_retry_after:
+            return False
+        left = remaining()
+        if left is not None and delay >= left:
+            # The retry could not finish before the deadline.
+            return False
+        return guard.try_retry()
+
+    @staticmethod
+    def _bounded(timeout: float | tuple[float, float], host: str) -> float | tuple[float, float]:
+        what = f"request to {host}"
+        if isinstance(timeout, tuple):
+            return tuple(bound_timeout(t, what) for t in timeout)
+        return bound_timeout(timeout, what)
+
+    @staticmethod
+    def _classify(response: requests.Response) -> tuple[Outcome, Optional[float]]:
+        status = response.status_code
+        if status < 500 and status != 429:
+            return Outcome.SUCCESS, None
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if status in OVERLOAD_STATUSES:
+            return Outcome.OVERLOAD, retry_after
+        if status in RETRYABLE_STATUSES or status >= 500:
+            return Outcome.FAILURE, retry_after
+        return Outcome.NEUTRAL, retry_after
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        parts = urlsplit(url)
+        if not parts.scheme or not parts.netloc:
+            raise ValueError(f"Invalid upstream URL: {url}")
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _session_for(self, host: str) -> requests.Session:
+        session = self._sessions.get(host)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers["User-Agent"] = USER_AGENT
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+                session.mount(host, adapter)
+                self._sessions[host] = session
+                self.logger.debug("Opened connection pool for %s (maxsize=%s)", host, self.pool_maxsize)
+        return session
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """
+    Return the process-wide HttpClient, creating it on first use.
+
+    Timeouts and pool size come from the ``http_*`` fields of Settings, the
+    resilience policy from the ``upstream_*`` fields.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                settings = get_settings()
+                _client = HttpClient(
+                    connect_timeout=settings.http_connect_timeout,
+                    read_timeout=settings.http_read_timeout,
+                    pool_maxsize=settings.http_pool_maxsize,
+                    policy=ResiliencePolicy(
+                        failure_threshold=settings.upstream_failure_threshold,
+                        open_seconds=settings.upstream_open_seconds,
+                        max_open_seconds=settings.upstream_max_open_seconds,
+                        max_attempts=settings.upstream_max_attempts,
+                        backoff_base=settings.upstream_backoff_base,
+                        backoff_max=settings.upstream_backoff_max,
+                        retry_budget=settings.upstream_retry_budget,
+                        max_retry_after=settings.upstream_max_retry_after,
+                        max_concurrency=settings.upstream_max_concurrency,
+                        queue_timeout=settings.upstream_queue_timeout,
+                    ),
+                )
+    return _client
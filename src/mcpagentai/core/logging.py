@@ -1,4 +1,12 @@
+import atexit
+import json
 import logging
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 
 # ANSI escape codes for colors
 RESET = "\033[0m"
@@ -10,6 +18,13 @@ COLOR_CODES = {
     logging.CRITICAL: "\033[1;31m",  # Bold Red
 }
 
+LOG_FORMATS = ("color", "plain", "json")
+DEFAULT_LOG_LEVEL = "INFO"
+DEFAULT_LOG_FORMAT = "color"
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] [%(name)s]: %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
 
 class ColoredFormatter(logging.Formatter):
     """
@@ -22,9 +37,136 @@ class ColoredFormatter(logging.Formatter):
         return f"{log_color}{formatted_message}{RESET}"
 
 
+class JsonFormatter(logging.Formatter):
+    """
+    One compact JSON object per line, for log shippers.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class DebugSampler(logging.Filter):
+    """
+    Keep one in every ``rate`` DEBUG records per call site (the first one is
+    always kept). Records at INFO and above always pass.
+    """
+
+    def __init__(self, rate: int = 1):
+        super().__init__()
+        self.rate = max(int(rate), 1)
+        self._counts: dict[tuple[str, int], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate == 1 or record.levelno > logging.DEBUG:
+            return True
+        site = (record.pathname, record.lineno)
+        count = self._counts.get(site, 0)
+        self._counts[site] = count + 1
+        return count % self.rate == 0
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that does as little as possible on the calling thread.
+
+    The message itself (``msg % args``) is rendered here, because the args
+    may be live objects the caller changes right after the logging call;
+    timestamps, colors, tracebacks and JSON serialization are left to the
+    writer thread. Records never leave the process, so unlike the stock
+    handler this one neither copies them nor drops ``exc_info``.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+_lock = threading.Lock()
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_queue_handler: Optional[_DeferredQueueHandler] = None
+_stream_handler: Optional[logging.StreamHandler] = None
+_listener: Optional[QueueListener] = None
+_sampler = DebugSampler()
+_level = logging.INFO
+_loggers: dict[str, logging.Logger] = {}
+
+
+def _parse_level(level: str | int) -> int:
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).strip().upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Invalid log level: {level}")
+    return value
+
+
+def _build_formatter(log_format: str) -> logging.Formatter:
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Invalid log format: {log_format}. Expected one of: {', '.join(LOG_FORMATS)}")
+    if log_format == "json":
+        return JsonFormatter()
+    if log_format == "plain":
+        return logging.Formatter(fmt=TEXT_FORMAT, datefmt=DATE_FORMAT)
+    return ColoredFormatter(fmt=TEXT_FORMAT, datefmt=DATE_FORMAT)
+
+
+def _ensure_pipeline() -> None:
+    """
+    Start the background writer on first use, configured from the environment.
+    """
+    global _queue_handler, _stream_handler, _listener, _level
+    if _listener is not None:
+        return
+
+    if _queue_handler is None:
+        _level = _parse_level(os.getenv("LOG_LEVEL") or DEFAULT_LOG_LEVEL)
+        _sampler.rate = max(int(os.getenv("LOG_DEBUG_SAMPLE_RATE") or 1), 1)
+
+        _stream_handler = logging.StreamHandler()
+        _stream_handler.setFormatter(_build_formatter(os.getenv("LOG_FORMAT") or DEFAULT_LOG_FORMAT))
+
+        _queue_handler = _DeferredQueueHandler(_queue)
+        _queue_handler.addFilter(_sampler)
+        atexit.register(shutdown_logging)
+
+    _listener = QueueListener(_queue, _stream_handler, respect_handler_level=False)
+    _listener.start()
+
+
+def _restart_after_fork() -> None:
+    # Only the forking thread survives in a child process: give it a fresh
+    # lock, queue and writer thread (the inherited ones may be mid-use).
+    global _lock, _queue, _listener
+    _lock = threading.Lock()
+    _queue = queue.SimpleQueue()
+    if _queue_handler is not None:
+        _queue_handler.queue = _queue
+        _listener = None
+        _ensure_pipeline()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
 def get_logger(name: str) -> logging.Logger:
     """
-    Return a named logger with colored output.
+    Return a named logger that writes through the shared background queue.
+
+    The level comes from $LOG_LEVEL (default INFO) and the output format from
+    $LOG_FORMAT ("color", "plain" or "json"); ``configure_logging`` changes
+    both at runtime.
 
     Args:
         name (str): The name of the logger.
@@ -32,22 +174,54 @@ def get_logger(name: str) -> logging.Logger:
     Returns:
         logging.Logger: Configured logger instance.
     """
-    logger = logging.getLogger(name)
+    logger = _loggers.get(name)
+    if logger is not None:
+        return logger
 
-    if not logger.handlers:
-        # Create console handler
-        handler = logging.StreamHandler()
+    with _lock:
+        _ensure_pipeline()
+        logger = logging.getLogger(name)
+        if _queue_handler not in logger.handlers:
+            logger.addHandler(_queue_handler)
+        logger.setLevel(_level)
+        # Every logger has its own queue handler; don't also emit via root.
+        logger.propagate = False
+        _loggers[name] = logger
+    return logger
 
-        # Define log format with color support
-        formatter = ColoredFormatter(
-            fmt="%(asctime)s [%(levelname)s] [%(name)s]: %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
 
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+def configure_logging(
+    level: Optional[str | int] = None,
+    log_format: Optional[str] = None,
+    debug_sample_rate: Optional[int] = None,
+) -> None:
+    """
+    Apply logging settings to every logger created through ``get_logger``.
 
-        # Set the default logging level (can be adjusted as needed)
-        logger.setLevel(logging.DEBUG)
+    Args:
+        level: Level name or number, e.g. "DEBUG".
+        log_format: "color", "plain" or "json".
+        debug_sample_rate: Keep one in N DEBUG records per call site.
+    """
+    global _level
+    with _lock:
+        _ensure_pipeline()
+        if level is not None:
+            _level = _parse_level(level)
+            for logger in _loggers.values():
+                logger.setLevel(_level)
+        if log_format is not None:
+            _stream_handler.setFormatter(_build_formatter(log_format))
+        if debug_sample_rate is not None:
+            _sampler.rate = max(int(debug_sample_rate), 1)
 
-    return logger
+
+def shutdown_logging() -> None:
+    """
+    Flush queued records and stop the background writer.
+    """
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
@@ -0,0 +1,218 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Optional
+
+from mcpagentai.defs import AllocationSite, MemoryReport
+
+from .config import get_settings
+from .logging import get_logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = get_logger("mcpagentai.memory")
+
+# Allocations made by the import machinery and by tracemalloc itself are
+# not interesting when looking for growth.
+_IGNORED_FILES = (
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def rss_bytes() -> Optional[int]:
+    """
+    Current resident set size of this process, or None if it cannot be read.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+class MemoryMonitor:
+    """
+    Tracks the process's memory: RSS, the sizes of registered in-process
+    collections and, with ``tracemalloc_frames`` > 0, the allocation sites
+    that grew since startup and since the previous report.
+
+    Components register what they hold with ``watch`` (e.g. the response
+    cache, TwitterAgent.replied_to). ``start`` writes a report as one JSON
+    line to ``path`` every ``interval`` seconds, so growth can be followed
+    over days; ``report`` produces one on demand.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        interval: float = 300.0,
+        tracemalloc_frames: int = 0,
+        top_sites: int = 15,
+    ):
+        self.path = Path(path)
+        self.interval = interval
+        self.tracemalloc_frames = tracemalloc_frames
+        self.top_sites = top_sites
+        self._watches: dict[str, Callable[[], int]] = {}
+        self._lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if tracemalloc_frames > 0:
+            self.start_tracing()
+
+    def watch(self, name: str, size: Callable[[], int]) -> None:
+        """
+        Report ``size()`` under ``name`` (replacing any previous watch of that name).
+        """
+        with self._lock:
+            self._watches[name] = size
+
+    def unwatch(self, name: str) -> None:
+        with self._lock:
+            self._watches.pop(name, None)
+
+    def start_tracing(self) -> None:
+        """
+        Start tracemalloc (if it is not already running) and take the baseline snapshot.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(max(self.tracemalloc_frames, 1))
+        with self._lock:
+            self._baseline = self._previous = self._snapshot()
+
+    def collection_sizes(self) -> dict[str, int]:
+        with self._lock:
+            watches = list(self._watches.items())
+        sizes = {}
+        for name, size in watches:
+            try:
+                sizes[name] = int(size())
+            except Exception as e:
+                # Watched structures are read from another thread; a size that
+                # cannot be taken right now is skipped rather than failing the report.
+                logger.debug("Could not size %s: %s", name, e)
+        return sizes
+
+    def report(self) -> MemoryReport:
+        """
+        Take a report now. Allocation-site growth "since last" is relative to
+        the previous report, periodic or on demand.
+        """
+        traced = traced_peak = None
+        since_start: list[AllocationSite] = []
+        since_last: list[AllocationSite] = []
+        if tracemalloc.is_tracing() and self._baseline is not None:
+            snapshot = self._snapshot()
+            traced, traced_peak = tracemalloc.get_traced_memory()
+            with self._lock:
+                baseline, previous, self._previous = self._baseline, self._previous, snapshot
+            since_start = self._top_growth(snapshot, baseline)
+            since_last = self._top_growth(snapshot, previous)
+
+        return MemoryReport(
+            timestamp=time.time(),
+            uptime_seconds=time.monotonic() - self._started_at,
+            rss_bytes=rss_bytes(),
+            peak_rss_bytes=peak_rss_bytes(),
+            collections=self.collection_sizes(),
+            traced_bytes=traced,
+            traced_peak_bytes=traced_peak,
+            growth_since_start=since_start,
+            growth_since_last=since_last,
+        )
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="mcpagentai-memory", daemon=True)
+        self._thread.start()
+        logger.info("Writing memory reports to %s every %gs", self.path, self.interval)
+
+    def stop(self) -> None:
+        """
+        Stop the thread and write a final report.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+            self._write()
+
+    # -------------------------------------------------------------------
+    # Internal Methods
+    # -------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._write()
+
+    def _write(self) -> None:
+        report = self.report()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(report.model_dump(), separators=(",", ":")) + "\n")
+        except OSError as e:
+            logger.warning("Failed to write memory report %s: %s", self.path, e)
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED_FILES)
+
+    def _top_growth(self, snapshot: tracemalloc.Snapshot, reference: tracemalloc.Snapshot) -> list[AllocationSite]:
+        key_type = "traceback" if self.tracemalloc_frames > 1 else "lineno"
+        # compare_to orders by absolute change; only growth is of interest here.
+        grown = [stat for stat in snapshot.compare_to(reference, key_type) if stat.size_diff > 0]
+        sites = []
+        for stat in grown[:self.top_sites]:
+            sites.append(AllocationSite(
+                # Most recent frame (the allocation itself) first.
+                site=" <- ".join(f"{frame.filename}:{frame.lineno}" for frame in reversed(stat.traceback)),
+                size_bytes=stat.size,
+                size_diff_bytes=stat.size_diff,
+                count=stat.count,
+                count_diff=stat.count_diff,
+            ))
+        return sites
+
+
+_monitor: Optional[MemoryMonitor] = None
+_monitor_lock = threading.Lock()
+
+
+def get_memory_monitor() -> MemoryMonitor:
+    """
+    Return the process-wide MemoryMonitor, configured from Settings.
+    """
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                settings = get_settings()
+                _monitor = MemoryMonitor(
+                    Path(settings.store_dir) / settings.memory_file,
+                    interval=settings.memory_report_interval,
+                    tracemalloc_frames=settings.memory_tracemalloc_frames,
+                    top_sites=settings.memory_top_sites,
+                )
+    return _monitor
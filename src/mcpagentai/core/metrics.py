@@ -0,0 +1,471 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from mcpagentai.defs import (
+    LatencySummary,
+    CallMetrics,
+    SchedulerClassState,
+    ServerMetrics,
+    ToolCacheMetrics,
+    ToolCoalescingMetrics,
+    UpstreamPool,
+    UpstreamState,
+)
+
+from .logging import get_logger
+
+# Each power-of-two range of microseconds is split into 2**SUB_BUCKET_BITS
+# linear sub-buckets, which bounds the relative error of a recorded value
+# to 1 / 2**SUB_BUCKET_BITS (~6%) whatever its magnitude.
+SUB_BUCKET_BITS = 4
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+logger = get_logger("mcpagentai.metrics")
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear latency histogram.
+
+    Values are bucketed by integer microseconds with a bounded relative
+    error, so recording is a few integer operations and a dict increment,
+    and memory grows with the spread of observed latencies rather than the
+    number of samples. Callers are expected to hold a lock when recording
+    from several threads.
+    """
+
+    __slots__ = ("count", "total", "max", "_buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._buckets: dict[int, int] = {}
+
+    def record(self, seconds: float) -> None:
+        micros = max(int(seconds * 1_000_000), 0)
+        if micros < SUB_BUCKET_COUNT:
+            index = micros
+        else:
+            shift = micros.bit_length() - SUB_BUCKET_BITS - 1
+            index = (shift + 1) * SUB_BUCKET_COUNT + (micros >> shift) - SUB_BUCKET_COUNT
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, quantile: float) -> float:
+        """
+        Return the latency (in seconds) at ``quantile`` (0..1), or 0.0 if empty.
+        """
+        if not self.count:
+            return 0.0
+        rank = quantile * self.count
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                return min(self._bucket_midpoint(index) / 1_000_000, self.max)
+        return self.max
+
+    def summary(self) -> LatencySummary:
+        p50, p90, p99 = (self.percentile(q) * 1000 for q in QUANTILES)
+        return LatencySummary(
+            count=self.count,
+            mean_ms=self.total / self.count * 1000 if self.count else 0.0,
+            p50_ms=p50,
+            p90_ms=p90,
+            p99_ms=p99,
+            max_ms=self.max * 1000,
+        )
+
+    @staticmethod
+    def _bucket_midpoint(index: int) -> float:
+        if index < SUB_BUCKET_COUNT:
+            return index + 0.5
+        shift = index // SUB_BUCKET_COUNT - 1
+        low = (index % SUB_BUCKET_COUNT + SUB_BUCKET_COUNT) << shift
+        return low + (1 << shift) / 2
+
+
+class CallStats:
+    """
+    Counters and latency histogram for one tool or upstream host.
+    """
+
+    __slots__ = ("calls", "errors", "in_flight", "cache_hits", "latency")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.cache_hits = 0
+        self.latency = LatencyHistogram()
+
+    def to_model(self) -> CallMetrics:
+        return CallMetrics(
+            calls=self.calls,
+            errors=self.errors,
+            in_flight=self.in_flight,
+            cache_hits=self.cache_hits,
+            latency=self.latency.summary(),
+        )
+
+
+class _CallTimer:
+    """
+    Context manager returned by ``MetricsRegistry.track_*``.
+    """
+
+    __slots__ = ("_registry", "_stats", "_start")
+
+    def __init__(self, registry: "MetricsRegistry", stats: CallStats):
+        self._registry = registry
+        self._stats = stats
+        self._start = 0.0
+
+    def __enter__(self) -> "_CallTimer":
+        with self._registry._lock:
+            self._stats.in_flight += 1
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self._start
+        stats = self._stats
+        with self._registry._lock:
+            stats.in_flight -= 1
+            stats.calls += 1
+            if exc_type is not None:
+                stats.errors += 1
+            stats.latency.record(elapsed)
+
+
+class MetricsRegistry:
+    """
+    Process-wide call metrics, keyed by tool name and by upstream host.
+
+    The hot path takes one short lock on entry and one on exit; snapshots
+    and percentile computation only happen when metrics are read.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tools: dict[str, CallStats] = {}
+        self._hosts: dict[str, CallStats] = {}
+        self._state_sources: list[Callable[[], dict[str, UpstreamState]]] = []
+        self._pool_sources: list[Callable[[], dict[str, UpstreamPool]]] = []
+        self._scheduler_source: Optional[Callable[[], dict[str, SchedulerClassState]]] = None
+        self._cache_source: Optional[Callable[[], dict[str, dict]]] = None
+        self._coalescing_source: Optional[Callable[[], dict[str, dict]]] = None
+        self._started = time.time()
+
+    # -------------------------------------------------------------------
+    # Recording
+    # -------------------------------------------------------------------
+
+    def track_tool(self, name: str) -> _CallTimer:
+        """
+        Time a tool call: ``with metrics.track_tool(name): ...``.
+        Exceptions raised inside the block count as errors.
+        """
+        return _CallTimer(self, self._stats_for(self._tools, name))
+
+    def track_host(self, host: str) -> _CallTimer:
+        """
+        Time an upstream HTTP request to ``host`` (scheme://host:port).
+        """
+        return _CallTimer(self, self._stats_for(self._hosts, host))
+
+    def record_cache_hit(self, name: str) -> None:
+        stats = self._stats_for(self._tools, name)
+        with self._lock:
+            stats.cache_hits += 1
+
+    def add_upstream_state_source(self, source: Callable[[], dict[str, UpstreamState]]) -> None:
+        """
+        Register a callable reporting per-host resilience state (circuit,
+        concurrency limit, ...); it is read on every snapshot.
+        """
+        with self._lock:
+            self._state_sources.append(source)
+
+    def add_upstream_pool_source(self, source: Callable[[], dict[str, UpstreamPool]]) -> None:
+        """
+        Register a callable reporting per-host connection pool occupancy and
+        reuse; it is read on every snapshot.
+        """
+        with self._lock:
+            self._pool_sources.append(source)
+
+    def set_scheduler_source(self, source: Callable[[], dict[str, SchedulerClassState]]) -> None:
+        """
+        Register the callable reporting the scheduler's per-class queues.
+        """
+        with self._lock:
+            self._scheduler_source = source
+
+    def set_cache_source(self, source: Callable[[], dict[str, dict]]) -> None:
+        """
+        Register the callable reporting the response cache's per-tool
+        counters (``ResponseCache.stats``).
+        """
+        with self._lock:
+            self._cache_source = source
+
+    def set_coalescing_source(self, source: Callable[[], dict[str, dict]]) -> None:
+        """
+        Register the callable reporting per-tool request coalescing counters
+        (``SingleFlight.stats``).
+        """
+        with self._lock:
+            self._coalescing_source = source
+
+    # -------------------------------------------------------------------
+    # Export
+    # -------------------------------------------------------------------
+
+    def snapshot(self) -> ServerMetrics:
+        with self._lock:
+            tools = {name: stats.to_model() for name, stats in self._tools.items()}
+            hosts = {host: stats.to_model() for host, stats in self._hosts.items()}
+            sources = list(self._state_sources)
+            pool_sources = list(self._pool_sources)
+            scheduler_source = self._scheduler_source
+            cache_source = self._cache_source
+            coalescing_source = self._coalescing_source
+        upstream_state = {}
+        for source in sources:
+            upstream_state.update(source())
+        upstream_pools = {}
+        for source in pool_sources:
+            upstream_pools.update(source())
+        return ServerMetrics(
+            uptime_seconds=time.time() - self._started,
+            tools=tools,
+            upstream_hosts=hosts,
+            upstream_state=upstream_state,
+            upstream_pools=upstream_pools,
+            cache={
+                name: ToolCacheMetrics(**stats) for name, stats in (cache_source() if cache_source else {}).items()
+            },
+            coalescing={
+                name: ToolCoalescingMetrics(**stats)
+                for name, stats in (coalescing_source() if coalescing_source else {}).items()
+            },
+            scheduler=scheduler_source() if scheduler_source is not None else {},
+        )
+
+    def render_prometheus(self) -> str:
+        """
+        Render the current metrics in the Prometheus text exposition format.
+        Latencies are exported as summaries with p50/p90/p99 quantiles.
+        """
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP mcpagentai_uptime_seconds Seconds since the metrics registry was created.",
+            "# TYPE mcpagentai_uptime_seconds gauge",
+            f"mcpagentai_uptime_seconds {snapshot.uptime_seconds:.3f}",
+        ]
+        for prefix, label, entries in (
+            ("mcpagentai_tool", "tool", snapshot.tools),
+            ("mcpagentai_upstream", "host", snapshot.upstream_hosts),
+        ):
+            rows = [(f'{label}="{_escape_label(key)}"', entries[key]) for key in sorted(entries)]
+            if not rows:
+                continue
+            families = [
+                ("calls_total", "counter", lambda m: m.calls),
+                ("errors_total", "counter", lambda m: m.errors),
+                ("in_flight", "gauge", lambda m: m.in_flight),
+            ]
+            if label == "tool":
+                families.append(("cache_hits_total", "counter", lambda m: m.cache_hits))
+            for suffix, kind, value in families:
+                lines.append(f"# TYPE {prefix}_{suffix} {kind}")
+                lines += [f"{prefix}_{suffix}{{{labels}}} {value(m)}" for labels, m in rows]
+
+            lines.append(f"# TYPE {prefix}_latency_seconds summary")
+            for labels, m in rows:
+                latency = m.latency
+                for quantile, value_ms in zip(QUANTILES, (latency.p50_ms, latency.p90_ms, latency.p99_ms)):
+                    lines.append(
+                        f'{prefix}_latency_seconds{{{labels},quantile="{quantile}"}} {value_ms / 1000:.6f}'
+                    )
+                lines += [
+                    f"{prefix}_latency_seconds_sum{{{labels}}} {latency.mean_ms * latency.count / 1000:.6f}",
+                    f"{prefix}_latency_seconds_count{{{labels}}} {latency.count}",
+                ]
+
+        states = [
+            (f'host="{_escape_label(host)}"', snapshot.upstream_state[host])
+            for host in sorted(snapshot.upstream_state)
+        ]
+        if states:
+            lines.append("# TYPE mcpagentai_upstream_circuit_state gauge")
+            for labels, state in states:
+                lines += [
+                    f'mcpagentai_upstream_circuit_state{{{labels},state="{name}"}} {int(state.circuit == name)}'
+                    for name in ("closed", "half_open", "open")
+                ]
+            for suffix, kind, value in (
+                ("concurrency_limit", "gauge", lambda st: st.concurrency_limit),
+                ("rejected_total", "counter", lambda st: st.rejected),
+                ("retries_total", "counter", lambda st: st.retries),
+                ("retry_tokens", "gauge", lambda st: st.retry_tokens),
+            ):
+                lines.append(f"# TYPE mcpagentai_upstream_{suffix} {kind}")
+                lines += [f"mcpagentai_upstream_{suffix}{{{labels}}} {value(st)}" for labels, st in states]
+
+        pools = [
+            (f'host="{_escape_label(host)}"', snapshot.upstream_pools[host])
+            for host in sorted(snapshot.upstream_pools)
+        ]
+        if pools:
+            for suffix, kind, value in (
+                ("pool_maxsize", "gauge", lambda pool: pool.maxsize),
+                ("pool_idle_connections", "gauge", lambda pool: pool.idle),
+                ("connections_opened_total", "counter", lambda pool: pool.connections_opened),
+            ):
+                lines.append(f"# TYPE mcpagentai_upstream_{suffix} {kind}")
+                lines += [f"mcpagentai_upstream_{suffix}{{{labels}}} {value(pool)}" for labels, pool in pools]
+
+        caches = [(f'tool="{_escape_label(name)}"', snapshot.cache[name]) for name in sorted(snapshot.cache)]
+        if caches:
+            for suffix, kind, value in (
+                ("hits_total", "counter", lambda c: c.hits),
+                ("stale_hits_total", "counter", lambda c: c.stale_hits),
+                ("misses_total", "counter", lambda c: c.misses),
+                ("evictions_total", "counter", lambda c: c.evictions),
+                ("entries", "gauge", lambda c: c.entries),
+                ("bytes", "gauge", lambda c: c.bytes),
+            ):
+                lines.append(f"# TYPE mcpagentai_cache_{suffix} {kind}")
+                lines += [f"mcpagentai_cache_{suffix}{{{labels}}} {value(c)}" for labels, c in caches]
+
+        flights = [(f'tool="{_escape_label(name)}"', snapshot.coalescing[name]) for name in sorted(snapshot.coalescing)]
+        if flights:
+            for suffix, kind, value in (
+                ("executions_total", "counter", lambda f: f.executions),
+                ("coalesced_total", "counter", lambda f: f.coalesced),
+            ):
+                lines.append(f"# TYPE mcpagentai_singleflight_{suffix} {kind}")
+                lines += [f"mcpagentai_singleflight_{suffix}{{{labels}}} {value(f)}" for labels, f in flights]
+
+        classes = [(f'class="{name}"', snapshot.scheduler[name]) for name in sorted(snapshot.scheduler)]
+        if classes:
+            for suffix, kind, value in (
+                ("running", "gauge", lambda sc: sc.running),
+                ("queue_depth", "gauge", lambda sc: sc.queued),
+                ("queue_limit", "gauge", lambda sc: sc.queue_limit),
+                ("admitted_total", "counter", lambda sc: sc.admitted),
+                ("shed_total", "counter", lambda sc: sc.shed),
+            ):
+                lines.append(f"# TYPE mcpagentai_scheduler_{suffix} {kind}")
+                lines += [f"mcpagentai_scheduler_{suffix}{{{labels}}} {value(sc)}" for labels, sc in classes]
+            lines.append("# TYPE mcpagentai_scheduler_wait_seconds summary")
+            for labels, sc in classes:
+                wait = sc.wait
+                for quantile, value_ms in zip(QUANTILES, (wait.p50_ms, wait.p90_ms, wait.p99_ms)):
+                    lines.append(
+                        f'mcpagentai_scheduler_wait_seconds{{{labels},quantile="{quantile}"}} {value_ms / 1000:.6f}'
+                    )
+                lines += [
+                    f"mcpagentai_scheduler_wait_seconds_sum{{{labels}}} {wait.mean_ms * wait.count / 1000:.6f}",
+                    f"mcpagentai_scheduler_wait_seconds_count{{{labels}}} {wait.count}",
+                ]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str | Path) -> None:
+        """
+        Atomically write the Prometheus text file (e.g. for node_exporter's
+        textfile collector).
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tools.clear()
+            self._hosts.clear()
+            self._started = time.time()
+
+    # -------------------------------------------------------------------
+    # Internal Methods
+    # -------------------------------------------------------------------
+
+    def _stats_for(self, table: dict[str, CallStats], key: str) -> CallStats:
+        stats = table.get(key)
+        if stats is None:
+            with self._lock:
+                stats = table.setdefault(key, CallStats())
+        return stats
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsExporter:
+    """
+    Background thread that periodically writes the Prometheus text file.
+    """
+
+    def __init__(self, registry: "MetricsRegistry", path: str | Path, interval: float):
+        self.registry = registry
+        self.path = Path(path)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="mcpagentai-metrics", daemon=True)
+        self._thread.start()
+        logger.info("Writing metrics to %s every %gs", self.path, self.interval)
+
+    def stop(self) -> None:
+        """
+        Stop the thread and write a final snapshot.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+        self._write()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._write()
+
+    def _write(self) -> None:
+        try:
+            self.registry.write_prometheus(self.path)
+        except OSError as e:
+            logger.warning("Failed to write metrics file %s: %s", self.path, e)
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Return the process-wide MetricsRegistry.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry()
+    return _registry
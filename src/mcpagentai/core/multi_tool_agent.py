@@ -1,34 +1,137 @@
-from typing import Sequence, Union
+import asyncio
+import json
+import threading
+from typing import Optional, Sequence, Union
 from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 
+from mcpagentai.defs import CoreTools, BatchItemResult, BatchCallResult
+
 from .agent_base import MCPAgent
+from .cache import ResponseCache, build_response_cache, canonical_arguments, is_error_result
+from .deadline import DeadlineExceeded, build_tool_timeouts, deadline_scope, remaining
+from .executor import run_blocking
+from .memory import MemoryMonitor, get_memory_monitor
+from .metrics import MetricsRegistry, get_metrics
+from .profiling import ToolProfiler, get_profiler
+from .scheduler import Priority, Scheduler, get_scheduler, priority_scope
+from .singleflight import SingleFlight
+from .tool_registry import ToolRegistry
 
 
 class MultiToolAgent(MCPAgent):
     """
     A composite agent that combines multiple MCPAgent subclasses
     under a single interface.
+
+    Results of tools with a cache policy are served from a shared
+    ResponseCache; stale entries are returned immediately and refreshed
+    in the background on the async path. Concurrent identical calls to
+    those (read-only) tools are coalesced into one upstream execution.
+
+    The tool registry is built on first use, so sub-agents given as
+    ``LazyAgent`` proxies are not constructed until a client needs them.
+
+    Besides the sub-agents' tools it exposes ``batch_call``, which runs
+    several tool calls concurrently in one request, and
+    ``get_server_metrics``. Every call is recorded in the metrics registry,
+    and selected calls are sampled by the profiler (toggled at runtime with
+    ``set_profiling``). ``get_memory_report`` reports RSS, allocation growth
+    and the sizes of the collections registered with the memory monitor.
+
+    Each call runs under a deadline (``tool_timeout``, or a per-tool
+    override) that bounds the HTTP, subprocess and LLM calls made on its
+    behalf; on the async path the call is also cancelled when it expires.
+
+    On the async path, calls that reach a sub-agent (cache hits do not) are
+    admitted by the Scheduler at the priority of the calling context:
+    client calls are interactive, the Twitter loops run as background and
+    stale-entry refreshes as prefetch.
     """
 
-    def __init__(self, agents: list[MCPAgent]):
+    def __init__(
+        self,
+        agents: list[MCPAgent],
+        cache: Optional[ResponseCache] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        profiler: Optional[ToolProfiler] = None,
+        memory: Optional[MemoryMonitor] = None,
+        scheduler: Optional[Scheduler] = None,
+    ):
         super().__init__()
         self._agents = agents
-        self.logger.info(f"Initialized MultiToolAgent with {len(self._agents)} sub-agents.")
+        self._registry: Optional[ToolRegistry] = None
+        self._registry_lock = threading.Lock()
+        self._cache = cache if cache is not None else build_response_cache(self.settings)
+        self._inflight = SingleFlight()
+        self._tool_timeouts = build_tool_timeouts(self.settings.tool_timeouts)
+        self._metrics = metrics if metrics is not None else get_metrics()
+        self._profiler = profiler if profiler is not None else get_profiler()
+        self._memory = memory if memory is not None else get_memory_monitor()
+        self._scheduler = scheduler if scheduler is not None else get_scheduler()
+        self._metrics.set_scheduler_source(self._scheduler.state)
+        self._metrics.set_cache_source(self._cache.stats)
+        self._metrics.set_coalescing_source(self._inflight.stats)
+        self._refreshing: set[tuple[str, str]] = set()
+        self._background_tasks: set[asyncio.Task] = set()
+        self._own_tools = self._build_own_tools()
+        self._own_tool_names = frozenset(tool.name for tool in self._own_tools)
+        self._memory.watch("response_cache.entries", lambda: len(self._cache))
+        self._memory.watch("singleflight.in_flight", self._inflight.in_flight)
+        self._memory.watch("background_refreshes", lambda: len(self._background_tasks))
+        self.logger.info("Initialized MultiToolAgent with %s sub-agents.", len(self._agents))
+
+    @property
+    def cache(self) -> ResponseCache:
+        return self._cache
+
+    @property
+    def inflight(self) -> SingleFlight:
+        return self._inflight
+
+    @property
+    def metrics(self) -> MetricsRegistry:
+        return self._metrics
+
+    @property
+    def profiler(self) -> ToolProfiler:
+        return self._profiler
+
+    @property
+    def scheduler(self) -> Scheduler:
+        return self._scheduler
+
+    @property
+    def registry(self) -> ToolRegistry:
+        """
+        The tool routing table, built from the sub-agents on first access.
+        """
+        if self._registry is None:
+            with self._registry_lock:
+                if self._registry is None:
+                    self._registry = ToolRegistry(self._agents)
+                    self.logger.info("Built tool registry with %s tools.", len(self._registry))
+        return self._registry
 
     def list_tools(self) -> list[Tool]:
         """
-        Return the union of all tools from each sub-agent.
+        Return the union of all tools from each sub-agent, plus the
+        aggregator's own tools.
         """
-        combined_tools = []
-        for agent in self._agents:
-            combined_tools.extend(agent.list_tools())
-        return combined_tools
+        return [*self.registry.tools, *self._own_tools]
 
     def has_tool(self, tool_name: str) -> bool:
         """
         Determine if this agent implements a tool by the given name.
         """
-        return any(tool.name == tool_name for tool in self.list_tools())
+        return tool_name in self.registry or tool_name in self._own_tool_names
+
+    def invalidate_tools(self) -> None:
+        """
+        Rebuild the tool routing table. Call this after a sub-agent
+        changes the set of tools it exposes.
+        """
+        self.registry.invalidate()
+        self.logger.info("Rebuilt tool registry with %s tools.", len(self.registry))
 
     def call_tool(
         self,
@@ -37,8 +140,391 @@ class MultiToolAgent(MCPAgent):
     ) -> Sequence[Union[TextContent, ImageContent, EmbeddedResource]]:
         """
         Route the tool call to whichever agent implements it.
+
+        Only sync sub-agents can be dispatched from here; async-native
+        sub-agents must go through ``call_tool_async``. Stale cache entries
+        are refreshed inline on this path, and batch entries run sequentially.
+        """
+        if name == CoreTools.GET_SERVER_METRICS.value:
+            return self._handle_get_server_metrics()
+        if name == CoreTools.SET_PROFILING.value:
+            return self._handle_set_profiling(arguments)
+        if name == CoreTools.GET_MEMORY_REPORT.value:
+            return self._handle_get_memory_report()
+        if name == CoreTools.BATCH_CALL.value:
+            with self._metrics.track_tool(name), deadline_scope(self._timeout_for(name)):
+                return self._handle_batch_call_sync(arguments)
+
+        return self.call_agent_tool(self._resolve(name), name, arguments)
+
+    def call_agent_tool(
+        self,
+        agent: MCPAgent,
+        name: str,
+        arguments: dict
+    ) -> Sequence[Union[TextContent, ImageContent, EmbeddedResource]]:
+        """
+        Call tool ``name`` on ``agent`` through the shared response cache,
+        in-flight coalescing, metrics and deadline, whether or not ``agent``
+        is one of this aggregator's sub-agents. The Twitter query handlers
+        use this so mentions share cached and coalesced upstream results.
         """
-        for agent in self._agents:
-            if agent.has_tool(name):
-                return agent.call_tool(name, arguments)
-        raise ValueError(f"Unknown tool: {name}")
+        if agent.is_async_native:
+            raise TypeError(
+                f"Tool '{name}' is served by async agent {agent.__class__.__name__}; "
+                f"use call_tool_async instead."
+            )
+        with (
+            self._metrics.track_tool(name),
+            self._profiler.track(name),
+            deadline_scope(self._timeout_for(name)),
+        ):
+            return self._dispatch_sync(agent, name, arguments)
+
+    async def call_tool_async(
+        self,
+        name: str,
+        arguments: dict
+    ) -> Sequence[Union[TextContent, ImageContent, EmbeddedResource]]:
+        """
+        Route the tool call to whichever agent implements it, awaiting async
+        agents directly and offloading sync agents to the shared executor.
+        """
+        if name == CoreTools.GET_SERVER_METRICS.value:
+            return self._handle_get_server_metrics()
+        if name == CoreTools.SET_PROFILING.value:
+            return self._handle_set_profiling(arguments)
+        if name == CoreTools.GET_MEMORY_REPORT.value:
+            # Taking a tracemalloc snapshot can take a while; keep it off the loop.
+            return await run_blocking(self._handle_get_memory_report)
+        if name == CoreTools.BATCH_CALL.value:
+            with self._metrics.track_tool(name):
+                return await self._with_deadline(name, self._handle_batch_call(arguments))
+
+        agent = self._resolve(name)
+        with self._metrics.track_tool(name), self._profiler.track(name):
+            return await self._with_deadline(name, self._dispatch_async(agent, name, arguments))
+
+    # -------------------------------------------------------------------
+    # Aggregator tools
+    # -------------------------------------------------------------------
+
+    def _build_own_tools(self) -> tuple[Tool, ...]:
+        return (
+            Tool(
+                name=CoreTools.GET_SERVER_METRICS.value,
+                description=(
+                    "Get server metrics: per-tool and per-upstream-host call counts, errors, "
+                    "in-flight calls, cache hits and p50/p90/p99 latency"
+                ),
+                inputSchema={"type": "object", "properties": {}},
+            ),
+            Tool(
+                name=CoreTools.SET_PROFILING.value,
+                description=(
+                    "Turn the tool-call sampling profiler on or off and choose which calls it "
+                    "profiles. Profiles are written as collapsed stacks for flame graphs. "
+                    "Call with no arguments to get the current status."
+                ),
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "enabled": {"type": "boolean", "description": "Turn profiling on or off"},
+                        "sample_every": {
+                            "type": "integer",
+                            "description": "Profile one call in N (0 disables 1-in-N sampling)",
+                        },
+                        "slow_ms": {
+                            "type": "number",
+                            "description": "Also keep profiles of calls slower than this (0 disables)",
+                        },
+                        "interval_ms": {"type": "number", "description": "Stack sampling interval"},
+                    },
+                },
+            ),
+            Tool(
+                name=CoreTools.GET_MEMORY_REPORT.value,
+                description=(
+                    "Get a memory report: RSS, sizes of the server's in-memory collections "
+                    "(caches, replied-tweet set, ...) and, when tracemalloc is enabled, the "
+                    "allocation sites that grew since startup and since the previous report"
+                ),
+                inputSchema={"type": "object", "properties": {}},
+            ),
+            Tool(
+                name=CoreTools.BATCH_CALL.value,
+                description=(
+                    "Run several tool calls concurrently in one request. Results are "
+                    "returned in request order; a failing entry does not fail the batch."
+                ),
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "calls": {
+                            "type": "array",
+                            "description": f"Tool calls to run (at most {self.settings.batch_max_items})",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "name": {"type": "string", "description": "Tool name"},
+                                    "arguments": {"type": "object", "description": "Tool arguments"},
+                                },
+                                "required": ["name"],
+                            },
+                        },
+                        "max_parallel": {
+                            "type": "integer",
+                            "description": (
+                                f"Maximum number of calls in flight at once "
+                                f"(default and upper bound {self.settings.batch_max_parallel})"
+                            ),
+                        },
+                    },
+                    "required": ["calls"],
+                },
+            ),
+        )
+
+    def _handle_get_server_metrics(self) -> Sequence[TextContent]:
+        metrics = self._metrics.snapshot()
+        return [TextContent(type="text", text=json.dumps(metrics.model_dump(), indent=2))]
+
+    def _handle_set_profiling(self, arguments: dict) -> Sequence[TextContent]:
+        arguments = arguments or {}
+
+        def option(key: str, cast):
+            value = arguments.get(key)
+            return cast(value) if value is not None else None
+
+        self._profiler.configure(
+            enabled=option("enabled", bool),
+            sample_every=option("sample_every", int),
+            slow_ms=option("slow_ms", float),
+            interval_ms=option("interval_ms", float),
+        )
+        status = self._profiler.status()
+        return [TextContent(type="text", text=json.dumps(status.model_dump(), indent=2))]
+
+    def _handle_get_memory_report(self) -> Sequence[TextContent]:
+        report = self._memory.report()
+        return [TextContent(type="text", text=json.dumps(report.model_dump(), indent=2))]
+
+    def _parse_batch_arguments(self, arguments: dict) -> tuple[list, int]:
+        calls = arguments.get("calls")
+        if not isinstance(calls, list) or not calls:
+            raise ValueError("batch_call requires a non-empty 'calls' array.")
+        if len(calls) > self.settings.batch_max_items:
+            raise ValueError(
+                f"batch_call accepts at most {self.settings.batch_max_items} calls, got {len(calls)}."
+            )
+        max_parallel = int(arguments.get("max_parallel") or self.settings.batch_max_parallel)
+        max_parallel = max(1, min(max_parallel, self.settings.batch_max_parallel))
+        return calls, max_parallel
+
+    @staticmethod
+    def _validate_batch_entry(entry) -> tuple[str, dict]:
+        if not isinstance(entry, dict) or not isinstance(entry.get("name"), str):
+            raise ValueError("Each batch entry must be an object with a string 'name'.")
+        if entry["name"] == CoreTools.BATCH_CALL.value:
+            raise ValueError("batch_call cannot be nested.")
+        entry_arguments = entry.get("arguments") or {}
+        if not isinstance(entry_arguments, dict):
+            raise ValueError("Batch entry 'arguments' must be an object.")
+        return entry["name"], entry_arguments
+
+    @staticmethod
+    def _batch_item(index: int, entry, content=None, error: Exception | None = None) -> BatchItemResult:
+        name = entry.get("name") if isinstance(entry, dict) else None
+        if error is not None:
+            return BatchItemResult(
+                index=index, name=str(name), success=False, error=f"{type(error).__name__}: {error}"
+            )
+        texts = [
+            item.text if isinstance(item, TextContent) else item.model_dump_json()
+            for item in content
+        ]
+        return BatchItemResult(index=index, name=name, success=True, content=texts)
+
+    @staticmethod
+    def _batch_response(results: list[BatchItemResult]) -> Sequence[TextContent]:
+        result = BatchCallResult(results=results)
+        return [TextContent(type="text", text=json.dumps(result.model_dump(), indent=2))]
+
+    async def _handle_batch_call(self, arguments: dict) -> Sequence[TextContent]:
+        calls, max_parallel = self._parse_batch_arguments(arguments)
+        semaphore = asyncio.Semaphore(max_parallel)
+
+        async def run(index: int, entry) -> BatchItemResult:
+            async with semaphore:
+                try:
+                    name, entry_arguments = self._validate_batch_entry(entry)
+                    content = await self.call_tool_async(name, entry_arguments)
+                except Exception as e:
+                    return self._batch_item(index, entry, error=e)
+                return self._batch_item(index, entry, content=content)
+
+        results = await asyncio.gather(*(run(i, entry) for i, entry in enumerate(calls)))
+        return self._batch_response(list(results))
+
+    def _handle_batch_call_sync(self, arguments: dict) -> Sequence[TextContent]:
+        calls, _ = self._parse_batch_arguments(arguments)
+        results = []
+        for index, entry in enumerate(calls):
+            try:
+                name, entry_arguments = self._validate_batch_entry(entry)
+                results.append(self._batch_item(index, entry, content=self.call_tool(name, entry_arguments)))
+            except Exception as e:
+                results.append(self._batch_item(index, entry, error=e))
+        return self._batch_response(results)
+
+    # -------------------------------------------------------------------
+    # Internal Methods
+    # -------------------------------------------------------------------
+
+    def _timeout_for(self, name: str) -> float:
+        return self._tool_timeouts.get(name, self.settings.tool_timeout)
+
+    async def _with_deadline(self, name: str, work, inherit: bool = True):
+        """
+        Await ``work`` under the tool's deadline, cancelling it when the
+        deadline passes. Blocking work already handed to the executor cannot
+        be interrupted; it stops at its next bounded timeout or deadline check.
+        """
+        with deadline_scope(self._timeout_for(name), inherit=inherit):
+            timeout = asyncio.timeout(remaining())
+            try:
+                async with timeout:
+                    return await work
+            except TimeoutError:
+                if timeout.expired():
+                    raise DeadlineExceeded(f"tool '{name}'") from None
+                raise
+
+    def _resolve(self, name: str) -> MCPAgent:
+        agent = self.registry.resolve(name)
+        if agent is None:
+            raise ValueError(f"Unknown tool: {name}")
+        return agent
+
+    def _dispatch_sync(
+        self,
+        agent: MCPAgent,
+        name: str,
+        arguments: dict
+    ) -> Sequence[Union[TextContent, ImageContent, EmbeddedResource]]:
+        if not self._cache.is_cacheable(name):
+            return agent.call_tool(name, arguments)
+
+        key = canonical_arguments(arguments)
+        cached = self._cache.lookup(name, key)
+        if cached.value is not None and not cached.stale:
+            self._metrics.record_cache_hit(name)
+            return list(cached.value)
+
+        def fetch():
+            result = agent.call_tool(name, arguments)
+            self._store(name, key, result)
+            return result
+
+        return self._inflight.do_sync((name, key), fetch)
+
+    async def _dispatch_async(
+        self,
+        agent: MCPAgent,
+        name: str,
+        arguments: dict
+    ) -> Sequence[Union[TextContent, ImageContent, EmbeddedResource]]:
+        if not self._cache.is_cacheable(name):
+            return await self._execute(agent, name, arguments)
+
+        key = canonical_arguments(arguments)
+        cached = self._cache.lookup(name, key)
+        if cached.value is not None:
+            self._metrics.record_cache_hit(name)
+            if cached.stale:
+                self._schedule_refresh(agent, name, arguments, key)
+            return list(cached.value)
+
+        return await self._fetch(agent, name, arguments, key)
+
+    async def _fetch(
+        self,
+        agent: MCPAgent,
+        name: str,
+        arguments: dict,
+        key: str
+    ) -> Sequence[Union[TextContent, ImageContent, EmbeddedResource]]:
+        async def fetch():
+            result = await self._execute(agent, name, arguments)
+            self._store(name, key, result)
+            return result
+
+        return await self._inflight.do((name, key), fetch)
+
+    def _store(self, name: str, key: str, result: Sequence[Union[TextContent, ImageContent, EmbeddedResource]]) -> None:
+        """
+        Cache a result unless it reports an error; a failed refresh thus
+        leaves the existing (possibly stale) entry in place.
+        """
+        if is_error_result(result):
+            self.logger.debug("Not caching error result of %s", name)
+            return
+        self._cache.store(name, key, result)
+
+    async def _execute(
+        self,
+        agent: MCPAgent,
+        name: str,
+        arguments: dict
+    ) -> Sequence[Union[TextContent, ImageContent, EmbeddedResource]]:
+        async with self._scheduler.admit():
+            return await agent.call_tool_async(name, arguments)
+
+    def _schedule_refresh(self, agent: MCPAgent, name: str, arguments: dict, key: str) -> None:
+        """
+        Refresh a stale cache entry in the background, at most once per key at a time.
+        """
+        if (name, key) in self._refreshing:
+            return
+        self._refreshing.add((name, key))
+
+        async def refresh():
+            try:
+                # A fresh budget: the request that found the stale entry has already been answered.
+                with priority_scope(Priority.PREFETCH):
+                    await self._with_deadline(name, self._fetch(agent, name, arguments, key), inherit=False)
+            except Exception as e:
+                self.logger.warning("Background refresh of %s failed: %s", name, e)
+            finally:
+                self._refreshing.discard((name, key))
+
+        task = asyncio.create_task(refresh())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+
+_dispatcher: Optional[MultiToolAgent] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> MultiToolAgent:
+    """
+    Return the process-wide MultiToolAgent: the server's once it has
+    started, otherwise one without sub-agents (for callers that pass their
+    own agent to ``call_agent_tool``).
+    """
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = MultiToolAgent([])
+    return _dispatcher
+
+
+def set_dispatcher(agent: Optional[MultiToolAgent]) -> None:
+    """
+    Make ``agent`` the process-wide MultiToolAgent (None resets it).
+    """
+    global _dispatcher
+    with _dispatcher_lock:
+        _dispatcher = agent
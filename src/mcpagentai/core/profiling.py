@@ -0,0 +1,298 @@
+import contextlib
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Callable, Optional
+
+from mcpagentai.defs import ProfilingStatus
+
+from .config import get_settings
+from .logging import get_logger
+
+logger = get_logger("mcpagentai.profiling")
+
+_NOT_PROFILED = contextlib.nullcontext()
+
+# The profile of the tool call running in this context, so work offloaded
+# to the executor (see ``run_attached``) is attributed to the right call.
+_current_profile: ContextVar[Optional["CallProfile"]] = ContextVar("mcpagentai_profile", default=None)
+
+
+class CallProfile:
+    """
+    Stack samples collected for one tool call.
+
+    ``keep`` is set for calls picked by 1-in-N sampling, which are written
+    out whatever their latency; the others are only written if slow.
+    """
+
+    __slots__ = ("profiler", "tool", "started_at", "keep", "samples")
+
+    def __init__(self, profiler: "ToolProfiler", tool: str, keep: bool):
+        self.profiler = profiler
+        self.tool = tool
+        self.started_at = time.time()
+        self.keep = keep
+        self.samples: Counter[str] = Counter()
+
+
+class _TrackedCall:
+    __slots__ = ("_profiler", "_profile", "_anchor", "_token", "_start")
+
+    def __init__(self, profiler: "ToolProfiler", profile: CallProfile):
+        self._profiler = profiler
+        self._profile = profile
+
+    def __enter__(self) -> CallProfile:
+        # The frame of the ``with`` statement: samples of this thread are cut
+        # there, so only the call's own stack (not the event loop's) is kept.
+        self._anchor = sys._getframe(1)
+        self._token = _current_profile.set(self._profile)
+        self._profiler._register(threading.get_ident(), self._anchor, self._profile)
+        self._start = time.perf_counter()
+        return self._profile
+
+    def __exit__(self, *exc) -> bool:
+        elapsed = time.perf_counter() - self._start
+        self._profiler._unregister(threading.get_ident(), self._anchor)
+        _current_profile.reset(self._token)
+        self._profiler._finish(self._profile, elapsed)
+        return False
+
+
+class ToolProfiler:
+    """
+    Low-overhead wall-clock sampling profiler for tool calls.
+
+    A tracked call registers the thread it runs on (and, through
+    ``run_attached``, the executor thread it offloads to). While any call is
+    registered, a background thread reads every registered thread's stack
+    every ``interval_ms`` and counts it against the call, so the cost is
+    bounded by the sampling rate rather than by the number of calls or
+    function calls, and time blocked in I/O (DNS, TLS, reads) shows up too.
+
+    Which calls are tracked:
+      - every ``sample_every``-th call, always written out;
+      - with ``slow_ms`` > 0, every call, written out only if it took at
+        least ``slow_ms``.
+
+    Each written profile is a ``.collapsed`` file (one ``frame;frame;... count``
+    line per distinct stack, rooted at the tool name) under ``directory``,
+    ready for flamegraph.pl or speedscope; concatenate files to aggregate.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        enabled: bool = False,
+        sample_every: int = 100,
+        slow_ms: float = 0.0,
+        interval_ms: float = 5.0,
+        max_files: int = 500,
+    ):
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self.profiled_calls = 0
+        self.profiles_written = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._counter = itertools.count(1)
+        self._threads: dict[int, dict[FrameType, CallProfile]] = {}
+        self._pending: list[tuple[CallProfile, float]] = []
+        self._files: deque[Path] = deque()
+        self._labels: dict[CodeType, str] = {}
+        self._sampler: Optional[threading.Thread] = None
+        self.enabled = False
+        self.sample_every = 0
+        self.slow_ms = 0.0
+        self.interval_ms = 5.0
+        self.configure(enabled=enabled, sample_every=sample_every, slow_ms=slow_ms, interval_ms=interval_ms)
+
+    def configure(
+        self,
+        enabled: Optional[bool] = None,
+        sample_every: Optional[int] = None,
+        slow_ms: Optional[float] = None,
+        interval_ms: Optional[float] = None,
+    ) -> None:
+        """
+        Change the profiler's settings; arguments left as None are unchanged.
+        """
+        if sample_every is not None and sample_every < 0:
+            raise ValueError("sample_every must be >= 0 (0 disables 1-in-N sampling).")
+        if slow_ms is not None and slow_ms < 0:
+            raise ValueError("slow_ms must be >= 0 (0 disables the latency threshold).")
+        if interval_ms is not None and interval_ms <= 0:
+            raise ValueError("interval_ms must be > 0.")
+        with self._lock:
+            if enabled is not None:
+                self.enabled = enabled
+            if sample_every is not None:
+                self.sample_every = sample_every
+            if slow_ms is not None:
+                self.slow_ms = slow_ms
+            if interval_ms is not None:
+                self.interval_ms = interval_ms
+        logger.info(
+            "Profiling %s (sample_every=%d, slow_ms=%.1f, interval_ms=%.1f)",
+            "enabled" if self.enabled else "disabled", self.sample_every, self.slow_ms, self.interval_ms,
+        )
+
+    def track(self, tool: str):
+        """
+        Context manager wrapping one tool call; a no-op unless the call is selected.
+        """
+        if not self.enabled:
+            return _NOT_PROFILED
+        sampled = self.sample_every > 0 and next(self._counter) % self.sample_every == 0
+        if not sampled and self.slow_ms <= 0:
+            return _NOT_PROFILED
+        return _TrackedCall(self, CallProfile(self, tool, keep=sampled))
+
+    def status(self) -> ProfilingStatus:
+        return ProfilingStatus(
+            enabled=self.enabled,
+            sample_every=self.sample_every,
+            slow_ms=self.slow_ms,
+            interval_ms=self.interval_ms,
+            directory=str(self.directory),
+            profiled_calls=self.profiled_calls,
+            profiles_written=self.profiles_written,
+        )
+
+    # -------------------------------------------------------------------
+    # Internal Methods
+    # -------------------------------------------------------------------
+
+    def _register(self, thread_id: int, anchor: FrameType, profile: CallProfile) -> None:
+        with self._lock:
+            self._threads.setdefault(thread_id, {})[anchor] = profile
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._run, name="mcpagentai-profiler", daemon=True)
+                self._sampler.start()
+            self._wake.notify()
+
+    def _unregister(self, thread_id: int, anchor: FrameType) -> None:
+        with self._lock:
+            anchors = self._threads.get(thread_id)
+            if anchors is not None:
+                anchors.pop(anchor, None)
+                if not anchors:
+                    del self._threads[thread_id]
+
+    def _finish(self, profile: CallProfile, elapsed: float) -> None:
+        with self._lock:
+            self.profiled_calls += 1
+            if profile.keep or (self.slow_ms > 0 and elapsed * 1000 >= self.slow_ms):
+                self._pending.append((profile, elapsed))
+                self._wake.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                # Idle (no sampling at all) while nothing is being profiled.
+                while not self._threads and not self._pending:
+                    self._wake.wait()
+                pending, self._pending = self._pending, []
+                threads = {tid: list(anchors.items()) for tid, anchors in self._threads.items()}
+                interval = self.interval_ms / 1000
+            if threads:
+                self._sample(threads)
+            for profile, elapsed in pending:
+                self._write(profile, elapsed)
+            time.sleep(interval)
+
+    def _sample(self, threads: dict[int, list[tuple[FrameType, CallProfile]]]) -> None:
+        frames = sys._current_frames()
+        for thread_id, anchors in threads.items():
+            frame = frames.get(thread_id)
+            if frame is None:
+                continue
+            owners = dict(anchors)
+            stack = []
+            # Walk from the leaf to the tracked call's frame. If the anchor is not
+            # on the stack (a coroutine suspended on the event loop), nothing is counted.
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                profile = owners.get(frame)
+                if profile is not None:
+                    stack.reverse()
+                    profile.samples[";".join(stack)] += 1
+                    break
+                frame = frame.f_back
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _write(self, profile: CallProfile, elapsed: float) -> None:
+        if not profile.samples:
+            # Finished within one sampling interval.
+            return
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(profile.started_at))
+        path = self.directory / (
+            f"{stamp}-{profile.tool}-{elapsed * 1000:.0f}ms-{os.getpid()}-{self.profiles_written}.collapsed"
+        )
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in profile.samples.most_common():
+                    f.write(f"{profile.tool};{stack} {count}\n")
+        except OSError as e:
+            logger.warning("Could not write profile %s: %s", path, e)
+            return
+        self.profiles_written += 1
+        self._files.append(path)
+        while len(self._files) > self.max_files:
+            with contextlib.suppress(OSError):
+                self._files.popleft().unlink()
+
+
+def run_attached(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run ``func`` on the current (executor) thread, sampling it as part of the
+    profiled tool call of the caller's context, if there is one.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return func(*args, **kwargs)
+    thread_id = threading.get_ident()
+    anchor = sys._getframe()
+    profile.profiler._register(thread_id, anchor, profile)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profile.profiler._unregister(thread_id, anchor)
+
+
+_profiler: Optional[ToolProfiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> ToolProfiler:
+    """
+    Return the process-wide ToolProfiler, configured from Settings.
+    """
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                settings = get_settings()
+                _profiler = ToolProfiler(
+                    Path(settings.store_dir) / settings.profile_dir,
+                    enabled=settings.profile_enabled,
+                    sample_every=settings.profile_sample_every,
+                    slow_ms=settings.profile_slow_ms,
+                    interval_ms=settings.profile_interval_ms,
+                    max_files=settings.profile_max_files,
+                )
+    return _profiler
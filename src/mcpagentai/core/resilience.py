@@ -0,0 +1,267 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Optional
+
+from mcpagentai.defs import UpstreamState
+
+from .logging import get_logger
+
+logger = get_logger("mcpagentai.resilience")
+
+# Statuses that mean "slow down" rather than "this request is wrong".
+OVERLOAD_STATUSES = frozenset({429, 503})
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+# Consecutive overload signals within this window count as one AIMD decrease,
+# so a burst of in-flight failures does not collapse the limit to the floor.
+DECREASE_COOLDOWN = 1.0
+
+
+class UpstreamUnavailable(RuntimeError):
+    """
+    Raised instead of calling an upstream host whose circuit is open, or
+    whose concurrency limit stayed exhausted for the whole queue timeout.
+    """
+
+    def __init__(self, host: str, reason: str, retry_after: Optional[float] = None):
+        self.host = host
+        self.retry_after = retry_after
+        message = f"Upstream {host} unavailable: {reason}"
+        if retry_after:
+            message += f" (retry in {retry_after:.0f}s)"
+        super().__init__(message)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class Outcome(str, Enum):
+    SUCCESS = "success"
+    FAILURE = "failure"     # server error or connection failure
+    OVERLOAD = "overload"   # 429/503 or timeout: also shrinks the concurrency limit
+    NEUTRAL = "neutral"     # says nothing about the host (e.g. invalid request)
+
+
+@dataclass(frozen=True)
+class ResiliencePolicy:
+    """
+    Tuning shared by every host guard.
+
+    Attributes:
+        failure_threshold: Consecutive failures that open the circuit.
+        open_seconds: How long the circuit stays open before a half-open
+            probe; doubles on each failed probe up to ``max_open_seconds``.
+        max_attempts: Attempts per idempotent request, including the first.
+        backoff_base / backoff_max: Full-jitter exponential backoff bounds.
+        retry_budget: Retries allowed per request on average (token bucket),
+            so retries cannot multiply load on a struggling host.
+        max_retry_after: A longer Retry-After is not waited out inline: the
+            circuit is opened for that long and the response returned.
+        max_concurrency / min_concurrency: Bounds of the AIMD limit.
+        queue_timeout: How long a request may wait for a concurrency slot.
+    """
+    failure_threshold: int = 5
+    open_seconds: float = 30.0
+    max_open_seconds: float = 300.0
+    max_attempts: int = 3
+    backoff_base: float = 0.2
+    backoff_max: float = 5.0
+    retry_budget: float = 0.1
+    max_retry_after: float = 10.0
+    max_concurrency: int = 32
+    min_concurrency: int = 1
+    queue_timeout: float = 2.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP-date).
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class HostGuard:
+    """
+    Circuit breaker, AIMD concurrency limit and retry budget for one upstream host.
+
+    ``acquire`` is called before each attempt and either returns (a slot is
+    held; True if the attempt is the half-open probe) or raises
+    UpstreamUnavailable; ``release`` reports how the attempt went. After
+    ``failure_threshold`` consecutive failures the circuit opens and requests
+    fail immediately; once ``open_seconds`` pass, a single probe is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    The concurrency limit grows by ~1 per limit's worth of successes and
+    halves on overload.
+    """
+
+    def __init__(self, host: str, policy: ResiliencePolicy):
+        self.host = host
+        self.policy = policy
+        self._cond = threading.Condition()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._open_until = 0.0
+        self._open_seconds = policy.open_seconds
+        self._probing = False
+        self._limit = float(policy.max_concurrency)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._tokens = self._max_tokens
+        self._rejected = 0
+        self._retries = 0
+
+    def acquire(self, max_wait: Optional[float] = None) -> bool:
+        """
+        Take a slot, waiting at most ``queue_timeout`` (or ``max_wait`` if
+        shorter, e.g. the request's remaining deadline) for one to free up.
+        """
+        wait = self.policy.queue_timeout if max_wait is None else min(self.policy.queue_timeout, max_wait)
+        deadline = time.monotonic() + wait
+        with self._cond:
+            now = time.monotonic()
+            if self._state is CircuitState.OPEN:
+                if now < self._open_until:
+                    self._rejected += 1
+                    raise UpstreamUnavailable(self.host, "circuit open", self._open_until - now)
+                self._state = CircuitState.HALF_OPEN
+                logger.info("Circuit for %s half-open, probing", self.host)
+            if self._state is CircuitState.HALF_OPEN:
+                if self._probing:
+                    self._rejected += 1
+                    raise UpstreamUnavailable(self.host, "circuit half-open, probe in flight")
+                self._probing = True
+                self._in_flight += 1
+                return True
+
+            while self._in_flight >= max(int(self._limit), 1):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._state is not CircuitState.CLOSED:
+                    self._rejected += 1
+                    raise UpstreamUnavailable(
+                        self.host, f"concurrency limit {int(self._limit)} reached"
+                    )
+                self._cond.wait(remaining)
+            self._in_flight += 1
+            return False
+
+    def release(self, outcome: Outcome, retry_after: Optional[float] = None, probe: bool = False) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            was_probe = probe and self._state is CircuitState.HALF_OPEN
+            if probe:
+                self._probing = False
+
+            if outcome is Outcome.SUCCESS:
+                self._failures = 0
+                self._limit = min(self._limit + 1 / self._limit, self.policy.max_concurrency)
+                self._tokens = min(self._tokens + self.policy.retry_budget, self._max_tokens)
+                if was_probe:
+                    self._close()
+            elif outcome is Outcome.NEUTRAL:
+                if was_probe:
+                    self._close()
+            else:
+                self._failures += 1
+                if outcome is Outcome.OVERLOAD:
+                    self._decrease()
+                if was_probe:
+                    self._open(max(self._open_seconds * 2, retry_after or 0))
+                elif retry_after is not None and retry_after > self.policy.max_retry_after:
+                    # The host told us how long to stay away; don't send until then.
+                    self._open(retry_after)
+                elif self._failures >= self.policy.failure_threshold and self._state is CircuitState.CLOSED:
+                    self._open(max(self.policy.open_seconds, retry_after or 0))
+            self._cond.notify()
+
+    def throttled(self, retry_after: Optional[float] = None) -> None:
+        """
+        Report a rate-limit signal found in an otherwise successful response
+        (e.g. Alpha Vantage's 200 with a "Note"), outside of acquire/release.
+        """
+        with self._cond:
+            self._failures += 1
+            self._decrease()
+            if retry_after is not None:
+                self._open(retry_after)
+            elif self._failures >= self.policy.failure_threshold and self._state is CircuitState.CLOSED:
+                self._open(self.policy.open_seconds)
+
+    def try_retry(self) -> bool:
+        """
+        Take a token from the retry budget; False if it is exhausted.
+        """
+        with self._cond:
+            if self._tokens < 1 or self._state is CircuitState.OPEN:
+                return False
+            self._tokens -= 1
+            self._retries += 1
+            return True
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Delay before retry number ``attempt`` (1-based): full jitter, but never
+        less than the server's Retry-After.
+        """
+        ceiling = min(self.policy.backoff_max, self.policy.backoff_base * (2 ** (attempt - 1)))
+        delay = random.uniform(0, ceiling)
+        return max(delay, retry_after or 0.0)
+
+    def state(self) -> UpstreamState:
+        with self._cond:
+            open_for = max(self._open_until - time.monotonic(), 0.0) if self._state is CircuitState.OPEN else 0.0
+            return UpstreamState(
+                circuit=self._state.value,
+                open_for_seconds=round(open_for, 3),
+                consecutive_failures=self._failures,
+                concurrency_limit=round(self._limit, 2),
+                in_flight=self._in_flight,
+                rejected=self._rejected,
+                retries=self._retries,
+                retry_tokens=round(self._tokens, 2),
+            )
+
+    # -------------------------------------------------------------------
+    # Internal Methods (caller holds the lock)
+    # -------------------------------------------------------------------
+
+    @property
+    def _max_tokens(self) -> float:
+        return float(max(self.policy.max_attempts - 1, 1)) * 10
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease >= DECREASE_COOLDOWN:
+            self._limit = max(self._limit / 2, float(self.policy.min_concurrency))
+            self._last_decrease = now
+
+    def _open(self, seconds: float) -> None:
+        seconds = min(seconds, self.policy.max_open_seconds)
+        self._state = CircuitState.OPEN
+        self._open_seconds = max(seconds, self.policy.open_seconds)
+        self._open_until = time.monotonic() + seconds
+        logger.warning("Circuit for %s open for %.1fs after %d failures", self.host, seconds, self._failures)
+        self._cond.notify_all()
+
+    def _close(self) -> None:
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._open_seconds = self.policy.open_seconds
+        logger.info("Circuit for %s closed", self.host)
@@ -0,0 +1,230 @@
+import asyncio
+import contextlib
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from enum import Enum
+from typing import AsyncIterator, Iterator, Optional
+
+from mcpagentai.defs import SchedulerClassState
+
+from .config import get_settings
+from .logging import get_logger
+from .metrics import LatencyHistogram
+
+logger = get_logger("mcpagentai.scheduler")
+
+
+class Priority(str, Enum):
+    INTERACTIVE = "interactive"   # MCP client calls
+    BACKGROUND = "background"     # the Twitter agent's own loops
+    PREFETCH = "prefetch"         # stale-while-revalidate cache refreshes
+
+
+# Highest priority first; waiters are always woken in this order.
+PRIORITY_ORDER = (Priority.INTERACTIVE, Priority.BACKGROUND, Priority.PREFETCH)
+
+# Priority of the work running in this context. Tasks inherit it from the
+# context that created them, so a loop only has to set it once.
+_priority: ContextVar[Priority] = ContextVar("mcpagentai_priority", default=Priority.INTERACTIVE)
+
+
+class Overloaded(RuntimeError):
+    """
+    Raised instead of queueing a call when its priority class's queue is full.
+    """
+
+    def __init__(self, priority: Priority, queued: int):
+        self.priority = priority
+        self.queued = queued
+        super().__init__(
+            f"Server overloaded: {priority.value} queue is full ({queued} calls waiting), try again later"
+        )
+
+
+@contextlib.contextmanager
+def priority_scope(priority: Priority) -> Iterator[None]:
+    """
+    Run the enclosed work (and tasks created inside it) at ``priority``.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+class _ClassStats:
+    __slots__ = ("running", "admitted", "shed", "wait")
+
+    def __init__(self):
+        self.running = 0
+        self.admitted = 0
+        self.shed = 0
+        self.wait = LatencyHistogram()
+
+
+class Scheduler:
+    """
+    Admission control for tool calls on the event loop.
+
+    At most ``max_concurrent`` calls run at once; ``interactive_reserve`` of
+    those slots are only ever given to interactive calls, so the background
+    loops and cache refreshes cannot starve clients. A call that finds no
+    free slot waits in its class's FIFO queue, and freed slots go to the
+    highest-priority class with waiters. When a queue already holds
+    ``queue_limits[class]`` calls, further calls of that class are rejected
+    with Overloaded rather than queued, which keeps latency bounded under
+    overload. Time spent queued counts against the call's deadline.
+
+    Slots and queues are only touched from the event loop; the lock keeps
+    metrics snapshots taken from other threads consistent.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        interactive_reserve: int = 4,
+        queue_limits: Optional[dict[Priority, int]] = None,
+    ):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be >= 1.")
+        self.max_concurrent = max_concurrent
+        self.interactive_reserve = min(max(interactive_reserve, 0), max_concurrent - 1)
+        self.queue_limits = {priority: 0 for priority in Priority}
+        self.queue_limits.update(queue_limits or {})
+        self._lock = threading.Lock()
+        self._queues: dict[Priority, deque[asyncio.Future]] = {priority: deque() for priority in Priority}
+        self._stats = {priority: _ClassStats() for priority in Priority}
+        self._running = 0
+
+    @contextlib.asynccontextmanager
+    async def admit(self, priority: Optional[Priority] = None) -> AsyncIterator[None]:
+        """
+        Hold a slot for the enclosed work: ``async with scheduler.admit(): ...``.
+        ``priority`` defaults to the one of the current context.
+        """
+        priority = priority or _priority.get()
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def state(self) -> dict[str, SchedulerClassState]:
+        with self._lock:
+            return {
+                priority.value: SchedulerClassState(
+                    running=stats.running,
+                    queued=len(self._queues[priority]),
+                    queue_limit=self.queue_limits[priority],
+                    admitted=stats.admitted,
+                    shed=stats.shed,
+                    wait=stats.wait.summary(),
+                )
+                for priority, stats in self._stats.items()
+            }
+
+    # -------------------------------------------------------------------
+    # Internal Methods
+    # -------------------------------------------------------------------
+
+    async def _acquire(self, priority: Priority) -> None:
+        start = time.perf_counter()
+        with self._lock:
+            if self._can_run(priority) and not self._waiting_at_or_above(priority):
+                self._take(priority, 0.0)
+                return
+            queue = self._queues[priority]
+            if len(queue) >= self.queue_limits[priority]:
+                self._stats[priority].shed += 1
+                logger.warning("Shedding %s call: %d queued, %d running", priority.value, len(queue), self._running)
+                raise Overloaded(priority, len(queue))
+            waiter = asyncio.get_running_loop().create_future()
+            queue.append(waiter)
+
+        try:
+            await waiter
+        except BaseException:
+            # Cancelled (e.g. the deadline passed) while queued. If a slot was
+            # granted in the meantime, hand it on instead of leaking it.
+            with self._lock:
+                granted = waiter.done() and not waiter.cancelled()
+                if not granted:
+                    with contextlib.suppress(ValueError):
+                        self._queues[priority].remove(waiter)
+            if granted:
+                self._release(priority)
+            raise
+        with self._lock:
+            self._stats[priority].wait.record(time.perf_counter() - start)
+
+    def _release(self, priority: Priority) -> None:
+        with self._lock:
+            self._stats[priority].running -= 1
+            self._running -= 1
+            for waiting in PRIORITY_ORDER:
+                queue = self._queues[waiting]
+                while queue and self._can_run(waiting):
+                    waiter = queue.popleft()
+                    if waiter.done():
+                        continue
+                    self._take(waiting, None)
+                    waiter.set_result(None)
+                if queue:
+                    # Lower classes never overtake a class that is still waiting.
+                    break
+
+    def _can_run(self, priority: Priority) -> bool:
+        if self._running >= self.max_concurrent:
+            return False
+        if priority is Priority.INTERACTIVE:
+            return True
+        deferrable = self._running - self._stats[Priority.INTERACTIVE].running
+        return deferrable < self.max_concurrent - self.interactive_reserve
+
+    def _waiting_at_or_above(self, priority: Priority) -> bool:
+        for waiting in PRIORITY_ORDER:
+            if self._queues[waiting]:
+                return True
+            if waiting is priority:
+                return False
+        return False
+
+    def _take(self, priority: Priority, waited: Optional[float]) -> None:
+        stats = self._stats[priority]
+        stats.running += 1
+        stats.admitted += 1
+        self._running += 1
+        if waited is not None:
+            stats.wait.record(waited)
+
+
+_scheduler: Optional[Scheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    """
+    Return the process-wide Scheduler, configured from Settings.
+    """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                settings = get_settings()
+                _scheduler = Scheduler(
+                    settings.scheduler_max_concurrent or settings.agent_max_workers,
+                    interactive_reserve=settings.scheduler_interactive_reserve,
+                    queue_limits={
+                        Priority.INTERACTIVE: settings.scheduler_queue_interactive,
+                        Priority.BACKGROUND: settings.scheduler_queue_background,
+                        Priority.PREFETCH: settings.scheduler_queue_prefetch,
+                    },
+                )
+    return _scheduler
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+# Keys are (tool_name, canonical_arguments); counters are kept per tool name.
+CallKey = tuple[str, str]
+
+
+@dataclass
+class FlightStats:
+    """
+    Per-tool coalescing counters.
+    """
+    executions: int = 0
+    coalesced: int = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into a single execution.
+
+    The first caller for a key starts the work; callers that arrive while it
+    is still running wait for, and share, the same result or exception.
+    Once the work finishes the key is forgotten, so later calls execute again.
+
+    ``do`` serves coroutines on the event loop. The work runs as its own task,
+    so cancelling one waiter never cancels the shared execution; only when
+    the last waiter leaves is the task cancelled, releasing its scheduler
+    slot and upstream connection. ``do_sync`` serves plain callables invoked
+    from multiple threads.
+    """
+
+    def __init__(self):
+        self._tasks: dict[CallKey, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+        self._futures: dict[CallKey, Future] = {}
+        self._stats: dict[str, FlightStats] = {}
+        self._lock = threading.Lock()
+
+    async def do(self, key: CallKey, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._finish_task(key, t))
+            self._count(key, executed=True)
+        else:
+            self._count(key, executed=False)
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._leave(key, task)
+
+    def do_sync(self, key: CallKey, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = self._futures[key] = Future()
+        self._count(key, executed=leader)
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._futures.pop(key, None)
+
+    def in_flight(self) -> int:
+        return len(self._tasks) + len(self._futures)
+
+    def stats(self) -> dict[str, dict]:
+        with self._lock:
+            return {name: vars(s).copy() for name, s in self._stats.items()}
+
+    def _leave(self, key: CallKey, task: asyncio.Task) -> None:
+        remaining = self._waiters[task] - 1
+        if remaining:
+            self._waiters[task] = remaining
+            return
+        del self._waiters[task]
+        if not task.done():
+            # Nobody is left to consume the result; later callers start afresh.
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+            task.cancel()
+
+    def _finish_task(self, key: CallKey, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark the exception as retrieved even if every waiter was cancelled.
+        if not task.cancelled():
+            task.exception()
+
+    def _count(self, key: CallKey, executed: bool) -> None:
+        with self._lock:
+            stats = self._stats.get(key[0])
+            if stats is None:
+                stats = self._stats[key[0]] = FlightStats()
+            if executed:
+                stats.executions += 1
+            else:
+                stats.coalesced += 1
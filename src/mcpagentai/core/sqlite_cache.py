@@ -0,0 +1,179 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from mcp.types import EmbeddedResource, ImageContent, TextContent
+
+from .cache import DEFAULT_MAX_BYTES, CacheLookup, CachePolicy, ResponseCache, estimate_size
+from .logging import get_logger
+
+logger = get_logger("mcpagentai.sqlite_cache")
+
+_CONTENT_TYPES = {"text": TextContent, "image": ImageContent, "resource": EmbeddedResource}
+
+# Size checks (and expired-entry purges) run once per this many stores.
+EVICT_CHECK_EVERY = 64
+# An entry's LRU timestamp is only rewritten when it is older than this, so
+# hot entries don't turn every hit into a write.
+TOUCH_INTERVAL = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    tool TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fresh_until REAL NOT NULL,
+    stale_until REAL NOT NULL,
+    accessed REAL NOT NULL,
+    UNIQUE (tool, key)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+def encode_result(value: Sequence[Any]) -> str:
+    return json.dumps([item.model_dump(mode="json") for item in value], separators=(",", ":"))
+
+
+def decode_result(data: str) -> tuple:
+    return tuple(_CONTENT_TYPES[item["type"]].model_validate(item) for item in json.loads(data))
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    ResponseCache kept in a SQLite database in WAL mode, so every worker
+    process of a multi-worker server shares one cache (and its hit rate).
+
+    Same policies and stale-while-revalidate semantics as the in-memory
+    cache, with wall-clock expiry since monotonic clocks are per process.
+    Eviction is approximate LRU, checked every EVICT_CHECK_EVERY stores.
+    Hit/miss counters are per process; entries and bytes come from the
+    database. A database error is logged and treated as a miss (or a
+    skipped store) rather than failing the tool call.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        policies: Optional[dict[str, CachePolicy]] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        super().__init__(policies, max_bytes)
+        self.path = Path(path)
+        self._local = threading.local()
+        self._stores = 0
+        self._connect().executescript(_SCHEMA)
+
+    def lookup(self, tool_name: str, key: str) -> CacheLookup:
+        now = time.time()
+        try:
+            db = self._connect()
+            row = db.execute(
+                "SELECT id, value, fresh_until, stale_until, accessed FROM entries WHERE tool = ? AND key = ?",
+                (tool_name, key),
+            ).fetchone()
+            if row is not None and now >= row[3]:
+                db.execute("DELETE FROM entries WHERE id = ?", (row[0],))
+                row = None
+            if row is not None and now - row[4] >= TOUCH_INTERVAL:
+                db.execute("UPDATE entries SET accessed = ? WHERE id = ?", (now, row[0]))
+        except sqlite3.Error as e:
+            logger.warning("Cache lookup for %s failed: %s", tool_name, e)
+            row = None
+
+        with self._lock:
+            stats = self._stats_for(tool_name)
+            if row is None:
+                stats.misses += 1
+                return CacheLookup()
+            if now < row[2]:
+                stats.hits += 1
+            else:
+                stats.stale_hits += 1
+        return CacheLookup(value=decode_result(row[1]), stale=now >= row[2])
+
+    def store(self, tool_name: str, key: str, value: Sequence[Any]) -> None:
+        policy = self.policies.get(tool_name)
+        if policy is None:
+            return
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        try:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO entries (tool, key, value, size, fresh_until, stale_until, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (tool_name, key, encode_result(value), size, now + policy.ttl,
+                 now + policy.ttl + policy.stale_ttl, now),
+            )
+            with self._lock:
+                self._stores += 1
+                check = self._stores % EVICT_CHECK_EVERY == 0
+            if check:
+                self._evict_shared(db, now)
+        except sqlite3.Error as e:
+            logger.warning("Cache store for %s failed: %s", tool_name, e)
+
+    def invalidate(self, tool_name: Optional[str] = None) -> None:
+        db = self._connect()
+        if tool_name is None:
+            db.execute("DELETE FROM entries")
+        else:
+            db.execute("DELETE FROM entries WHERE tool = ?", (tool_name,))
+
+    def stats(self) -> dict[str, dict]:
+        stats = super().stats()
+        rows = self._connect().execute("SELECT tool, COUNT(*), TOTAL(size) FROM entries GROUP BY tool").fetchall()
+        for tool, entries, size in rows:
+            tool_stats = stats.setdefault(tool, {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0})
+            tool_stats.update(entries=entries, bytes=int(size))
+        return stats
+
+    @property
+    def total_bytes(self) -> int:
+        return int(self._connect().execute("SELECT TOTAL(size) FROM entries").fetchone()[0])
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    # -------------------------------------------------------------------
+    # Internal Methods
+    # -------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread, and never one inherited across fork().
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def _evict_shared(self, db: sqlite3.Connection, now: float) -> None:
+        db.execute("DELETE FROM entries WHERE stale_until <= ?", (now,))
+        total, count = db.execute("SELECT TOTAL(size), COUNT(*) FROM entries").fetchone()
+        if total <= self.max_bytes or not count:
+            return
+        # Drop the least recently used entries, estimating how many from the
+        # average entry size, plus a tenth of the cache as headroom.
+        excess = total - self.max_bytes * 0.9
+        victims = db.execute(
+            "SELECT id, tool FROM entries ORDER BY accessed LIMIT ?",
+            (max(int(excess / (total / count)) + 1, 1),),
+        ).fetchall()
+        db.executemany("DELETE FROM entries WHERE id = ?", [(row[0],) for row in victims])
+        with self._lock:
+            for _, tool in victims:
+                self._stats_for(tool).evictions += 1
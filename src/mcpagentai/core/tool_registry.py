@@ -0,0 +1,83 @@
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional
+
+from mcp.types import Tool
+
+from .agent_base import MCPAgent
+
+
+class DuplicateToolError(ValueError):
+    """
+    Raised when two agents register a tool under the same name.
+    """
+
+
+class ToolRegistry:
+    """
+    Frozen routing table mapping tool names to the agent that implements them.
+
+    The table and the combined tool list are computed once, when the registry is
+    built, so dispatch is a single dict lookup regardless of how many agents or
+    tools are registered. Agents whose tool set changes at runtime must call
+    ``invalidate()`` (via ``MultiToolAgent.invalidate_tools``) to rebuild it.
+    """
+
+    def __init__(self, agents: Iterable[MCPAgent]):
+        self._agents = tuple(agents)
+        self._snapshot: tuple[Mapping[str, MCPAgent], tuple[Tool, ...]] = (MappingProxyType({}), ())
+        self.invalidate()
+
+    @property
+    def agents(self) -> tuple[MCPAgent, ...]:
+        return self._agents
+
+    @property
+    def tools(self) -> tuple[Tool, ...]:
+        """
+        Precomputed union of every agent's tools, in registration order.
+        """
+        return self._snapshot[1]
+
+    @property
+    def routes(self) -> Mapping[str, MCPAgent]:
+        """
+        Read-only tool name -> agent mapping.
+        """
+        return self._snapshot[0]
+
+    def resolve(self, tool_name: str) -> Optional[MCPAgent]:
+        """
+        Return the agent implementing ``tool_name``, or None if nobody does.
+        """
+        return self._snapshot[0].get(tool_name)
+
+    def invalidate(self) -> None:
+        """
+        Rebuild the routing table from each agent's current ``list_tools()``.
+
+        The new table is built on the side and swapped in with a single
+        assignment, so concurrent lookups never observe a half-built registry.
+
+        Raises:
+            DuplicateToolError: If two agents expose a tool with the same name.
+        """
+        routes: dict[str, MCPAgent] = {}
+        tools: list[Tool] = []
+        for agent in self._agents:
+            for tool in agent.list_tools():
+                owner = routes.get(tool.name)
+                if owner is not None:
+                    raise DuplicateToolError(
+                        f"Duplicate tool name '{tool.name}' registered by "
+                        f"{owner.__class__.__name__} and {agent.__class__.__name__}"
+                    )
+                routes[tool.name] = agent
+                tools.append(tool)
+
+        self._snapshot = (MappingProxyType(routes), tuple(tools))
+
+    def __contains__(self, tool_name: str) -> bool:
+        return tool_name in self._snapshot[0]
+
+    def __len__(self) -> int:
+        return len(self._snapshot[0])
@@ -0,0 +1,148 @@
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .cache import canonical_arguments
+from .logging import get_logger
+
+logger = get_logger("mcpagentai.trace")
+
+# Writer thread flushes at least this often while calls are being recorded.
+FLUSH_INTERVAL = 1.0
+
+
+@dataclass
+class TraceEntry:
+    """
+    One recorded tool call.
+
+    Attributes:
+        ts: Wall-clock start time (Unix seconds).
+        tool: Tool name.
+        args: Canonical JSON encoding of the arguments.
+        ms: Latency in milliseconds.
+        bytes: Size of the text result (0 on error).
+        err: Exception class name, or None on success.
+    """
+    ts: float
+    tool: str
+    args: str
+    ms: float
+    bytes: int
+    err: Optional[str] = None
+
+    @property
+    def arguments(self) -> dict:
+        return json.loads(self.args)
+
+    def to_line(self) -> str:
+        # args is already canonical JSON; embed it as-is rather than as a string.
+        err = json.dumps(self.err)
+        return (
+            f'{{"ts":{self.ts:.6f},"tool":{json.dumps(self.tool)},"args":{self.args},'
+            f'"ms":{self.ms:.3f},"bytes":{self.bytes},"err":{err}}}\n'
+        )
+
+    @classmethod
+    def from_line(cls, line: str) -> "TraceEntry":
+        data = json.loads(line)
+        return cls(
+            ts=data["ts"],
+            tool=data["tool"],
+            args=canonical_arguments(data["args"]),
+            ms=data["ms"],
+            bytes=data["bytes"],
+            err=data.get("err"),
+        )
+
+
+def read_trace(path: str | Path) -> Iterator[TraceEntry]:
+    """
+    Yield the entries of a trace file in order, skipping a torn final line.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            yield TraceEntry.from_line(line)
+
+
+class TraceRecorder:
+    """
+    Append-only JSON-lines recorder for tool calls.
+
+    ``record`` only enqueues; a background thread batches lines into the
+    file, so recording never does file I/O on the event loop.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.recorded = 0
+        self._queue: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="mcpagentai-trace", daemon=True)
+        self._thread.start()
+        logger.info("Recording tool calls to %s", self.path)
+
+    def record(
+        self,
+        tool: str,
+        arguments: Optional[dict],
+        started_at: float,
+        latency: float,
+        result_size: int,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        entry = TraceEntry(
+            ts=started_at,
+            tool=tool,
+            args=canonical_arguments(arguments),
+            ms=latency * 1000,
+            bytes=result_size,
+            err=type(error).__name__ if error is not None else None,
+        )
+        self.recorded += 1
+        self._queue.put(entry.to_line())
+
+    def close(self) -> None:
+        """
+        Write out pending entries and stop the writer thread.
+        """
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                try:
+                    line = self._queue.get(timeout=FLUSH_INTERVAL)
+                except queue.Empty:
+                    f.flush()
+                    continue
+                if line is None:
+                    break
+                f.write(line)
+                # Drain whatever else is queued before the next flush.
+                while True:
+                    try:
+                        line = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if line is None:
+                        f.flush()
+                        return
+                    f.write(line)
+                f.flush()
+
+
+def default_trace_path(store_dir: str | Path, trace_dir: str) -> Path:
+    """
+    A fresh trace file name under ``store_dir/trace_dir``, unique per process start.
+    """
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return Path(store_dir) / trace_dir / f"trace-{stamp}-{os.getpid()}.jsonl"
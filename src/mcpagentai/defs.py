@@ -7,6 +7,122 @@ from pydantic import BaseModel
 from typing import List, Dict, Optional
 
 
+# -------------------------------------------------------------------------
+# CORE (aggregator-level) MODELS
+# -------------------------------------------------------------------------
+class CoreTools(str, Enum):
+    BATCH_CALL = "batch_call"
+    GET_SERVER_METRICS = "get_server_metrics"
+    SET_PROFILING = "set_profiling"
+    GET_MEMORY_REPORT = "get_memory_report"
+
+class BatchItemResult(BaseModel):
+    """Outcome of a single entry of a batch_call request."""
+    index: int
+    name: str
+    success: bool
+    content: Optional[List[str]] = None
+    error: Optional[str] = None
+
+class BatchCallResult(BaseModel):
+    results: List[BatchItemResult]
+
+class LatencySummary(BaseModel):
+    count: int
+    mean_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+
+class CallMetrics(BaseModel):
+    """Counters and latency for one tool or upstream host."""
+    calls: int
+    errors: int
+    in_flight: int
+    cache_hits: int
+    latency: LatencySummary
+
+class UpstreamState(BaseModel):
+    """Circuit breaker and adaptive concurrency state of one upstream host."""
+    circuit: str
+    open_for_seconds: float
+    consecutive_failures: int
+    concurrency_limit: float
+    in_flight: int
+    rejected: int
+    retries: int
+    retry_tokens: float
+
+class UpstreamPool(BaseModel):
+    """Keep-alive connection pool of one upstream host (requests per opened connection = reuse)."""
+    maxsize: int
+    idle: int
+    connections_opened: int
+
+class ToolCacheMetrics(BaseModel):
+    """Response cache counters and occupancy of one tool."""
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+class ToolCoalescingMetrics(BaseModel):
+    """Executions of one tool and the identical concurrent calls that shared them."""
+    executions: int = 0
+    coalesced: int = 0
+
+class SchedulerClassState(BaseModel):
+    """Admission queue of one priority class (interactive, background, prefetch)."""
+    running: int
+    queued: int
+    queue_limit: int
+    admitted: int
+    shed: int
+    wait: LatencySummary
+
+class ServerMetrics(BaseModel):
+    uptime_seconds: float
+    tools: Dict[str, CallMetrics]
+    upstream_hosts: Dict[str, CallMetrics]
+    upstream_state: Dict[str, UpstreamState] = {}
+    upstream_pools: Dict[str, UpstreamPool] = {}
+    cache: Dict[str, ToolCacheMetrics] = {}
+    coalescing: Dict[str, ToolCoalescingMetrics] = {}
+    scheduler: Dict[str, SchedulerClassState] = {}
+
+class ProfilingStatus(BaseModel):
+    """Current settings and counters of the tool-call profiler."""
+    enabled: bool
+    sample_every: int
+    slow_ms: float
+    interval_ms: float
+    directory: str
+    profiled_calls: int
+    profiles_written: int
+
+class AllocationSite(BaseModel):
+    """Memory held by one allocation site and its change against a reference snapshot."""
+    site: str
+    size_bytes: int
+    size_diff_bytes: int
+    count: int
+    count_diff: int
+
+class MemoryReport(BaseModel):
+    timestamp: float
+    uptime_seconds: float
+    rss_bytes: Optional[int] = None
+    peak_rss_bytes: Optional[int] = None
+    collections: Dict[str, int]
+    traced_bytes: Optional[int] = None
+    traced_peak_bytes: Optional[int] = None
+    growth_since_start: List[AllocationSite] = []
+    growth_since_last: List[AllocationSite] = []
+
+
 # -------------------------------------------------------------------------
 # TIME MODELS (example if you have them)
 # -------------------------------------------------------------------------
@@ -31,15 +147,106 @@ class TimeConversionResult(BaseModel):
 class WeatherTools(str, Enum):
     GET_CURRENT_WEATHER = "get_current_weather"
     FORECAST = "get_weather_forecast"
+    GET_CURRENT_WEATHER_BATCH = "get_current_weather_batch"
+    FORECAST_BATCH = "get_weather_forecast_batch"
+    GET_CACHE_STATS = "get_weather_cache_stats"
+    HOURLY_FORECAST = "get_hourly_forecast"
+    FIND_PLACES = "find_places"
+
+class GazetteerPlace(BaseModel):
+    """
+    A gazetteer entry and how it matched ("exact", "prefix", "fuzzy" or
+    "nearest"). Weather results carry the place a city name resolved to.
+    """
+    name: str
+    country: str
+    latitude: float
+    longitude: float
+    population: int
+    match: str
+    distance_km: Optional[float] = None
 
 class CurrentWeatherResult(BaseModel):
     location: str
     temperature: float
     description: str
+    place: Optional[GazetteerPlace] = None
 
 class WeatherForecastResult(BaseModel):
+    """
+    Day-by-day rows by default; with caller-selected variables, the
+    Open-Meteo columns instead (name -> values, plus "time"), with units.
+    """
+    location: str
+    forecast: List[Dict] = []
+    daily: Optional[Dict[str, List]] = None
+    hourly: Optional[Dict[str, List]] = None
+    units: Optional[Dict[str, Dict[str, str]]] = None
+    place: Optional[GazetteerPlace] = None
+
+class CurrentWeatherBatchResult(BaseModel):
+    """Current weather per location, in request order."""
+    results: List[CurrentWeatherResult]
+    upstream_requests: int
+
+class WeatherForecastBatchResult(BaseModel):
+    """Forecast per location, in request order."""
+    results: List[WeatherForecastResult]
+    upstream_requests: int
+
+class HourlyVariableSummary(BaseModel):
+    """Per-day aggregates of one hourly variable, and its peak rolling-window mean."""
+    daily_min: List[Optional[float]]
+    daily_max: List[Optional[float]]
+    daily_mean: List[Optional[float]]
+    peak_window_mean: Optional[float] = None
+    peak_window_start: Optional[str] = None
+
+class HourlyThresholdEvent(BaseModel):
+    """When an hourly variable reaches a threshold (e.g. the first hour of rain)."""
+    variable: str
+    threshold: float
+    first_time: Optional[str]
+    hours_at_or_above: int
+    crossings: List[str]
+
+class HourlyForecastResult(BaseModel):
+    """
+    "summary" output fills dates/summary, "columnar" fills columns (the
+    hourly values, plus "<variable>_mean_<window>h" rolling means).
+    """
     location: str
-    forecast: List[Dict]
+    hours: int
+    window_hours: int
+    units: Dict[str, str]
+    dates: List[str] = []
+    summary: Optional[Dict[str, HourlyVariableSummary]] = None
+    columns: Optional[Dict[str, List]] = None
+    thresholds: List[HourlyThresholdEvent] = []
+    place: Optional[GazetteerPlace] = None
+
+class PlaceLookupResult(BaseModel):
+    query: str
+    places: List[GazetteerPlace]
+
+class WeatherGridCell(BaseModel):
+    """One cell of the weather grid cache (coordinates of its center)."""
+    query: str
+    latitude: float
+    longitude: float
+    hits: int
+    expires_in_seconds: float
+
+class WeatherCacheStats(BaseModel):
+    grid_degrees: float
+    entries: int
+    cells: int
+    hits: int
+    misses: int
+    expired: int
+    evictions: int
+    hit_rate: float
+    hottest_cells: List[WeatherGridCell]
 
 
 # -------------------------------------------------------------------------
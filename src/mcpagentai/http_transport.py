@@ -0,0 +1,410 @@
+"""
+Network transports for the MCP server: SSE (``/sse`` + ``/messages/``) and,
+with an SDK that provides it, streamable HTTP (``/mcp``).
+
+One process serves every client, so they share the agent registry, the
+HTTP connection pools and the response cache. ``ConnectionManager`` bounds
+what each client may use and drains in-flight calls on shutdown.
+
+Behind a pre-fork master (mcpagentai.prefork) several workers accept on
+the same port. An SSE session lives in the worker holding its stream, so
+its message endpoint names that worker and POSTs that land elsewhere are
+forwarded over the owner's Unix socket; streamable HTTP runs stateless.
+"""
+
+import asyncio
+import contextlib
+import socket
+import time
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+
+import anyio
+from mcp.server import Server
+from mcp.server.models import InitializationOptions
+
+try:
+    import httpx
+    import uvicorn
+    from mcp.server.sse import SseServerTransport  # needs starlette
+    from starlette.responses import PlainTextResponse, Response
+except ImportError as e:
+    raise ImportError(
+        f"The sse and http transports need {e.name}, which is not installed. "
+        "Install them with: pip install 'mcpagentai[http]'"
+    ) from e
+
+from mcpagentai.core.config import Settings
+from mcpagentai.core.logging import get_logger
+
+try:
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+except ImportError:  # mcp < 1.8
+    StreamableHTTPSessionManager = None
+
+logger = get_logger("mcpagentai.http_transport")
+
+SSE_PATH = "/sse"
+MESSAGES_PATH = "/messages/"
+STREAMABLE_HTTP_PATH = "/mcp"
+# Once in-flight calls have drained, idle client streams are given this
+# long to close before uvicorn cancels them.
+STREAM_CLOSE_TIMEOUT = 2.0
+# Bound on relaying one SSE message POST to the worker owning the session.
+FORWARD_TIMEOUT = 10.0
+
+
+class ConnectionLimitExceeded(RuntimeError):
+    """
+    Raised when a client exceeds its per-connection limits, or calls a
+    server that is draining.
+    """
+
+
+@dataclass(frozen=True)
+class ConnectionLimits:
+    """
+    Attributes:
+        max_connections: Open SSE streams (or, for streamable HTTP, concurrent
+            HTTP requests) beyond which new ones get a 503.
+        rate / burst: Token bucket of tool calls per second per client
+            session (rate 0 disables).
+        drain_timeout: On shutdown, how long in-flight calls may take to finish.
+    """
+    max_connections: int = 100
+    rate: float = 20.0
+    burst: int = 40
+    drain_timeout: float = 30.0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ConnectionLimits":
+        return cls(
+            max_connections=settings.server_max_connections,
+            rate=settings.server_connection_rate,
+            burst=settings.server_connection_burst,
+            drain_timeout=settings.server_drain_timeout,
+        )
+
+
+@dataclass(frozen=True)
+class WorkerRouting:
+    """
+    Identity of one worker of a pre-fork server, and where its siblings'
+    Unix sockets (for forwarded SSE messages) live.
+    """
+    index: int
+    socket_dir: Path
+
+    def socket_path(self, index: int) -> Path:
+        return self.socket_dir / f"worker-{index}.sock"
+
+    def listen(self) -> socket.socket:
+        path = self.socket_path(self.index)
+        path.unlink(missing_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(str(path))
+        sock.listen()
+        return sock
+
+
+class _SessionState:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: int):
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+
+class ConnectionManager:
+    """
+    Tracks open connections and in-flight tool calls of a network transport.
+
+    Per-session state is keyed by the SDK's session object and dropped with
+    it. Everything runs on the event loop, so no locking is needed.
+    """
+
+    def __init__(self, limits: ConnectionLimits):
+        self.limits = limits
+        self.open_connections = 0
+        self.in_flight = 0
+        self.draining = False
+        self._sessions: weakref.WeakKeyDictionary[Any, _SessionState] = weakref.WeakKeyDictionary()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        # Set once draining is over: open client streams are then closed.
+        self.closed = asyncio.Event()
+
+    @contextlib.contextmanager
+    def connection(self):
+        """
+        Hold a connection slot; raises ConnectionLimitExceeded if none is free.
+        """
+        if self.draining:
+            raise ConnectionLimitExceeded("Server is shutting down")
+        if self.open_connections >= self.limits.max_connections:
+            raise ConnectionLimitExceeded(f"Too many connections ({self.open_connections})")
+        self.open_connections += 1
+        try:
+            yield
+        finally:
+            self.open_connections -= 1
+
+    @contextlib.asynccontextmanager
+    async def call(self, session: Any) -> AsyncIterator[None]:
+        """
+        Admit one tool call of ``session`` against its rate limit.
+
+        The SDK handles a session's requests one at a time, so a session
+        never has more than one call in flight and needs no concurrency limit.
+        """
+        if self.draining:
+            raise ConnectionLimitExceeded("Server is shutting down, not accepting new calls")
+        state = self._sessions.get(session)
+        if state is None:
+            state = self._sessions[session] = _SessionState(self.limits.burst)
+        if self.limits.rate > 0:
+            now = time.monotonic()
+            state.tokens = min(state.tokens + (now - state.updated) * self.limits.rate, float(self.limits.burst))
+            state.updated = now
+            if state.tokens < 1:
+                raise ConnectionLimitExceeded(
+                    f"Rate limit exceeded on this connection ({self.limits.rate:g} calls/s)"
+                )
+            state.tokens -= 1
+
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._idle.set()
+
+    async def drain(self) -> bool:
+        """
+        Stop admitting connections and calls, and wait for in-flight calls to
+        finish. Returns False if ``drain_timeout`` passed first.
+        """
+        self.draining = True
+        logger.info(
+            "Draining: %d call(s) in flight on %d connection(s)", self.in_flight, self.open_connections
+        )
+        try:
+            async with asyncio.timeout(self.limits.drain_timeout):
+                await self._idle.wait()
+        except TimeoutError:
+            logger.warning("Drain timeout: abandoning %d call(s) still in flight", self.in_flight)
+            return False
+        finally:
+            self.closed.set()
+        logger.info("Drained")
+        return True
+
+
+class _DrainingServer(uvicorn.Server):
+    """
+    uvicorn server whose first SIGINT/SIGTERM drains in-flight calls before
+    shutting down; a second one shuts down immediately.
+    """
+
+    def __init__(self, config: uvicorn.Config, connections: ConnectionManager):
+        super().__init__(config)
+        self.connections = connections
+        self._drain_requested = False
+        self._drain: Optional[asyncio.Task] = None
+
+    def handle_exit(self, sig: int, frame) -> None:
+        if self._drain_requested:
+            super().handle_exit(sig, frame)
+        else:
+            # Picked up by on_tick, on the event loop.
+            self._drain_requested = True
+
+    async def on_tick(self, counter: int) -> bool:
+        if self._drain_requested and self._drain is None:
+            self._drain = asyncio.create_task(self.connections.drain())
+        if self._drain is not None and self._drain.done():
+            return True
+        return await super().on_tick(counter)
+
+
+def build_app(
+    server: Server,
+    options: InitializationOptions,
+    transport: str,
+    connections: ConnectionManager,
+    routing: Optional[WorkerRouting] = None,
+):
+    """
+    Return the ASGI application for ``transport`` ("sse" or "http") and an
+    async context manager to run around serving it.
+    """
+    if transport == "sse":
+        if routing is None:
+            sse = SseServerTransport(MESSAGES_PATH)
+        else:
+            sse = SseServerTransport(f"{MESSAGES_PATH}{routing.index}/")
+        forwarder = _MessageForwarder(routing) if routing is not None else None
+
+        async def app(scope, receive, send):
+            if scope["type"] != "http":
+                return
+            path = scope["path"]
+            if path == SSE_PATH and scope["method"] == "GET":
+                try:
+                    with connections.connection():
+                        await _run_sse_session(sse, server, options, connections, scope, receive, send)
+                except ConnectionLimitExceeded as e:
+                    await _unavailable(str(e))(scope, receive, send)
+            elif path.startswith(MESSAGES_PATH) and scope["method"] == "POST":
+                owner = path[len(MESSAGES_PATH):].strip("/")
+                if forwarder is not None and owner.isdigit() and int(owner) != routing.index:
+                    await forwarder.forward(int(owner), scope, receive, send)
+                else:
+                    await sse.handle_post_message(scope, receive, send)
+            else:
+                await PlainTextResponse("Not found", status_code=404)(scope, receive, send)
+
+        return app, forwarder or contextlib.nullcontext()
+
+    if StreamableHTTPSessionManager is None:
+        raise RuntimeError("The streamable HTTP transport needs mcp >= 1.8; use the sse transport instead.")
+    # With several workers a client's requests can reach any of them, so
+    # no session state may outlive a request.
+    manager = StreamableHTTPSessionManager(app=server, stateless=routing is not None)
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        if scope["path"].rstrip("/") != STREAMABLE_HTTP_PATH:
+            await PlainTextResponse("Not found", status_code=404)(scope, receive, send)
+            return
+        try:
+            with connections.connection():
+                await manager.handle_request(scope, receive, send)
+        except ConnectionLimitExceeded as e:
+            await _unavailable(str(e))(scope, receive, send)
+
+    return app, manager.run()
+
+
+async def serve_http(
+    server: Server,
+    options: InitializationOptions,
+    transport: str,
+    host: str,
+    port: int,
+    connections: ConnectionManager,
+    sock: Optional[socket.socket] = None,
+    routing: Optional[WorkerRouting] = None,
+) -> None:
+    """
+    Serve ``server`` over ``transport`` until SIGINT/SIGTERM, then drain.
+    With ``sock``, accept on that already-bound socket (shared by the
+    workers of a pre-fork server) instead of binding ``host:port``; with
+    ``routing``, also on this worker's Unix socket.
+    """
+    app, lifetime = build_app(server, options, transport, connections, routing)
+    sockets = None
+    if sock is not None:
+        sockets = [sock]
+        if routing is not None:
+            sockets.append(routing.listen())
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        lifespan="off",
+        log_config=None,
+        access_log=False,
+        timeout_graceful_shutdown=STREAM_CLOSE_TIMEOUT,
+    )
+    path = SSE_PATH if transport == "sse" else STREAMABLE_HTTP_PATH
+    async with lifetime:
+        logger.info("Running server on http://%s:%s%s (%s)", host, port, path, transport)
+        await _DrainingServer(config, connections).serve(sockets=sockets)
+
+
+class _MessageForwarder:
+    """
+    Relays SSE message POSTs to the worker that owns the session. Used as
+    the app's lifetime context, which closes its client.
+    """
+
+    def __init__(self, routing: WorkerRouting):
+        self.routing = routing
+        self._clients: dict[int, httpx.AsyncClient] = {}
+
+    async def forward(self, owner: int, scope, receive, send) -> None:
+        client = self._clients.get(owner)
+        if client is None:
+            transport = httpx.AsyncHTTPTransport(uds=str(self.routing.socket_path(owner)))
+            client = self._clients[owner] = httpx.AsyncClient(transport=transport, timeout=FORWARD_TIMEOUT)
+        body = bytearray()
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        headers = {
+            key.decode("latin-1"): value.decode("latin-1")
+            for key, value in scope["headers"]
+            if key == b"content-type"
+        }
+        url = f"http://worker{scope['path']}?{scope['query_string'].decode('latin-1')}"
+        try:
+            upstream = await client.post(url, content=bytes(body), headers=headers)
+        except httpx.TransportError as e:
+            logger.warning("Worker %d unreachable for a forwarded message: %s", owner, e)
+            # The owner (and with it the session) is gone.
+            await PlainTextResponse("Could not find session", status_code=404)(scope, receive, send)
+            return
+        await Response(upstream.content, status_code=upstream.status_code)(scope, receive, send)
+
+    async def __aenter__(self) -> "_MessageForwarder":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+async def _run_sse_session(
+    sse: SseServerTransport,
+    server: Server,
+    options: InitializationOptions,
+    connections: ConnectionManager,
+    scope,
+    receive,
+    send,
+) -> None:
+    # The SDK's session keeps waiting for messages after the client has gone
+    # away, which would hold the connection slot forever; end it when the
+    # client disconnects or the server has drained.
+    disconnected = anyio.Event()
+
+    async def watched_receive():
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            disconnected.set()
+        return message
+
+    async with sse.connect_sse(scope, watched_receive, send) as (read_stream, write_stream):
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(_cancel_on, tg.cancel_scope, disconnected.wait)
+            tg.start_soon(_cancel_on, tg.cancel_scope, connections.closed.wait)
+            await server.run(read_stream, write_stream, options)
+            tg.cancel_scope.cancel()
+
+
+async def _cancel_on(scope: anyio.CancelScope, event_wait) -> None:
+    await event_wait()
+    scope.cancel()
+
+
+def _unavailable(message: str) -> PlainTextResponse:
+    return PlainTextResponse(message, status_code=503, headers={"Retry-After": "5"})
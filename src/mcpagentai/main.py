@@ -1,11 +1,43 @@
+import argparse
 import asyncio
-import os
 
-from mcpagentai.server import start_server
+from mcpagentai.core.config import get_settings
+from mcpagentai.server import TRANSPORTS, start_server
 
 def main():
     """
     CLI entry point for the 'mcpagentai' command.
     """
-    local_timezone = os.getenv("LOCAL_TIMEZONE", None)
-    asyncio.run(start_server(local_timezone=local_timezone))
+    parser = argparse.ArgumentParser(prog="mcpagentai", description="Run the MCPAgentAI MCP server.")
+    parser.add_argument("--local-timezone", help="IANA timezone for the time tools (overrides LOCAL_TIMEZONE)")
+    parser.add_argument(
+        "--transport", choices=TRANSPORTS,
+        help="stdio (default), sse or http (streamable HTTP); overrides SERVER_TRANSPORT",
+    )
+    parser.add_argument("--host", help="Address to listen on for sse/http (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, help="Port to listen on for sse/http (default 8000)")
+    parser.add_argument(
+        "--workers", type=int,
+        help="Worker processes sharing the sse/http port (default 1); overrides SERVER_WORKERS",
+    )
+    args = parser.parse_args()
+
+    settings = get_settings()
+    local_timezone = args.local_timezone or settings.local_timezone
+    workers = args.workers or settings.server_workers
+    if workers > 1:
+        from mcpagentai.prefork import run_prefork
+        run_prefork(
+            workers,
+            args.transport or settings.server_transport,
+            host=args.host,
+            port=args.port,
+            local_timezone=local_timezone,
+        )
+        return
+    asyncio.run(start_server(
+        local_timezone=local_timezone,
+        transport=args.transport,
+        host=args.host,
+        port=args.port,
+    ))
@@ -0,0 +1,182 @@
+"""
+Pre-fork multi-worker mode for the network transports.
+
+The master binds the listening socket once, forks ``workers`` processes that
+all accept on it (the kernel spreads connections between them), restarts
+workers that die, and forwards SIGINT/SIGTERM so each worker drains its
+in-flight calls before exiting. Every worker runs its own event loop and
+agents; what they must share lives outside the process: the response cache
+in a SQLite database, and the Twitter loops behind a leader lock.
+"""
+
+import asyncio
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+
+from mcpagentai.core.config import get_settings, set_settings
+from mcpagentai.core.logging import get_logger, shutdown_logging
+from mcpagentai.http_transport import WorkerRouting
+
+logger = get_logger("mcpagentai.prefork")
+
+# A worker that dies sooner than this after starting is restarted with an
+# exponentially growing delay (up to MAX_RESPAWN_DELAY), not in a tight loop.
+MIN_WORKER_LIFETIME = 10.0
+MAX_RESPAWN_DELAY = 30.0
+# How often a worker checks that the master is still alive.
+PARENT_POLL_INTERVAL = 1.0
+LISTEN_BACKLOG = 2048
+
+
+def run_prefork(
+    workers: int,
+    transport: str,
+    host: str | None = None,
+    port: int | None = None,
+    local_timezone: str | None = None,
+) -> int:
+    """
+    Serve ``transport`` ("sse" or "http") from ``workers`` processes sharing
+    one listening socket. Returns once every worker has exited after a
+    SIGINT/SIGTERM.
+    """
+    if transport == "stdio":
+        raise ValueError("Multiple workers need a network transport (sse or http), not stdio.")
+    if not hasattr(os, "fork"):
+        raise RuntimeError("Multiple workers need os.fork(); run a single worker on this platform.")
+    if workers < 1:
+        raise ValueError("workers must be >= 1.")
+
+    settings = replace(get_settings(), server_workers=workers)
+    set_settings(settings)
+    host = host or settings.server_host
+    port = port or settings.server_port
+
+    sock = socket.create_server((host, port), backlog=LISTEN_BACKLOG)
+    sock.set_inheritable(True)
+    # Workers' Unix sockets, for SSE messages that reach the wrong worker.
+    socket_dir = Path(tempfile.mkdtemp(prefix="mcpagentai-"))
+    logger.info("Master %d listening on %s:%d with %d workers (%s)", os.getpid(), host, port, workers, transport)
+
+    children: dict[int, int] = {}
+    started: dict[int, float] = {}
+    failures: dict[int, int] = {}
+    stopping = False
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            routing = WorkerRouting(index, socket_dir)
+            os._exit(_run_worker(routing, sock, transport, host, port, local_timezone))
+        children[pid] = index
+        started[index] = time.monotonic()
+        logger.info("Started worker %d (pid %d)", index, pid)
+
+    def forward(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        # A second signal is forwarded too, which makes workers skip draining.
+        for pid in list(children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, forward)
+    signal.signal(signal.SIGTERM, forward)
+
+    for index in range(1, workers + 1):
+        spawn(index)
+
+    try:
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            index = children.pop(pid, None)
+            if index is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if stopping:
+                logger.info("Worker %d (pid %d) exited with %d", index, pid, code)
+                continue
+
+            if time.monotonic() - started[index] < MIN_WORKER_LIFETIME:
+                failures[index] = failures.get(index, 0) + 1
+            else:
+                failures[index] = 0
+            delay = min(2 ** failures[index] - 1, MAX_RESPAWN_DELAY)
+            logger.warning("Worker %d (pid %d) exited with %d; restarting in %.0fs", index, pid, code, delay)
+            time.sleep(delay)
+            if not stopping:
+                spawn(index)
+    finally:
+        sock.close()
+        shutil.rmtree(socket_dir, ignore_errors=True)
+    logger.info("All workers exited")
+    return 0
+
+
+# -------------------------------------------------------------------
+# Internal Methods
+# -------------------------------------------------------------------
+
+def _run_worker(
+    routing: WorkerRouting,
+    sock: socket.socket,
+    transport: str,
+    host: str,
+    port: int,
+    local_timezone: str | None,
+) -> int:
+    # Runs in the forked child and never returns into the master's code.
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    # Leave the terminal's process group: a Ctrl-C reaches the master only,
+    # which forwards it once, so workers drain instead of seeing it twice.
+    os.setpgid(0, 0)
+
+    index = routing.index
+    settings = get_settings()
+    set_settings(replace(
+        settings,
+        metrics_file=_worker_file(settings.metrics_file, index),
+        memory_file=_worker_file(settings.memory_file, index),
+    ))
+    threading.Thread(
+        target=_exit_with_parent, args=(os.getppid(),), name="mcpagentai-parent-watch", daemon=True
+    ).start()
+
+    from mcpagentai.server import start_server
+
+    code = 0
+    try:
+        asyncio.run(start_server(local_timezone, transport, host, port, sock=sock, routing=routing))
+    except BaseException:
+        logger.exception("Worker %d failed", index)
+        code = 1
+    finally:
+        shutdown_logging()
+    return code
+
+
+def _worker_file(name: str, index: int) -> str:
+    # "metrics.prom" -> "metrics.worker2.prom": one file per worker.
+    path = Path(name)
+    return str(path.with_name(f"{path.stem}.worker{index}{path.suffix}"))
+
+
+def _exit_with_parent(parent: int) -> None:
+    # If the master is killed outright, drain and exit rather than linger.
+    while os.getppid() == parent:
+        time.sleep(PARENT_POLL_INTERVAL)
+    logger.warning("Master %d is gone; shutting down worker %d", parent, os.getpid())
+    os.kill(os.getpid(), signal.SIGTERM)
@@ -1,51 +1,94 @@
-from typing import Sequence
+import contextlib
+import socket
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Sequence
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import TextContent, ImageContent, EmbeddedResource
 
-from mcpagentai.core.logging import get_logger
-from mcpagentai.core.multi_tool_agent import MultiToolAgent
-
-# Sub-agents
-from mcpagentai.tools.calculator_agent import CalculatorAgent
-from mcpagentai.tools.currency_agent import CurrencyAgent
-from mcpagentai.tools.dictionary_agent import DictionaryAgent
-from mcpagentai.tools.eliza.agent import ElizaAgent
-from mcpagentai.tools.eliza.mcp_agent import ElizaMCPAgent
-from mcpagentai.tools.stock_agent import StockAgent
-from mcpagentai.tools.time_agent import TimeAgent
-#from mcpagentai.tools.twitter.api_agent import TwitterAgent
-# from mcpagentai.tools.twitter.client_agent import TwitterAgent
-from mcpagentai.tools.twitter.agent import TwitterAgent
-from mcpagentai.tools.weather_agent import WeatherAgent
-
-async def start_server(local_timezone: str | None = None) -> None:
+from mcpagentai.core.agent_loader import get_agent_loader
+from mcpagentai.core.cache import estimate_size
+from mcpagentai.core.config import get_settings
+from mcpagentai.core.logging import configure_logging, get_logger
+from mcpagentai.core.memory import get_memory_monitor
+from mcpagentai.core.metrics import MetricsExporter, get_metrics
+from mcpagentai.core.multi_tool_agent import MultiToolAgent, set_dispatcher
+from mcpagentai.core.trace import TraceRecorder, default_trace_path
+
+if TYPE_CHECKING:
+    from mcpagentai.http_transport import WorkerRouting
+
+TRANSPORTS = ("stdio", "sse", "http")
+
+
+async def start_server(
+    local_timezone: str | None = None,
+    transport: str | None = None,
+    host: str | None = None,
+    port: int | None = None,
+    sock: socket.socket | None = None,
+    routing: "WorkerRouting | None" = None,
+) -> None:
+    """
+    Run the server over ``transport`` ("stdio", "sse" or "http"); arguments
+    left as None come from Settings. ``sock`` is a listening socket to serve
+    on instead of binding ``host:port``, and ``routing`` identifies this
+    process among the workers sharing it (see mcpagentai.prefork).
+    """
     logger = get_logger("mcpagentai.server")
     logger.info("Starting MCPAgentAI server...")
+    startup_begin = time.perf_counter()
+    settings = get_settings()
+    transport = transport or settings.server_transport
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown transport '{transport}' (expected one of: {', '.join(TRANSPORTS)})")
+    configure_logging(settings.log_level, settings.log_format, settings.log_debug_sample_rate)
 
-    time_agent = TimeAgent(local_timezone=local_timezone)
-    weather_agent = WeatherAgent()
-    dictionary_agent = DictionaryAgent()
-    calculator_agent = CalculatorAgent()
-    currency_agent = CurrencyAgent()
-    eliza_agent = ElizaAgent()
-    eliza_mcp_agent = ElizaMCPAgent()
-    stock_agent = StockAgent()
-    twitter_agent = TwitterAgent()
+    # Sub-agents are enabled through configuration (MCPAGENTAI_AGENTS or
+    # mcpagentai.toml) and are only imported/constructed on first use.
+    agent_config = settings.agents
+    loader = get_agent_loader()
+    for name, options in agent_config.options.items():
+        loader.configure(name, **options)
+    if local_timezone and "local_timezone" not in agent_config.options.get("time", {}):
+        loader.configure("time", local_timezone=local_timezone)
+    config_done = time.perf_counter()
 
     # Combine them into one aggregator
-    multi_tool_agent = MultiToolAgent([
-        # time_agent,
-        # weather_agent,
-        # dictionary_agent,
-        # calculator_agent,
-        # currency_agent,
-        # eliza_agent,
-        # eliza_mcp_agent,
-        # stock_agent,
-        twitter_agent,
-    ])
+    multi_tool_agent = MultiToolAgent([loader.lazy(name) for name in agent_config.enabled])
+    # The Twitter query handlers call their agents through it as well.
+    set_dispatcher(multi_tool_agent)
+
+    for name in agent_config.preload:
+        loader.get(name)
+    startup_done = time.perf_counter()
+
+    logger.info(
+        "Startup timing: config %.1f ms, agents %.1f ms, total %.1f ms (enabled: %s; preloaded: %s)",
+        (config_done - startup_begin) * 1000,
+        (startup_done - config_done) * 1000,
+        (startup_done - startup_begin) * 1000,
+        ", ".join(agent_config.enabled) or "none",
+        ", ".join(agent_config.preload) or "none",
+    )
+    for name, timing in loader.timings().items():
+        logger.info("  %s: import %.1f ms, init %.1f ms", name, timing.import_ms, timing.init_ms)
+
+    # Opt-in capture of every tool call, for sizing caches and limits
+    # against real traffic (see benchmarks/replay.py).
+    recorder = None
+    if settings.trace_enabled:
+        recorder = TraceRecorder(default_trace_path(settings.store_dir, settings.trace_dir))
+
+    # Network transports serve many clients from this one process; each
+    # client session gets its own rate limit.
+    connections = None
+    if transport != "stdio":
+        # Imported here so stdio servers never pay for uvicorn and starlette.
+        from mcpagentai.http_transport import ConnectionLimits, ConnectionManager, serve_http
+        connections = ConnectionManager(ConnectionLimits.from_settings(settings))
 
     server = Server("mcpagentai")
 
@@ -62,15 +105,59 @@ async def start_server(local_timezone: str | None = None) -> None:
         """
         Dispatch calls to the aggregator agent, which routes to the correct sub-agent.
         """
+        started_at = time.time()
+        start = time.perf_counter()
+        limit = (
+            connections.call(server.request_context.session) if connections is not None
+            else contextlib.nullcontext()
+        )
         try:
-            return multi_tool_agent.call_tool(name, arguments)
+            async with limit:
+                result = await multi_tool_agent.call_tool_async(name, arguments)
         except Exception as e:
+            if recorder is not None:
+                recorder.record(name, arguments, started_at, time.perf_counter() - start, 0, e)
             logger.exception("Error in call_tool")
             # Avoid using e.message. Use str(e) instead
             raise ValueError(f"Error processing request: {str(e)}") from e
+        if recorder is not None:
+            recorder.record(name, arguments, started_at, time.perf_counter() - start, estimate_size(result))
+        return result
 
     options = server.create_initialization_options()
 
-    async with stdio_server() as (read_stream, write_stream):
-        logger.info("Running server on stdio_server...")
-        await server.run(read_stream, write_stream, options)
+    exporter = None
+    if settings.metrics_export_interval > 0:
+        exporter = MetricsExporter(
+            get_metrics(),
+            Path(settings.store_dir) / settings.metrics_file,
+            settings.metrics_export_interval,
+        )
+        exporter.start()
+
+    memory = get_memory_monitor()
+    if settings.memory_report_interval > 0:
+        memory.start()
+
+    try:
+        if connections is None:
+            async with stdio_server() as (read_stream, write_stream):
+                logger.info("Running server on stdio_server...")
+                await server.run(read_stream, write_stream, options)
+        else:
+            await serve_http(
+                server,
+                options,
+                transport,
+                host or settings.server_host,
+                port or settings.server_port,
+                connections,
+                sock=sock,
+                routing=routing,
+            )
+    finally:
+        if exporter is not None:
+            exporter.stop()
+        memory.stop()
+        if recorder is not None:
+            recorder.close()
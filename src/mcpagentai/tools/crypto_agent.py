@@ -1,10 +1,10 @@
-import os
 import json
-import requests
 from typing import Sequence, Union
 
 from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 from mcpagentai.core.agent_base import MCPAgent
+from mcpagentai.core.config import Settings
+from mcpagentai.core.http_client import get_http_client
 from mcpagentai.defs import CryptoTools
 
 class CryptoAgent(MCPAgent):
@@ -12,10 +12,9 @@ class CryptoAgent(MCPAgent):
     Agent that handles cryptocurrency functionality using CoinGecko API
     """
     
-    BASE_URL = "https://api.coingecko.com/api/v3"
-    
-    def __init__(self):
-        super().__init__()
+    def __init__(self, settings: Settings | None = None):
+        super().__init__(settings)
+        self.base_url = self.settings.coingecko_url
         
         # Common ID mappings (symbol -> coingecko_id)
         self.coin_ids = {
@@ -84,20 +83,20 @@ class CryptoAgent(MCPAgent):
         # Get coin ID from symbol
         coin_id = self.coin_ids.get(symbol)
         if not coin_id:
-            self.logger.error(f"Unknown cryptocurrency symbol: {symbol}")
+            self.logger.error("Unknown cryptocurrency symbol: %s", symbol)
             return [TextContent(type="text", text=json.dumps({"error": "Unknown cryptocurrency"}))]
             
         try:
             # Call CoinGecko API
-            url = f"{self.BASE_URL}/simple/price"
+            url = f"{self.base_url}/simple/price"
             params = {
                 "ids": coin_id,
                 "vs_currencies": "usd",
                 "include_24hr_change": "true"
             }
             
-            self.logger.info(f"Fetching price data for {symbol} ({coin_id})")
-            response = requests.get(url, params=params)
+            self.logger.info("Fetching price data for %s (%s)", symbol, coin_id)
+            response = get_http_client().get(url, params=params)
             data = response.json()
             
             if coin_id in data:
@@ -108,11 +107,11 @@ class CryptoAgent(MCPAgent):
                 }
                 return [TextContent(type="text", text=json.dumps(result))]
             else:
-                self.logger.error(f"No price data found for {symbol}")
+                self.logger.error("No price data found for %s", symbol)
                 return [TextContent(type="text", text=json.dumps({"error": "No price data found"}))]
                 
         except Exception as e:
-            self.logger.error(f"Error fetching price: {e}")
+            self.logger.error("Error fetching price: %s", e)
             return [TextContent(type="text", text=json.dumps({"error": str(e)}))]
 
     def _handle_get_info(self, arguments: dict) -> Sequence[TextContent]:
@@ -122,12 +121,12 @@ class CryptoAgent(MCPAgent):
         # Get coin ID from symbol
         coin_id = self.coin_ids.get(symbol)
         if not coin_id:
-            self.logger.error(f"Unknown cryptocurrency symbol: {symbol}")
+            self.logger.error("Unknown cryptocurrency symbol: %s", symbol)
             return [TextContent(type="text", text=json.dumps({"error": "Unknown cryptocurrency"}))]
             
         try:
             # Call CoinGecko API
-            url = f"{self.BASE_URL}/coins/{coin_id}"
+            url = f"{self.base_url}/coins/{coin_id}"
             params = {
                 "localization": "false",
                 "tickers": "false",
@@ -136,8 +135,8 @@ class CryptoAgent(MCPAgent):
                 "developer_data": "false"
             }
             
-            self.logger.info(f"Fetching info for {symbol} ({coin_id})")
-            response = requests.get(url, params=params)
+            self.logger.info("Fetching info for %s (%s)", symbol, coin_id)
+            response = get_http_client().get(url, params=params)
             data = response.json()
             
             result = {
@@ -153,5 +152,5 @@ class CryptoAgent(MCPAgent):
             return [TextContent(type="text", text=json.dumps(result))]
                 
         except Exception as e:
-            self.logger.error(f"Error fetching info: {e}")
+            self.logger.error("Error fetching info: %s", e)
             return [TextContent(type="text", text=json.dumps({"error": str(e)}))] 
\ No newline at end of file
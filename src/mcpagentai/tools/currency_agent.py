@@ -1,10 +1,10 @@
-import os
 import json
-import requests
 from typing import Sequence, Union, Optional
 
 from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 from mcpagentai.core.agent_base import MCPAgent
+from mcpagentai.core.config import Settings
+from mcpagentai.core.http_client import get_http_client
 
 # Import your currency definitions from defs.py
 from mcpagentai.defs import (
@@ -21,15 +21,14 @@ class CurrencyAgent(MCPAgent):
     - converting an amount from one currency to another
     """
 
-    BASE_URL = "https://api.freecurrencyapi.com/v1/latest"
-
-    def __init__(self, api_key: str | None = None):
+    def __init__(self, api_key: str | None = None, settings: Settings | None = None):
         """
         Initializes the CurrencyAgent with an API key.
-        The API key can be passed directly or retrieved from the ACCESS_KEY environment variable.
+        The API key can be passed directly or taken from Settings (FREECURRENCY_API_KEY).
         """
-        super().__init__()
-        self.api_key = api_key or os.getenv("FREECURRENCY_API_KEY", "<your_key>")
+        super().__init__(settings)
+        self.base_url = f"{self.settings.freecurrency_url}/latest"
+        self.api_key = api_key or self.settings.freecurrency_api_key
         if not self.api_key:
             raise ValueError("API key is missing! Set FREECURRENCY_API_KEY environment variable or pass it as an argument.")
 
@@ -153,7 +152,7 @@ class CurrencyAgent(MCPAgent):
         }
 
         try:
-            resp = requests.get(self.BASE_URL, params=params)
+            resp = get_http_client().get(self.base_url, params=params)
             data = resp.json()
 
             if "error" in data:
@@ -1,4 +1,3 @@
-import os
 import json
 import logging
 import requests
@@ -12,6 +11,8 @@ from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource, ErrorDa
 from mcp.shared.exceptions import McpError
 
 from mcpagentai.core.agent_base import MCPAgent
+from mcpagentai.core.config import Settings
+from mcpagentai.core.http_client import get_http_client
 from mcpagentai.defs import ElizaTools, ElizaGetAgents, ElisaMessageAgent
 
 
@@ -21,11 +22,10 @@ class ElizaAgent(MCPAgent):
     Communicates with a remote Eliza server over HTTP.
     """
 
-    def __init__(self):
-        super().__init__()
-        # Use .env or fallback default if not provided
-        self.eliza_api_url = os.getenv("ELIZA_API_URL")
-        self.eliza_path = os.getenv("ELIZA_PATH")
+    def __init__(self, settings: Settings | None = None):
+        super().__init__(settings)
+        self.eliza_api_url = self.settings.eliza_api_url
+        self.eliza_path = self.settings.eliza_path
         self.logger.info("ElizaAgent initialized with API URL: %s", self.eliza_api_url)
 
     def list_tools(self) -> list[Tool]:
@@ -100,7 +100,7 @@ class ElizaAgent(MCPAgent):
         self.logger.info("Fetching Eliza agents from: %s", agents_url)
 
         try:
-            response = requests.get(agents_url)
+            response = get_http_client().get(agents_url)
             if response.status_code != 200:
                 raise McpError(ErrorData(message="Message to agent not provided", code=-1))
         except requests.RequestException as e:
@@ -162,7 +162,7 @@ class ElizaAgent(MCPAgent):
         }
 
         try:
-            response = requests.post(message_url, headers=headers, files=files)
+            response = get_http_client().post(message_url, headers=headers, files=files)
             if response.status_code != 200:
                 raise McpError(ErrorData(message=f"Can't connect to Eliza server or invalid agent id parameter: {agent_id}", code=-1))
         except requests.RequestException as e:
@@ -14,6 +14,7 @@ from mcpagentai.defs import (
     ElizaGetCharacterBio,
 )
 from mcpagentai.core.agent_base import MCPAgent
+from mcpagentai.core.config import Settings
 
 
 class ElizaMCPAgent(MCPAgent):
@@ -21,9 +22,9 @@ class ElizaMCPAgent(MCPAgent):
     Handles local Eliza character JSON files for bios and lore and enables interaction with characters.
     """
 
-    def __init__(self):
-        super().__init__()
-        self.eliza_path = os.getenv("ELIZA_PATH")
+    def __init__(self, settings: Settings | None = None):
+        super().__init__(settings)
+        self.eliza_path = self.settings.eliza_path
         self.eliza_character_path = os.path.join(self.eliza_path, "characters")
 
         self.logger.info("ElizaMCPAgent initialized with character path: %s", self.eliza_character_path)
@@ -1,14 +1,18 @@
 from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 
 from mcpagentai.core.agent_base import MCPAgent
+from mcpagentai.core.http_client import get_http_client
+from mcpagentai.core.resilience import UpstreamUnavailable
 from mcpagentai.defs import StockTools, StockGetPrice, StockGetTickerByNameAgent, StockGetPriceHistory
 
 from typing import Sequence, Union
 
-import requests
-
 import json
 
+# Alpha Vantage's free tier is limited per minute; a throttled host is left
+# alone for this long before a probe request is let through.
+RATE_LIMIT_BACKOFF_SECONDS = 60.0
+
 
 class StockAgent(MCPAgent):
     def list_tools(self) -> list[Tool]:
@@ -88,24 +92,49 @@ class StockAgent(MCPAgent):
             TextContent(type="text", text=json.dumps(result.model_dump(), indent=2))
         ]
 
-    def _get_ticker_by_name(self, ticker: str) -> StockGetTickerByNameAgent:
-        # todo add request success error handling
-        url = f"https://www.alphavantage.co/query?function=SYMBOL_SEARCH&keywords={ticker}&apikey=demo%27)"
-        response = requests.get(url)
+    def _query(self, function: str, **params) -> dict:
+        params = {
+            "function": function,
+            **params,
+            "apikey": self.settings.alphavantage_api_key or "demo",
+        }
+        client = get_http_client()
+        response = client.get(self.settings.alphavantage_url, params=params)
         data = response.json()
-        return StockGetTickerByNameAgent(tickers=data['bestMatches'])
+
+        # Alpha Vantage reports errors and rate limiting with HTTP 200 and a
+        # message in place of the data.
+        if "Error Message" in data:
+            raise ValueError(f"Alpha Vantage error: {data['Error Message']}")
+        message = data.get("Note") or data.get("Information")
+        if message:
+            lowered = message.lower()
+            if "rate limit" in lowered or "call frequency" in lowered:
+                guard = client.guard_for(self.settings.alphavantage_url)
+                guard.throttled(RATE_LIMIT_BACKOFF_SECONDS)
+                raise UpstreamUnavailable(guard.host, "rate limit reached", RATE_LIMIT_BACKOFF_SECONDS)
+            raise ValueError(f"Alpha Vantage: {message}")
+        return data
+
+    @staticmethod
+    def _field(data: dict, key: str):
+        if key not in data:
+            raise ValueError(f"Unexpected Alpha Vantage response: missing '{key}'")
+        return data[key]
+
+    def _get_ticker_by_name(self, ticker: str) -> StockGetTickerByNameAgent:
+        data = self._query("SYMBOL_SEARCH", keywords=ticker)
+        return StockGetTickerByNameAgent(tickers=self._field(data, 'bestMatches'))
 
     def _get_stock_price_today(self, ticker: str) -> StockGetPrice:
-        url = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={ticker}&apikey=demo"
-        response = requests.get(url)
-        data = response.json()
-        price_series = data['Time Series (Daily)']
+        data = self._query("TIME_SERIES_DAILY", symbol=ticker)
+        price_series = self._field(data, 'Time Series (Daily)')
+        if not price_series:
+            raise ValueError(f"No price data for {ticker}")
         last_day = next(iter(price_series))
         return StockGetPrice(price=price_series[last_day]['4. close'])
 
     def _get_stock_price_history(self, ticker: str) -> StockGetPriceHistory:
-        url = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={ticker}&apikey=demo"
-        response = requests.get(url)
-        data = response.json()
-        price_series = data['Time Series (Daily)']
+        data = self._query("TIME_SERIES_DAILY", symbol=ticker)
+        price_series = self._field(data, 'Time Series (Daily)')
         return StockGetPriceHistory(prices=price_series)
\ No newline at end of file
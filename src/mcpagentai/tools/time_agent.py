@@ -7,6 +7,7 @@ from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 from mcp.shared.exceptions import McpError
 
 from mcpagentai.core.agent_base import MCPAgent
+from mcpagentai.core.config import Settings
 from mcpagentai.defs import TimeTools, TimeResult, TimeConversionResult
 
 
@@ -15,9 +16,11 @@ class TimeAgent(MCPAgent):
     Agent that handles time-related functionality (current time, time conversions).
     """
 
-    def __init__(self, local_timezone: str | None = None):
-        super().__init__()
-        self._local_timezone = local_timezone or self._autodetect_local_timezone()
+    def __init__(self, local_timezone: str | None = None, settings: Settings | None = None):
+        super().__init__(settings)
+        self._local_timezone = (
+            local_timezone or self.settings.local_timezone or self._autodetect_local_timezone()
+        )
 
     def list_tools(self) -> list[Tool]:
         return [
@@ -171,6 +174,7 @@ from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 from mcp.shared.exceptions import McpError
 
 from mcpagentai.core.agent_base import MCPAgent
+from mcpagentai.core.config import Settings
 from mcpagentai.defs import TimeTools, TimeResult, TimeConversionResult
 
 
@@ -179,9 +183,11 @@ class TimeAgent(MCPAgent):
     Agent that handles time-related functionality (current time, time conversions).
     """
 
-    def __init__(self, local_timezone: str | None = None):
-        super().__init__()
-        self._local_timezone = local_timezone or self._autodetect_local_timezone()
+    def __init__(self, local_timezone: str | None = None, settings: Settings | None = None):
+        super().__init__(settings)
+        self._local_timezone = (
+            local_timezone or self.settings.local_timezone or self._autodetect_local_timezone()
+        )
 
     def list_tools(self) -> list[Tool]:
         return [
@@ -2,25 +2,25 @@ import os
 import json
 import time
 import random
-import anthropic
 from typing import Sequence, Union, Dict, Any, Optional
 from pathlib import Path
 import asyncio
-from dotenv import load_dotenv
 
 from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 from mcp.shared.exceptions import McpError
 
 from mcpagentai.core.agent_base import MCPAgent
-from mcpagentai.defs import TwitterTools, StockTools, WeatherTools
-from mcpagentai.tools.stock_agent import StockAgent
-from mcpagentai.tools.weather_agent import WeatherAgent
-from mcpagentai.tools.time_agent import TimeAgent
+from mcpagentai.core.config import Settings
+from mcpagentai.core.deadline import bound_timeout, communicate_async
+from mcpagentai.core.election import LeaderLock, wait_for_leadership
+from mcpagentai.core.executor import run_blocking
+from mcpagentai.core.memory import get_memory_monitor
+from mcpagentai.core.scheduler import Priority, get_scheduler, priority_scope
+from mcpagentai.defs import TwitterTools
 from . import agent_client_wrapper
 
-# Load environment variables from .env file
-env_path = Path(__file__).parent.parent.parent.parent.parent / '.env'
-load_dotenv(env_path)
+# Per-call bound for Anthropic requests; the calling tool's deadline can shorten it.
+LLM_TIMEOUT = 60.0
 
 
 class TwitterAgent(MCPAgent):
@@ -28,8 +28,8 @@ class TwitterAgent(MCPAgent):
     AI-powered Twitter agent that uses Claude to generate tweets and replies
     """
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, settings: Settings | None = None):
+        super().__init__(settings)
         self.last_tweet_time = 0
         self.last_reply_time = 0
         self.last_action_time = 0
@@ -39,11 +39,13 @@ class TwitterAgent(MCPAgent):
         self._load_query_handlers()
 
         # Load personality config
-        personality_file = os.getenv("PERSONALITY_CONFIG", "tech_expert.json")
+        personality_file = self.settings.personality_config
         self.personality = self.load_personality(personality_file)
 
-        # Initialize Anthropic client
-        self.client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        # Initialize Anthropic client (imported here so servers without the
+        # Twitter agent never pay for the anthropic import)
+        import anthropic
+        self.client = anthropic.Anthropic(api_key=self.settings.anthropic_api_key)
 
         # Setup storage paths - use project root for cookies.json
         self.project_root = Path.cwd()
@@ -55,10 +57,18 @@ class TwitterAgent(MCPAgent):
         # Load replied tweets from file
         self.replied_to = self.load_replied_tweets()
 
-        # Start tweet and reply monitoring loops
-        if os.getenv("RUN_AGENT", "false").lower() == "true":
-            asyncio.create_task(self._tweet_loop())
-            asyncio.create_task(self._reply_loop())
+        # Both grow for as long as the agent runs; report them with the server's memory stats
+        memory = get_memory_monitor()
+        memory.watch("twitter.replied_to", lambda: len(self.replied_to))
+        memory.watch("twitter.query_handlers", lambda: len(self.query_handlers))
+
+        # Start tweet and reply monitoring loops. They run at background
+        # priority so client tool calls are admitted ahead of them, and in
+        # only one worker process when the server runs several.
+        self.loop_lock = LeaderLock(self.store_dir / 'twitter-loops.lock')
+        if self.settings.run_agent:
+            with priority_scope(Priority.BACKGROUND):
+                asyncio.create_task(self._run_loops_when_elected())
 
     def _load_query_handlers(self):
         """Load all available query handlers"""
@@ -81,7 +91,7 @@ class TwitterAgent(MCPAgent):
         # Register handlers
         for handler in handlers:
             self.query_handlers[handler.query_type] = handler
-            self.logger.info(f"Registered query handler for: {handler.query_type}")
+            self.logger.info("Registered query handler for: %s", handler.query_type)
 
     def _get_available_handlers_info(self) -> str:
         """Get information about available handlers for Claude's prompt"""
@@ -128,7 +138,7 @@ class TwitterAgent(MCPAgent):
                 return set()
 
         except json.JSONDecodeError as e:
-            self.logger.warning(f"Invalid JSON in replied tweets file: {e}")
+            self.logger.warning("Invalid JSON in replied tweets file: %s", e)
             # Backup the corrupted file and create new empty one
             backup_file = self.replied_file.with_suffix('.json.bak')
             self.replied_file.rename(backup_file)
@@ -137,7 +147,7 @@ class TwitterAgent(MCPAgent):
             return set()
 
         except Exception as e:
-            self.logger.warning(f"Could not load replied tweets: {e}")
+            self.logger.warning("Could not load replied tweets: %s", e)
             # Initialize file with empty array for any other error
             with open(self.replied_file, 'w') as f:
                 json.dump([], f)
@@ -166,44 +176,44 @@ class TwitterAgent(MCPAgent):
             if "time" in selected_data:
                 try:
                     if "time" in self.query_handlers:
-                        time_data = self.query_handlers["time"].handle_query({"city": "nyc"})
+                        time_data = await run_blocking(self.query_handlers["time"].handle_query, {"city": "nyc"})
                         if time_data:
                             context["time"] = time_data
                 except Exception as e:
-                    self.logger.warning(f"Error getting time data: {e}")
+                    self.logger.warning("Error getting time data: %s", e)
 
             # Get stock info if selected
             if "stock" in selected_data:
                 try:
                     if "stock" in self.query_handlers:
-                        stock_data = self.query_handlers["stock"].handle_query({"ticker": "IBM"})
+                        stock_data = await run_blocking(self.query_handlers["stock"].handle_query, {"ticker": "IBM"})
                         if stock_data and "API Limit" not in stock_data and "Error" not in stock_data:
                             context["stocks"] = stock_data
-                            self.logger.debug(f"Got stock price: {context['stocks']}")
+                            self.logger.debug("Got stock price: %s", context['stocks'])
                 except Exception as e:
-                    self.logger.warning(f"Error getting stock data: {e}")
+                    self.logger.warning("Error getting stock data: %s", e)
 
             # Get crypto info if selected
             if "crypto" in selected_data:
                 try:
                     if "crypto" in self.query_handlers:
-                        crypto_data = self.query_handlers["crypto"].handle_query({"symbol": "BTC"})
+                        crypto_data = await run_blocking(self.query_handlers["crypto"].handle_query, {"symbol": "BTC"})
                         if crypto_data and "Error" not in crypto_data:
                             context["crypto"] = crypto_data
-                            self.logger.debug(f"Got crypto price: {context['crypto']}")
+                            self.logger.debug("Got crypto price: %s", context['crypto'])
                 except Exception as e:
-                    self.logger.warning(f"Error getting crypto data: {e}")
+                    self.logger.warning("Error getting crypto data: %s", e)
 
             # Get weather info if selected
             if "weather" in selected_data:
                 try:
                     if "weather" in self.query_handlers:
-                        weather_data = self.query_handlers["weather"].handle_query({"city": "sf"})
+                        weather_data = await run_blocking(self.query_handlers["weather"].handle_query, {"city": "sf"})
                         if weather_data and "Error" not in weather_data:
                             context["weather"] = weather_data
-                            self.logger.debug(f"Got weather: {context['weather']}")
+                            self.logger.debug("Got weather: %s", context['weather'])
                 except Exception as e:
-                    self.logger.warning(f"Error getting weather data: {e}")
+                    self.logger.warning("Error getting weather data: %s", e)
 
         # Add context to prompt
         system_prompt = f"""You are {self.personality['name']}, {self.personality['lore']}.
@@ -225,9 +235,11 @@ class TwitterAgent(MCPAgent):
                         Vary your tweets - don't always focus on the same topics."""
 
         try:
-            response = self.client.messages.create(
+            response = await run_blocking(
+                self.client.messages.create,
                 model="claude-3-sonnet-20240229",
                 max_tokens=150,
+                timeout=bound_timeout(LLM_TIMEOUT, "LLM call"),
                 system=system_prompt,
                 messages=[{
                     "role": "user",
@@ -240,15 +252,17 @@ class TwitterAgent(MCPAgent):
             return tweet_data["text"]
 
         except Exception as e:
-            self.logger.error(f"Error generating tweet: {e}")
+            self.logger.error("Error generating tweet: %s", e)
             return None
 
     async def generate_reply(self, tweet_context: Dict[str, Any]) -> Optional[str]:
         try:
             # First try to identify if this is a data query
-            analysis_response = self.client.messages.create(
+            analysis_response = await run_blocking(
+                self.client.messages.create,
                 model="claude-3-sonnet-20240229",
                 max_tokens=150,
+                timeout=bound_timeout(LLM_TIMEOUT, "LLM call"),
                 system="""You are a query analyzer. Extract data requirements from tweets.
                          If the tweet is a general question or conversation, respond with {"type": "conversation"}.
                          Otherwise, respond with data queries in this format:
@@ -282,9 +296,11 @@ class TwitterAgent(MCPAgent):
                 # Handle conversational tweets differently
                 if query_data.get("type") == "conversation":
                     # Generate a conversational response that directly addresses the tweet
-                    reply_response = self.client.messages.create(
+                    reply_response = await run_blocking(
+                        self.client.messages.create,
                         model="claude-3-sonnet-20240229",
                         max_tokens=150,
+                        timeout=bound_timeout(LLM_TIMEOUT, "LLM call"),
                         system=f"""You are {self.personality['name']}, {self.personality['personality']}.
                                 Bio: {' '.join(self.personality['bio'])}
                                 Style: {' '.join(self.personality['style']['chat'])}
@@ -311,7 +327,7 @@ class TwitterAgent(MCPAgent):
                     for query in query_data.get("queries", []):
                         if query["type"] in self.query_handlers:
                             handler = self.query_handlers[query["type"]]
-                            response = handler.handle_query(query["params"])
+                            response = await run_blocking(handler.handle_query, query["params"])
 
                             if isinstance(response, list):
                                 response = response[0] if response else None
@@ -320,9 +336,11 @@ class TwitterAgent(MCPAgent):
                                 context[query["type"]] = response
 
                     # Generate the reply using the data context
-                    reply_response = self.client.messages.create(
+                    reply_response = await run_blocking(
+                        self.client.messages.create,
                         model="claude-3-sonnet-20240229",
                         max_tokens=150,
+                        timeout=bound_timeout(LLM_TIMEOUT, "LLM call"),
                         system=f"""You are {self.personality['name']}, {self.personality['personality']}.
                                 Bio: {' '.join(self.personality['bio'])}
                                 Style: {' '.join(self.personality['style']['chat'])}
@@ -353,15 +371,15 @@ class TwitterAgent(MCPAgent):
                     return reply_text
 
             except json.JSONDecodeError as e:
-                self.logger.error(f"Error parsing response: {e}")
+                self.logger.error("Error parsing response: %s", e)
                 return None
 
             except Exception as e:
-                self.logger.error(f"Error processing reply: {e}")
+                self.logger.error("Error processing reply: %s", e)
                 return None
 
         except Exception as e:
-            self.logger.error(f"Error generating reply: {e}")
+            self.logger.error("Error generating reply: %s", e)
             return None
 
     def list_tools(self) -> list[Tool]:
@@ -413,7 +431,7 @@ class TwitterAgent(MCPAgent):
             self.logger.error("Failed to generate tweet")
             raise McpError("Failed to generate tweet")
 
-        result = agent_client_wrapper.send_tweet(tweet_text)
+        result = await run_blocking(agent_client_wrapper.send_tweet, tweet_text)
         self.last_tweet_time = time.time()
 
         return [TextContent(
@@ -436,7 +454,7 @@ class TwitterAgent(MCPAgent):
         if not reply_text:
             raise McpError("Failed to generate reply")
 
-        result = agent_client_wrapper.reply_tweet(reply_text, tweet_context["url"])
+        result = await run_blocking(agent_client_wrapper.reply_tweet, reply_text, tweet_context["url"])
         self.last_reply_time = now
 
         # Add to replied set and save
@@ -449,6 +467,14 @@ class TwitterAgent(MCPAgent):
             text=json.dumps({"generated_reply": reply_text, "result": result}, indent=2)
         )]
 
+    async def _run_loops_when_elected(self):
+        """Run the tweet and reply loops once this process holds the loop lock"""
+        if not self.loop_lock.try_acquire():
+            self.logger.info("Twitter loops run in another worker; standing by")
+            await wait_for_leadership(self.loop_lock)
+        self.logger.info("Starting Twitter loops in process %d", os.getpid())
+        await asyncio.gather(self._tweet_loop(), self._reply_loop())
+
     async def _tweet_loop(self):
         """Periodically generate and post tweets following original bot's schedule"""
         while True:
@@ -457,9 +483,10 @@ class TwitterAgent(MCPAgent):
                 # Random interval between 20-40 minutes (1200-2400 seconds)
                 if now - self.last_tweet_time > random.randint(1200, 2400):
                     self.logger.info("Generating scheduled tweet...")
-                    await self._handle_create_tweet({})
+                    async with get_scheduler().admit():
+                        await self._handle_create_tweet({})
             except Exception as e:
-                self.logger.error(f"Error in tweet loop: {e}")
+                self.logger.error("Error in tweet loop: %s", e)
 
             # Check every 5 minutes
             await asyncio.sleep(300)
@@ -476,13 +503,13 @@ class TwitterAgent(MCPAgent):
     def should_reply(self, tweet_id: str) -> bool:
         """Check if we should reply to this tweet"""
         if tweet_id in self.replied_to:
-            self.logger.debug(f"Already replied to tweet {tweet_id}")
+            self.logger.debug("Already replied to tweet %s", tweet_id)
             return False
         now = time.time()
         if now - self.last_reply_time < 300:  # 5 minutes minimum between replies
-            self.logger.debug(f"Too soon to reply to tweet {tweet_id}")
+            self.logger.debug("Too soon to reply to tweet %s", tweet_id)
             return False
-        self.logger.debug(f"Ready to reply to tweet {tweet_id}")
+        self.logger.debug("Ready to reply to tweet %s", tweet_id)
         return True
 
     async def can_perform_action(self) -> bool:
@@ -514,7 +541,7 @@ class TwitterAgent(MCPAgent):
 
                 if time_since_reply < wait_time:
                     remaining_time = int(wait_time - time_since_reply)
-                    self.logger.info(f"💤 Next mention check in {remaining_time} seconds...")
+                    self.logger.info("💤 Next mention check in %s seconds...", remaining_time)
                     await asyncio.sleep(remaining_time)
                     continue
 
@@ -572,7 +599,8 @@ class TwitterAgent(MCPAgent):
                 """
 
                 try:
-                    mentions = await self.run_node_script(script)
+                    async with get_scheduler().admit():
+                        mentions = await self.run_node_script(script)
 
                     if isinstance(mentions, str):
                         try:
@@ -590,7 +618,7 @@ class TwitterAgent(MCPAgent):
 
                     # Reset retry count on successful request
                     retry_count = 0
-                    self.logger.info(f"✨ Found {len(mentions)} total mentions")
+                    self.logger.info("✨ Found %s total mentions", len(mentions))
 
                     for mention in mentions:
                         if not await self.can_perform_action():  # Check rate limit for each reply
@@ -599,49 +627,51 @@ class TwitterAgent(MCPAgent):
 
                         # Skip if we've already replied
                         if mention['id'] in self.replied_to:
-                            self.logger.info(f"⏭️ Already replied to tweet {mention['id']}")
+                            self.logger.info("⏭️ Already replied to tweet %s", mention['id'])
                             continue
 
-                        self.logger.info(f"\n📝 Processing mention from @{mention['username']}: {mention['text']}")
+                        self.logger.info("\n📝 Processing mention from @%s: %s", mention['username'], mention['text'])
 
                         # Generate AI response without mentioning the user
-                        reply = await self.generate_reply({
-                            'username': mention['username'],
-                            'text': mention['text'],
-                            'url': f"https://twitter.com/{mention['username']}/status/{mention['id']}"
-                        })
+                        async with get_scheduler().admit():
+                            reply = await self.generate_reply({
+                                'username': mention['username'],
+                                'text': mention['text'],
+                                'url': f"https://twitter.com/{mention['username']}/status/{mention['id']}"
+                            })
 
                         if reply:
                             # Remove any @ mentions from the reply
                             reply = ' '.join(word for word in reply.split() if not word.startswith('@'))
-                            self.logger.info(f"✍️ Generated reply: {reply}")
+                            self.logger.info("✍️ Generated reply: %s", reply)
 
                             # Update times BEFORE sending to prevent parallel tweets
                             now = time.time()
                             self.last_reply_time = now
                             self.last_action_time = now
 
-                            self.logger.info(f"🚀 Sending reply to tweet {mention['id']}...")
-                            success = await self.send_tweet(reply, mention['id'])
+                            self.logger.info("🚀 Sending reply to tweet %s...", mention['id'])
+                            async with get_scheduler().admit():
+                                success = await self.send_tweet(reply, mention['id'])
                             if success:
                                 self.replied_to.add(mention['id'])
-                                self.logger.info(f"✅ Successfully replied to tweet {mention['id']}")
-                                self.logger.info(f"Replied to tweet {mention['id']}: {reply}")
+                                self.logger.info("✅ Successfully replied to tweet %s", mention['id'])
+                                self.logger.info("Replied to tweet %s: %s", mention['id'], reply)
                                 self.save_replied_tweets()
                             else:
-                                self.logger.info(f"❌ Failed to send reply to tweet {mention['id']}")
+                                self.logger.info("❌ Failed to send reply to tweet %s", mention['id'])
                                 # Reset timers if tweet failed
                                 self.last_reply_time = now - 120
                                 self.last_action_time = now - 60
                         else:
-                            self.logger.info(f"❌ Failed to generate reply for tweet {mention['id']}")
+                            self.logger.info("❌ Failed to generate reply for tweet %s", mention['id'])
 
                 except Exception as e:
                     retry_count += 1
                     wait_time = min(base_wait * (2 ** retry_count), 3600)  # Max 1 hour wait
-                    self.logger.info(f"❌ Error checking mentions (attempt {retry_count}/{max_retries}): {str(e)}")
-                    self.logger.info(f"⏳ Waiting {wait_time} seconds before retry...")
-                    self.logger.error(f"Error checking mentions: {str(e)}")
+                    self.logger.info("❌ Error checking mentions (attempt %s/%s): %s", retry_count, max_retries, str(e))
+                    self.logger.info("⏳ Waiting %s seconds before retry...", wait_time)
+                    self.logger.error("Error checking mentions: %s", str(e))
                     await asyncio.sleep(wait_time)
 
                     if retry_count >= max_retries:
@@ -652,8 +682,8 @@ class TwitterAgent(MCPAgent):
                     continue
 
             except Exception as e:
-                self.logger.info(f"❌ Error in reply loop: {str(e)}")
-                self.logger.error(f"Error in reply loop: {str(e)}")
+                self.logger.info("❌ Error in reply loop: %s", str(e))
+                self.logger.error("Error in reply loop: %s", str(e))
                 await asyncio.sleep(300)  # Wait 5 minutes on unexpected errors
 
             self.logger.info("\n💤 Waiting 60 seconds before next mention check...")
@@ -665,17 +695,20 @@ class TwitterAgent(MCPAgent):
         temp_script = self.store_dir.parent / 'temp_script.js'
         temp_script.write_text(script)
 
-        process = await asyncio.create_subprocess_exec(
-            'node', str(temp_script),
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            env={**os.environ},  # Pass current environment variables to Node
-            cwd=str(self.store_dir.parent)  # Run from the project root
-        )
-        stdout, stderr = await process.communicate()
-
-        # Clean up
-        temp_script.unlink()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                'node', str(temp_script),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env={**os.environ},  # Pass current environment variables to Node
+                cwd=str(self.store_dir.parent)  # Run from the project root
+            )
+            stdout, stderr = await communicate_async(
+                process, agent_client_wrapper.NODE_SCRIPT_TIMEOUT, "Node script"
+            )
+        finally:
+            # Clean up
+            temp_script.unlink(missing_ok=True)
 
         if process.returncode != 0:
             raise Exception(f"Node.js error: {stderr.decode()}")
@@ -687,8 +720,8 @@ class TwitterAgent(MCPAgent):
 
     async def send_tweet(self, text, reply_to=None):
         """Send a tweet with optional reply_to"""
-        self.logger.info(f"\n📤 Preparing to send tweet{' as reply' if reply_to else ''}")
-        self.logger.info(f"📝 Tweet text: {text}")
+        self.logger.info("\n📤 Preparing to send tweet%s", ' as reply' if reply_to else '')
+        self.logger.info("📝 Tweet text: %s", text)
 
         # Properly escape the tweet text for JavaScript
         escaped_text = (
@@ -742,21 +775,21 @@ class TwitterAgent(MCPAgent):
         """
 
         result = await self.run_node_script(script)
-        self.logger.info(f"📨 Tweet API response: {result}")
+        self.logger.info("📨 Tweet API response: %s", result)
 
         if isinstance(result, str):
             try:
                 result = json.loads(result)
             except:
                 self.logger.info("❌ Failed to parse API response")
-                self.logger.error(f"Failed to parse result: {result}")
+                self.logger.error("Failed to parse result: %s", result)
                 return False
 
         if not result.get('success'):
-            self.logger.info(f"❌ Failed to send tweet: {result.get('error')}")
-            self.logger.error(f"Failed to send tweet: {result.get('error')}")
+            self.logger.info("❌ Failed to send tweet: %s", result.get('error'))
+            self.logger.error("Failed to send tweet: %s", result.get('error'))
             return False
 
         self.logger.info("✅ Tweet sent successfully!")
-        self.logger.info(f"Successfully sent tweet: {text}")
+        self.logger.info("Successfully sent tweet: %s", text)
         return True 
\ No newline at end of file
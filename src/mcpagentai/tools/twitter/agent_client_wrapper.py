@@ -4,9 +4,14 @@ import subprocess
 from typing import Any, Dict, Union
 from pathlib import Path
 
+from mcpagentai.core.deadline import communicate
+
 # Get current working directory (where start.sh is run from)
 WORKING_DIR = Path.cwd()
 COOKIES_PATH = WORKING_DIR / 'cookies.json'
+# Upper bound for one agent-twitter-client script (login plus one API call);
+# the calling tool's deadline can shorten it.
+NODE_SCRIPT_TIMEOUT = 90.0
 
 
 def _run_node_script(script_content: str) -> Union[Dict[str, Any], str]:
@@ -18,19 +23,21 @@ def _run_node_script(script_content: str) -> Union[Dict[str, Any], str]:
     with open(script_filename, "w", encoding="utf-8") as f:
         f.write(script_content)
 
-    process = subprocess.Popen(
-        ["node", script_filename],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        env={**os.environ},  # Pass environment variables if needed
-    )
-    stdout, stderr = process.communicate()
-    retcode = process.returncode
-    # Cleanup
     try:
-        os.remove(script_filename)
-    except OSError:
-        pass
+        process = subprocess.Popen(
+            ["node", script_filename],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env={**os.environ},  # Pass environment variables if needed
+        )
+        stdout, stderr = communicate(process, NODE_SCRIPT_TIMEOUT, "Node script")
+    finally:
+        # Cleanup
+        try:
+            os.remove(script_filename)
+        except OSError:
+            pass
+    retcode = process.returncode
     if retcode != 0:
         err_msg = stderr.decode(errors="replace")
         raise RuntimeError(f"Node script error: {err_msg}")
@@ -1,4 +1,3 @@
-import os
 import logging
 import json  # Ensure json is imported
 import tweepy
@@ -7,6 +6,7 @@ from typing import Sequence, Union
 from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 from mcp.shared.exceptions import McpError
 from mcpagentai.core.agent_base import MCPAgent
+from mcpagentai.core.config import Settings
 from mcpagentai.defs import TwitterTools, TwitterResult
 
 
@@ -15,13 +15,13 @@ class TwitterAgent(MCPAgent):
     Agent that handles creating tweets and replying to tweets using the Twitter API v2 via Tweepy.
     """
 
-    def __init__(self):
-        super().__init__()
-        self.bearer_token = os.getenv("TWITTER_BEARER_TOKEN")
-        self.api_key = os.getenv("TWITTER_API_KEY")
-        self.api_key_secret = os.getenv("TWITTER_API_SECRET")
-        self.access_token = os.getenv("TWITTER_ACCESS_TOKEN")
-        self.access_token_secret = os.getenv("TWITTER_ACCESS_SECRET")
+    def __init__(self, settings: Settings | None = None):
+        super().__init__(settings)
+        self.bearer_token = self.settings.twitter_bearer_token
+        self.api_key = self.settings.twitter_api_key
+        self.api_key_secret = self.settings.twitter_api_secret
+        self.access_token = self.settings.twitter_access_token
+        self.access_token_secret = self.settings.twitter_access_secret
 
         if not self.bearer_token:
             self.logger.warning(
@@ -56,7 +56,7 @@ class TwitterAgent(MCPAgent):
                 raise McpError("Authentication failed: Unable to fetch user data.")
             return
         except Exception as e:
-            self.logger.error(f"Error during Twitter authentication: {e}")
+            self.logger.error("Error during Twitter authentication: %s", e)
             raise McpError(f"Twitter authentication failed: {e}") from e
 
     def _get_username(self) -> str:
@@ -77,7 +77,7 @@ class TwitterAgent(MCPAgent):
             else:
                 raise McpError("Unable to retrieve authenticated user's username.")
         except Exception as e:
-            self.logger.error(f"Error fetching authenticated user's username: {e}")
+            self.logger.error("Error fetching authenticated user's username: %s", e)
             raise McpError(f"Failed to get username: {e}") from e
 
     def list_tools(self) -> list[Tool]:
@@ -157,7 +157,7 @@ class TwitterAgent(MCPAgent):
                     message="Tweet posted successfully",
                     tweet_url=tweet_url
                 )
-                self.logger.info(f"Tweet created successfully: {tweet_url}")
+                self.logger.info("Tweet created successfully: %s", tweet_url)
                 return [TextContent(type="text", text=result.model_dump_json(indent=2))]
             else:
                 raise McpError("Failed to create tweet: No data returned.")
@@ -190,7 +190,7 @@ class TwitterAgent(MCPAgent):
                 text=message,
                 in_reply_to_tweet_id=tweet_id
             )
-            self.logger.debug(f"Reply Tweet Response: {response}")
+            self.logger.debug("Reply Tweet Response: %s", response)
 
             if response.data:
                 reply_id = response.data['id']
@@ -200,7 +200,7 @@ class TwitterAgent(MCPAgent):
                     message="Replied to tweet successfully",
                     tweet_url=reply_url
                 )
-                self.logger.info(f"Replied to tweet successfully: {reply_url}")
+                self.logger.info("Replied to tweet successfully: %s", reply_url)
                 return [TextContent(type="text", text=result.model_dump_json(indent=2))]
             else:
                 raise McpError("Failed to reply to tweet: No data returned.")
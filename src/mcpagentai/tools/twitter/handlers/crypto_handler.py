@@ -2,13 +2,13 @@ import json
 from typing import Dict, Any, Optional
 
 from mcpagentai.tools.twitter.query_handler import QueryHandler
-from mcpagentai.tools.crypto_agent import CryptoAgent
+from mcpagentai.core.agent_loader import get_agent_loader
 from mcpagentai.defs import CryptoTools
 from mcpagentai.core.logging import get_logger
 
 class CryptoQueryHandler(QueryHandler):
     def __init__(self):
-        self.crypto_agent = CryptoAgent()
+        self.crypto_agent = get_agent_loader().lazy("crypto")
         self.logger = get_logger("mcpagentai.crypto_handler")
         
         # Common crypto aliases
@@ -54,17 +54,18 @@ class CryptoQueryHandler(QueryHandler):
             
             # Convert alias to symbol
             symbol = self.crypto_aliases.get(symbol, symbol.upper())
-            self.logger.info(f"Looking up price for {symbol}")
+            self.logger.info("Looking up price for %s", symbol)
             
             # Get crypto data
-            crypto_data = self.crypto_agent.call_tool(
+            crypto_data = self.call_tool(
+                self.crypto_agent,
                 CryptoTools.GET_CRYPTO_PRICE.value,
                 {"symbol": symbol}
             )
             
             if crypto_data and crypto_data[0].text:
                 result = json.loads(crypto_data[0].text)
-                self.logger.debug(f"Got crypto data: {result}")
+                self.logger.debug("Got crypto data: %s", result)
                 
                 if "price_usd" in result:
                     price = float(result["price_usd"])
@@ -81,17 +82,17 @@ class CryptoQueryHandler(QueryHandler):
                         response.append(f"24h Change: {formatted_change}")
                     
                     response_text = "\n".join(response)
-                    self.logger.info(f"Generated response: {response_text}")
+                    self.logger.info("Generated response: %s", response_text)
                     return response_text
                 else:
-                    self.logger.warning(f"No price data in response for {symbol}")
+                    self.logger.warning("No price data in response for %s", symbol)
             else:
-                self.logger.warning(f"No response from crypto agent for {symbol}")
+                self.logger.warning("No response from crypto agent for %s", symbol)
             
             return None
             
         except Exception as e:
-            self.logger.error(f"Error in crypto handler: {e}")
+            self.logger.error("Error in crypto handler: %s", e)
             return None
     
     @property
@@ -3,12 +3,12 @@ from typing import Dict, Any, Optional
 
 from mcpagentai.tools.twitter.query_handler import QueryHandler
 from mcpagentai.defs import CurrencyTools
-from mcpagentai.tools.currency_agent import CurrencyAgent
+from mcpagentai.core.agent_loader import get_agent_loader
 from mcpagentai.core.logging import get_logger
 
 class CurrencyQueryHandler(QueryHandler):
     def __init__(self):
-        self.currency_agent = CurrencyAgent()
+        self.currency_agent = get_agent_loader().lazy("currency")
         self.logger = get_logger("mcpagentai.currency_handler")
         
         # Common currency aliases
@@ -59,7 +59,8 @@ class CurrencyQueryHandler(QueryHandler):
             target_code = target_code or "EUR"
             
             # Get conversion data
-            conversion = self.currency_agent.call_tool(
+            conversion = self.call_tool(
+                self.currency_agent,
                 CurrencyTools.CONVERT_CURRENCY.value, 
                 {
                     "base_currency": base_code,
@@ -90,7 +91,7 @@ class CurrencyQueryHandler(QueryHandler):
             return None
             
         except Exception as e:
-            self.logger.error(f"Error in currency handler: {e}")
+            self.logger.error("Error in currency handler: %s", e)
             return None
     
     @property
@@ -2,11 +2,11 @@ import json
 from typing import Dict, Any, Optional
 
 from mcpagentai.tools.twitter.query_handler import QueryHandler
-from mcpagentai.tools.dictionary_agent import DictionaryAgent
+from mcpagentai.core.agent_loader import get_agent_loader
 
 class DictionaryQueryHandler(QueryHandler):
     def __init__(self):
-        self.dictionary_agent = DictionaryAgent()
+        self.dictionary_agent = get_agent_loader().lazy("dictionary")
     
     @property
     def query_type(self) -> str:
@@ -26,7 +26,7 @@ class DictionaryQueryHandler(QueryHandler):
                 return None
             
             # Get definition
-            definition_data = self.dictionary_agent.call_tool("define_word", {"word": word})
+            definition_data = self.call_tool(self.dictionary_agent, "define_word", {"word": word})
             if definition_data and definition_data[0].text:
                 result = json.loads(definition_data[0].text)
                 if "definition" in result:
@@ -1,14 +1,14 @@
 import json
-import os
 from typing import Dict, Any, Optional
 
 from mcpagentai.tools.twitter.query_handler import QueryHandler
 from mcpagentai.defs import StockTools
-from mcpagentai.tools.stock_agent import StockAgent
+from mcpagentai.core.agent_loader import get_agent_loader
+from mcpagentai.core.config import get_settings
 
 class StockQueryHandler(QueryHandler):
     def __init__(self):
-        self.stock_agent = StockAgent()
+        self.stock_agent = get_agent_loader().lazy("stock")
         
         # Common stock tickers and their names
         self.tickers = {
@@ -39,7 +39,7 @@ class StockQueryHandler(QueryHandler):
     
     def handle_query(self, params: Dict[str, Any]) -> Optional[str]:
         try:
-            if not os.getenv("ALPHA_VANTAGE_API_KEY"):
+            if not get_settings().alphavantage_api_key:
                 return "API Limit Reached - Stock Data Unavailable"
                 
             # Get ticker from params
@@ -55,7 +55,7 @@ class StockQueryHandler(QueryHandler):
             
             # Get stock data
             try:
-                stock_data = self.stock_agent.call_tool(StockTools.GET_STOCK_PRICE_TODAY.value, {"ticker": ticker})
+                stock_data = self.call_tool(self.stock_agent, StockTools.GET_STOCK_PRICE_TODAY.value, {"ticker": ticker})
                 if stock_data and stock_data[0].text:
                     stock_json = json.loads(stock_data[0].text)
                     if "price" in stock_json:
@@ -1,11 +1,11 @@
 from typing import Dict, Any, Optional
 
 from mcpagentai.tools.twitter.query_handler import QueryHandler
-from mcpagentai.tools.time_agent import TimeAgent
+from mcpagentai.core.agent_loader import get_agent_loader
 
 class TimeQueryHandler(QueryHandler):
     def __init__(self):
-        self.time_agent = TimeAgent()
+        self.time_agent = get_agent_loader().lazy("time")
         
         # Common timezone aliases
         self.timezone_aliases = {
@@ -47,7 +47,7 @@ class TimeQueryHandler(QueryHandler):
             timezone = timezone or "America/New_York"
             
             # Get time data
-            time_data = self.time_agent.call_tool("get_current_time", {"timezone": timezone})
+            time_data = self.call_tool(self.time_agent, "get_current_time", {"timezone": timezone})
             if time_data and time_data[0].text:
                 return time_data[0].text
             
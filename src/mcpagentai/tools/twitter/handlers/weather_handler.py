@@ -3,32 +3,18 @@ from typing import Dict, Any, Optional, List
 
 from mcpagentai.tools.twitter.query_handler import QueryHandler
 from mcpagentai.defs import WeatherTools
-from mcpagentai.tools.weather_agent import WeatherAgent
+from mcpagentai.core.agent_loader import get_agent_loader
+from mcpagentai.core.gazetteer import get_gazetteer
 from mcpagentai.core.logging import get_logger
 
+DEFAULT_CITY = "San Francisco"
+
 class WeatherQueryHandler(QueryHandler):
     def __init__(self):
         super().__init__()
-        self.weather_agent = WeatherAgent()
+        self.weather_agent = get_agent_loader().lazy("weather")
         self.logger = get_logger("mcpagentai.weather_handler")
-        
-        # Common city coordinates
-        self.city_coords = {
-            'sf': '37.7749,-122.4194',
-            'nyc': '40.7128,-74.0060',
-            'london': '51.5074,-0.1278',
-            'tokyo': '35.6762,139.6503',
-            'paris': '48.8566,2.3522',
-            'berlin': '52.5200,13.4050',
-            'osaka': '34.6937,135.5023',  # Added Osaka
-            'singapore': '1.3521,103.8198',
-            'sydney': '-33.8688,151.2093',
-            'dubai': '25.2048,55.2708',
-            'mumbai': '19.0760,72.8777',
-            'seoul': '37.5665,126.9780',
-            'hong kong': '22.3193,114.1694'  # Added Hong Kong
-        }
-    
+
     @property
     def query_type(self) -> str:
         return "weather"
@@ -36,7 +22,7 @@ class WeatherQueryHandler(QueryHandler):
     @property
     def available_params(self) -> Dict[str, Any]:
         return {
-            "city": "City name (e.g. 'sf', 'nyc', 'london', 'tokyo', etc.)",
+            "city": "City name or alias (e.g. 'sf', 'nyc', 'london', 'São Paulo', 'Paris, US')",
             "location": "Coordinates in 'lat,lon' format (e.g. '52.52,13.41')"
         }
     
@@ -46,14 +32,17 @@ class WeatherQueryHandler(QueryHandler):
             
             # Check for city parameter first
             if "city" in params:
-                city = params["city"].lower()
-                # Try to find city in our predefined coordinates
-                if city in self.city_coords:
-                    location = self.city_coords[city]
-                else:
-                    # If city not found, default to San Francisco
-                    self.logger.warning(f"City '{city}' not found in coordinates list, defaulting to San Francisco")
-                    location = self.city_coords['sf']
+                city = params["city"]
+                place = get_gazetteer().resolve(city)
+                if place is None:
+                    self.logger.warning("City '%s' not found in the gazetteer", city)
+                    return f"Error: Unknown city '{city}'"
+                if place.match != "exact":
+                    self.logger.warning(
+                        "City '%s' has no exact match; using %s, %s (%s match)",
+                        city, place.name, place.country, place.match,
+                    )
+                location = f"{place.latitude},{place.longitude}"
             
             # If no city provided, check for direct coordinates
             elif "location" in params:
@@ -61,10 +50,11 @@ class WeatherQueryHandler(QueryHandler):
             
             # Default to San Francisco if no location specified
             else:
-                location = self.city_coords['sf']
+                location = DEFAULT_CITY
 
             # Get weather data
-            weather_data = self.weather_agent.call_tool(
+            weather_data = self.call_tool(
+                self.weather_agent,
                 WeatherTools.GET_CURRENT_WEATHER.value,
                 {"location": location}
             )
@@ -85,13 +75,13 @@ class WeatherQueryHandler(QueryHandler):
                     return f"{temp_formatted}°F, {desc}"
                     
                 except (json.JSONDecodeError, KeyError) as e:
-                    self.logger.error(f"Error parsing weather data: {str(e)}")
+                    self.logger.error("Error parsing weather data: %s", str(e))
                     return "Error: Could not parse weather data"
                     
             return "Error: No weather data available"
 
         except Exception as e:
-            self.logger.error(f"Error in weather handler: {str(e)}")
+            self.logger.error("Error in weather handler: %s", str(e))
             return f"Error in weather handler: {str(e)}"
     
     @property
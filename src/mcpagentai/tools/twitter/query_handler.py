@@ -1,5 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence
+
+from mcp.types import TextContent
+
+from mcpagentai.core.agent_base import MCPAgent
+from mcpagentai.core.multi_tool_agent import get_dispatcher
 
 class QueryHandler(ABC):
     """Base interface for all query handlers that can be plugged into the Twitter agent"""
@@ -28,4 +33,8 @@ class QueryHandler(ABC):
     @abstractmethod
     def examples(self) -> Dict[str, str]:
         """Return example queries and their expected parameter outputs"""
-        pass 
\ No newline at end of file
+        pass
+
+    def call_tool(self, agent: MCPAgent, name: str, arguments: Dict[str, Any]) -> Sequence[TextContent]:
+        """Call a tool on the agent through the server's dispatcher, sharing its response cache and coalescing"""
+        return get_dispatcher().call_agent_tool(agent, name, arguments)
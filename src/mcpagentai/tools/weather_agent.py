@@ -1,10 +1,28 @@
 import json
-import requests
-from typing import Sequence, Union
+import re
+from typing import Callable, Optional, Sequence, Union
 
 from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 from mcpagentai.core.agent_base import MCPAgent
-from mcpagentai.defs import WeatherTools, CurrentWeatherResult, WeatherForecastResult
+from mcpagentai.core.cache import canonical_arguments
+from mcpagentai.core.config import Settings
+from mcpagentai.core.gazetteer import get_gazetteer
+from mcpagentai.core.http_client import get_http_client
+from mcpagentai.core.memory import get_memory_monitor
+from mcpagentai.defs import (
+    WeatherTools,
+    CurrentWeatherResult,
+    WeatherForecastResult,
+    CurrentWeatherBatchResult,
+    WeatherForecastBatchResult,
+    GazetteerPlace,
+    HourlyForecastResult,
+    HourlyThresholdEvent,
+    HourlyVariableSummary,
+    PlaceLookupResult,
+)
+from . import weather_aggregate as agg
+from .weather_cache import WeatherGridCache
 
 
 # A simple mapping from Open-Meteo weathercode to textual description:
@@ -40,13 +58,62 @@ WEATHER_CODE_MAP = {
 }
 
 
+# Daily variables behind the forecast tools' default (row) output.
+DAILY_FORECAST_VARIABLES = "weathercode,temperature_2m_max,temperature_2m_min"
+MAX_FORECAST_DAYS = 16
+MAX_FORECAST_VARIABLES = 24
+VARIABLE_NAME = re.compile(r"^[a-z0-9_]+$")
+HOURLY_FORECAST_VARIABLES = ["temperature_2m", "precipitation", "precipitation_probability", "wind_speed_10m"]
+# "First hour of rain" unless the caller sets its own thresholds.
+DEFAULT_HOURLY_THRESHOLDS = {"precipitation": 0.1}
+HOURLY_OUTPUTS = ("summary", "columnar", "both")
+MAX_PLACES = 50
+
+# Shared by the forecast tools' input schemas.
+FORECAST_VARIABLE_PROPERTIES = {
+    "daily": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Open-Meteo daily variables to return as columns "
+                       "(e.g. ['temperature_2m_max', 'precipitation_sum', 'wind_speed_10m_max'])",
+    },
+    "hourly": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Open-Meteo hourly variables to return as columns "
+                       "(e.g. ['temperature_2m', 'precipitation_probability', 'wind_speed_10m'])",
+    },
+}
+
+
 class WeatherAgent(MCPAgent):
     """
     Agent that handles weather functionality (current weather, forecast)
     using the free Open-Meteo API.
-    Expects 'location' to be in 'lat,lon' format (e.g., '52.52,13.41').
+    Expects 'location' to be in 'lat,lon' format (e.g., '52.52,13.41'), or
+    a city name resolved offline by the gazetteer ('Berlin', 'sf', 'Paris, US');
+    results for a name include the ``place`` it resolved to and how it matched.
+
+    The batch tools take a list of locations and fetch them with as few
+    requests as possible: Open-Meteo accepts comma-separated coordinate
+    lists and returns every location in one response.
+
+    Upstream payloads are cached per grid cell (``weather_grid`` degrees)
+    until Open-Meteo publishes newer data, so nearby coordinates share one
+    fetch; ``get_weather_cache_stats`` reports the hit rate.
     """
 
+    def __init__(self, settings: Settings | None = None):
+        super().__init__(settings)
+        self.grid_cache: Optional[WeatherGridCache] = None
+        if self.settings.weather_grid > 0:
+            self.grid_cache = WeatherGridCache(
+                self.settings.weather_grid,
+                max_entries=self.settings.weather_cache_max_entries,
+                forecast_update_interval=self.settings.weather_forecast_update_interval,
+            )
+            get_memory_monitor().watch("weather.grid_cache", lambda: len(self.grid_cache))
+
     def list_tools(self) -> list[Tool]:
         return [
             Tool(
@@ -57,7 +124,7 @@ class WeatherAgent(MCPAgent):
                     "properties": {
                         "location": {
                             "type": "string",
-                            "description": "Coordinates in 'lat,lon' format (e.g. '52.52,13.41')",
+                            "description": "Coordinates in 'lat,lon' format (e.g. '52.52,13.41') or a city name",
                         },
                     },
                     "required": ["location"],
@@ -71,16 +138,123 @@ class WeatherAgent(MCPAgent):
                     "properties": {
                         "location": {
                             "type": "string",
-                            "description": "Coordinates in 'lat,lon' format (e.g. '52.52,13.41')",
+                            "description": "Coordinates in 'lat,lon' format (e.g. '52.52,13.41') or a city name",
                         },
                         "days": {
                             "type": "integer",
-                            "description": "Number of days to forecast (1-7 recommended for daily).",
+                            "description": "Number of days to forecast (1-16).",
                         },
+                        **FORECAST_VARIABLE_PROPERTIES,
                     },
                     "required": ["location"],
                 },
             ),
+            Tool(
+                name=WeatherTools.GET_CURRENT_WEATHER_BATCH.value,
+                description="Get current weather for many locations (lat,lon) in one call.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "locations": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Coordinates in 'lat,lon' format or city names "
+                                           "(e.g. ['52.52,13.41', 'Paris'])",
+                        },
+                    },
+                    "required": ["locations"],
+                },
+            ),
+            Tool(
+                name=WeatherTools.FORECAST_BATCH.value,
+                description="Get forecasts for many locations (lat,lon) in one call.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "locations": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Coordinates in 'lat,lon' format or city names "
+                                           "(e.g. ['52.52,13.41', 'Paris'])",
+                        },
+                        "days": {
+                            "type": "integer",
+                            "description": "Number of days to forecast (1-16).",
+                        },
+                        **FORECAST_VARIABLE_PROPERTIES,
+                    },
+                    "required": ["locations"],
+                },
+            ),
+            Tool(
+                name=WeatherTools.HOURLY_FORECAST.value,
+                description="Get an hourly forecast for a location (lat,lon) with daily min/max/mean, "
+                            "rolling-window means and threshold crossings (e.g. first hour of rain).",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "location": {
+                            "type": "string",
+                            "description": "Coordinates in 'lat,lon' format (e.g. '52.52,13.41') or a city name",
+                        },
+                        "days": {
+                            "type": "integer",
+                            "description": "Number of days to forecast (1-16).",
+                        },
+                        "variables": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Open-Meteo hourly variables "
+                                           f"(default {', '.join(HOURLY_FORECAST_VARIABLES)})",
+                        },
+                        "window": {
+                            "type": "integer",
+                            "description": "Rolling window in hours for the rolling means (default 3, 0 disables).",
+                        },
+                        "thresholds": {
+                            "type": "object",
+                            "additionalProperties": {"type": "number"},
+                            "description": "Variable -> value; reports when each variable first reaches "
+                                           "its value (default {'precipitation': 0.1}).",
+                        },
+                        "output": {
+                            "type": "string",
+                            "enum": list(HOURLY_OUTPUTS),
+                            "description": "'summary' (default): per-day aggregates; 'columnar': the hourly "
+                                           "columns; 'both'.",
+                        },
+                    },
+                    "required": ["location"],
+                },
+            ),
+            Tool(
+                name=WeatherTools.FIND_PLACES.value,
+                description="Look up cities offline: coordinates for a name or alias (exact, prefix or "
+                            "fuzzy match), or the nearest cities to a 'lat,lon' location.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "name": {
+                            "type": "string",
+                            "description": "City name, alias or prefix; ', CC' restricts to a country "
+                                           "(e.g. 'sf', 'San Fr', 'Paris, US')",
+                        },
+                        "location": {
+                            "type": "string",
+                            "description": "Coordinates in 'lat,lon' format, to find the nearest cities",
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": f"Maximum number of places (default 5, at most {MAX_PLACES}).",
+                        },
+                    },
+                },
+            ),
+            Tool(
+                name=WeatherTools.GET_CACHE_STATS.value,
+                description="Get hit rate and grid statistics of the weather cache.",
+                inputSchema={"type": "object", "properties": {}},
+            ),
         ]
 
     def call_tool(
@@ -92,6 +266,16 @@ class WeatherAgent(MCPAgent):
             return self._handle_get_current_weather(arguments)
         elif name == WeatherTools.FORECAST.value:
             return self._handle_forecast(arguments)
+        elif name == WeatherTools.GET_CURRENT_WEATHER_BATCH.value:
+            return self._handle_get_current_weather_batch(arguments)
+        elif name == WeatherTools.FORECAST_BATCH.value:
+            return self._handle_forecast_batch(arguments)
+        elif name == WeatherTools.GET_CACHE_STATS.value:
+            return self._handle_get_cache_stats()
+        elif name == WeatherTools.HOURLY_FORECAST.value:
+            return self._handle_hourly_forecast(arguments)
+        elif name == WeatherTools.FIND_PLACES.value:
+            return self._handle_find_places(arguments)
         else:
             raise ValueError(f"Unknown tool: {name}")
 
@@ -99,47 +283,163 @@ class WeatherAgent(MCPAgent):
         location = arguments.get("location", "")
         result = self._get_current_weather(location)
         return [
-            TextContent(type="text", text=json.dumps(result.model_dump(), indent=2))
+            TextContent(type="text", text=json.dumps(result.model_dump(exclude_none=True), indent=2))
         ]
 
     def _handle_forecast(self, arguments: dict) -> Sequence[TextContent]:
         location = arguments.get("location", "")
         days = arguments.get("days", 3)
-        result = self._get_forecast(location, days)
+        daily = self._parse_variables(arguments.get("daily"), "daily")
+        hourly = self._parse_variables(arguments.get("hourly"), "hourly")
+        result = self._get_forecast(location, days, daily, hourly)
         return [
-            TextContent(type="text", text=json.dumps(result.model_dump(), indent=2))
+            TextContent(type="text", text=json.dumps(result.model_dump(exclude_none=True), indent=2))
         ]
 
+    def _handle_get_current_weather_batch(self, arguments: dict) -> Sequence[TextContent]:
+        located = self._parse_locations(arguments.get("locations"))
+        result = self._get_current_weather_batch([(lat, lon) for lat, lon, _ in located])
+        for item, (_, _, place) in zip(result.results, located):
+            item.place = place
+        return [
+            TextContent(type="text", text=json.dumps(result.model_dump(exclude_none=True), indent=2))
+        ]
+
+    def _handle_forecast_batch(self, arguments: dict) -> Sequence[TextContent]:
+        located = self._parse_locations(arguments.get("locations"))
+        days = arguments.get("days", 3)
+        daily = self._parse_variables(arguments.get("daily"), "daily")
+        hourly = self._parse_variables(arguments.get("hourly"), "hourly")
+        result = self._get_forecast_batch([(lat, lon) for lat, lon, _ in located], days, daily, hourly)
+        for item, (_, _, place) in zip(result.results, located):
+            item.place = place
+        return [
+            TextContent(type="text", text=json.dumps(result.model_dump(exclude_none=True), indent=2))
+        ]
+
+    def _handle_hourly_forecast(self, arguments: dict) -> Sequence[TextContent]:
+        location = arguments.get("location", "")
+        days = arguments.get("days", 3)
+        variables = self._parse_variables(arguments.get("variables"), "hourly") or HOURLY_FORECAST_VARIABLES
+        window = int(arguments.get("window", 3))
+        thresholds = arguments.get("thresholds")
+        if thresholds is None:
+            thresholds = {name: value for name, value in DEFAULT_HOURLY_THRESHOLDS.items() if name in variables}
+        if not isinstance(thresholds, dict):
+            raise ValueError("'thresholds' must map variable names to numbers.")
+        output = arguments.get("output", "summary")
+        if output not in HOURLY_OUTPUTS:
+            raise ValueError(f"Invalid output: {output}. Expected one of: {', '.join(HOURLY_OUTPUTS)}")
+        result = self._get_hourly_forecast(location, days, variables, window, thresholds, output)
+        return [
+            TextContent(type="text", text=json.dumps(result.model_dump(exclude_none=True), indent=2))
+        ]
+
+    def _handle_find_places(self, arguments: dict) -> Sequence[TextContent]:
+        limit = min(max(int(arguments.get("limit", 5)), 1), MAX_PLACES)
+        gazetteer = get_gazetteer()
+        if arguments.get("name"):
+            query = str(arguments["name"])
+            places = gazetteer.lookup(query, limit)
+        elif arguments.get("location"):
+            query = str(arguments["location"])
+            places = gazetteer.nearest(*self._parse_lat_lon(query), limit=limit)
+        else:
+            raise ValueError("Either 'name' or 'location' is required.")
+        result = PlaceLookupResult(query=query, places=places)
+        return [
+            TextContent(type="text", text=json.dumps(result.model_dump(exclude_none=True), indent=2))
+        ]
+
+    def _handle_get_cache_stats(self) -> Sequence[TextContent]:
+        if self.grid_cache is None:
+            raise ValueError("The weather grid cache is disabled (weather grid = 0).")
+        return [
+            TextContent(type="text", text=json.dumps(self.grid_cache.stats().model_dump(), indent=2))
+        ]
+
+    def _parse_locations(self, locations) -> list[tuple[float, float, Optional[GazetteerPlace]]]:
+        """
+        Validates a batch tool's 'locations' list and locates every entry.
+        """
+        if not isinstance(locations, list) or not locations:
+            raise ValueError("'locations' must be a non-empty list of 'lat,lon' strings or city names.")
+        limit = self.settings.weather_batch_max_locations
+        if len(locations) > limit:
+            raise ValueError(f"Too many locations: {len(locations)} (limit {limit}).")
+        return [self._locate(str(location)) for location in locations]
+
+    def _parse_variables(self, variables, block: str) -> Optional[list[str]]:
+        """
+        Validates a list of Open-Meteo variable names; None if not given.
+        """
+        if variables is None:
+            return None
+        if not isinstance(variables, list) or not variables:
+            raise ValueError(f"'{block}' must be a non-empty list of variable names.")
+        if len(variables) > MAX_FORECAST_VARIABLES:
+            raise ValueError(f"Too many {block} variables: {len(variables)} (limit {MAX_FORECAST_VARIABLES}).")
+        for name in variables:
+            if not isinstance(name, str) or not VARIABLE_NAME.match(name):
+                raise ValueError(f"Invalid {block} variable: {name!r}")
+        return list(dict.fromkeys(variables))
+
     def _parse_lat_lon(self, location: str) -> tuple[float, float]:
         """
-        Expects a string like '52.52,13.41'.
+        Expects a string like '52.52,13.41', or a city name the gazetteer
+        knows ('Berlin', 'sf', 'Paris, US').
         Returns (52.52, 13.41) as floats.
         """
+        lat, lon, _ = self._locate(location)
+        return lat, lon
+
+    def _locate(self, location: str) -> tuple[float, float, Optional[GazetteerPlace]]:
+        """
+        Like ``_parse_lat_lon``, plus the place a city name resolved to, so
+        the result can show which place was picked and whether the name
+        matched exactly or only by prefix or spelling (None for coordinates).
+        """
         try:
             lat_str, lon_str = location.split(",")
-            return float(lat_str.strip()), float(lon_str.strip())
+            return float(lat_str.strip()), float(lon_str.strip()), None
         except Exception:
+            pass
+        place = get_gazetteer().resolve(location)
+        if place is None:
             raise ValueError(
-                "Location must be in 'lat,lon' format (e.g. '52.52,13.41')."
+                "Location must be in 'lat,lon' format (e.g. '52.52,13.41') or a known city name."
             )
+        return place.latitude, place.longitude, place
 
     def _get_current_weather(self, location: str) -> CurrentWeatherResult:
         """
         Calls the Open-Meteo API for current weather.
         """
-        lat, lon = self._parse_lat_lon(location)
-
-        url = "https://api.open-meteo.com/v1/forecast"
+        lat, lon, place = self._locate(location)
         params = {
-            "latitude": lat,
-            "longitude": lon,
             "current_weather": "true",
             "timezone": "auto"  # Let the API pick best timezone
         }
+        (data,), _ = self._fetch_locations([(lat, lon)], params, self._current_expiry)
+        result = self._current_from_payload(lat, lon, data)
+        result.place = place
+        return result
 
-        resp = requests.get(url, params=params)
-        data = resp.json()
+    def _get_current_weather_batch(self, coords: list[tuple[float, float]]) -> CurrentWeatherBatchResult:
+        """
+        Current weather for every location, from Open-Meteo list queries.
+        """
+        params = {"current_weather": "true", "timezone": "auto"}
+        payloads, requests = self._fetch_locations(coords, params, self._current_expiry)
+        return CurrentWeatherBatchResult(
+            results=[self._current_from_payload(lat, lon, data) for (lat, lon), data in zip(coords, payloads)],
+            upstream_requests=requests,
+        )
 
+    def _current_from_payload(self, lat: float, lon: float, data: dict) -> CurrentWeatherResult:
+        """
+        Builds the result from one location's Open-Meteo response.
+        """
         # Example structure:
         # {
         #   "latitude": 52.52,
@@ -170,30 +470,86 @@ class WeatherAgent(MCPAgent):
             description=description
         )
 
-    def _get_forecast(self, location: str, days: int) -> WeatherForecastResult:
+    def _get_forecast(
+        self,
+        location: str,
+        days: int,
+        daily: Optional[list[str]] = None,
+        hourly: Optional[list[str]] = None,
+    ) -> WeatherForecastResult:
         """
-        Calls the Open-Meteo API for daily forecast up to 7 (or more) days.
+        Calls the Open-Meteo API for a forecast of up to 16 days.
         """
-        lat, lon = self._parse_lat_lon(location)
+        lat, lon, place = self._locate(location)
+        days = self._clamp_days(days)
+        params = self._forecast_params(days, daily, hourly)
+        (data,), _ = self._fetch_locations([(lat, lon)], params, self._forecast_expiry)
+        result = self._forecast_from_payload(lat, lon, data, days, daily, hourly)
+        result.place = place
+        return result
 
-        # We'll fetch daily weathercode, max temp, min temp
-        # Open-Meteo by default can provide up to 7 or 14 days.
-        # We'll just request up to 7 days to be safe (or you can request 16).
-        if days < 1:
-            days = 1
-        elif days > 7:
-            days = 7  # or 16 if you prefer
+    def _get_forecast_batch(
+        self,
+        coords: list[tuple[float, float]],
+        days: int,
+        daily: Optional[list[str]] = None,
+        hourly: Optional[list[str]] = None,
+    ) -> WeatherForecastBatchResult:
+        """
+        Forecast for every location, from Open-Meteo list queries.
+        """
+        days = self._clamp_days(days)
+        params = self._forecast_params(days, daily, hourly)
+        payloads, requests = self._fetch_locations(coords, params, self._forecast_expiry)
+        return WeatherForecastBatchResult(
+            results=[
+                self._forecast_from_payload(lat, lon, data, days, daily, hourly)
+                for (lat, lon), data in zip(coords, payloads)
+            ],
+            upstream_requests=requests,
+        )
 
-        url = "https://api.open-meteo.com/v1/forecast"
-        params = {
-            "latitude": lat,
-            "longitude": lon,
-            "daily": "weathercode,temperature_2m_max,temperature_2m_min",
-            "timezone": "auto"
-        }
+    def _clamp_days(self, days: int) -> int:
+        # Only the requested days are fetched (forecast_days), so the full
+        # range Open-Meteo offers is available.
+        return min(max(int(days), 1), MAX_FORECAST_DAYS)
+
+    def _forecast_params(self, days: int, daily: Optional[list[str]], hourly: Optional[list[str]]) -> dict:
+        """
+        Query parameters asking Open-Meteo for exactly ``days`` days of the
+        selected variables (or the default daily set).
+        """
+        params = {"forecast_days": days, "timezone": "auto"}
+        if daily is None and hourly is None:
+            params["daily"] = DAILY_FORECAST_VARIABLES
+        if daily:
+            params["daily"] = ",".join(daily)
+        if hourly:
+            params["hourly"] = ",".join(hourly)
+        return params
 
-        resp = requests.get(url, params=params)
-        data = resp.json()
+    def _forecast_from_payload(
+        self,
+        lat: float,
+        lon: float,
+        data: dict,
+        days: int,
+        daily: Optional[list[str]] = None,
+        hourly: Optional[list[str]] = None,
+    ) -> WeatherForecastResult:
+        """
+        Builds the result from one location's Open-Meteo response.
+        """
+        if daily is not None or hourly is not None:
+            # Open-Meteo's blocks are already columnar: hand the selected
+            # columns through instead of building a dict per row.
+            units = {}
+            columns = {}
+            for block, names, rows in (("daily", daily, days), ("hourly", hourly, days * 24)):
+                if names:
+                    columns[block] = self._decode_columns(data, block, names, rows)
+                    units[block] = data.get(f"{block}_units", {})
+            return WeatherForecastResult(location=f"{lat},{lon}", units=units, **columns)
 
         if "daily" not in data:
             raise ValueError("No daily forecast data found for the given location.")
@@ -207,27 +563,178 @@ class WeatherAgent(MCPAgent):
         #   "temperature_2m_max": [17.0, 19.5, ...],
         #   "temperature_2m_min": [8.1, 10.2, ...]
         # }
-        time_list = daily_data.get("time", [])
-        code_list = daily_data.get("weathercode", [])
-        max_list = daily_data.get("temperature_2m_max", [])
-        min_list = daily_data.get("temperature_2m_min", [])
-
-        forecast_items = []
-        for i in range(min(days, len(time_list))):
-            weathercode = code_list[i] if i < len(code_list) else 0
-            desc = WEATHER_CODE_MAP.get(weathercode, "Unknown weather conditions")
-            high = max_list[i] if i < len(max_list) else 0.0
-            low = min_list[i] if i < len(min_list) else 0.0
-
-            forecast_items.append({
+        time_list = daily_data.get("time", [])[:days]
+        rows = len(time_list)
+        code_list = self._column(daily_data, "weathercode", rows, 0)
+        max_list = self._column(daily_data, "temperature_2m_max", rows, 0.0)
+        min_list = self._column(daily_data, "temperature_2m_min", rows, 0.0)
+
+        forecast_items = [
+            {
                 "day": i + 1,
-                "date": time_list[i] if i < len(time_list) else "Unknown",
-                "description": desc,
+                "date": date,
+                "description": WEATHER_CODE_MAP.get(weathercode, "Unknown weather conditions"),
                 "high": high,
                 "low": low
-            })
+            }
+            for i, (date, weathercode, high, low) in enumerate(zip(time_list, code_list, max_list, min_list))
+        ]
 
         return WeatherForecastResult(
             location=f"{lat},{lon}",
             forecast=forecast_items
         )
+
+    def _get_hourly_forecast(
+        self,
+        location: str,
+        days: int,
+        variables: list[str],
+        window: int,
+        thresholds: dict,
+        output: str,
+    ) -> HourlyForecastResult:
+        """
+        Fetches hourly columns from Open-Meteo and aggregates them column-wise.
+        """
+        lat, lon, place = self._locate(location)
+        days = self._clamp_days(days)
+        unknown = [name for name in thresholds if name not in variables]
+        if unknown:
+            raise ValueError(f"Thresholds for variables not requested: {', '.join(unknown)}")
+        params = {"hourly": ",".join(variables), "forecast_days": days, "timezone": "auto"}
+        (data,), _ = self._fetch_locations([(lat, lon)], params, self._forecast_expiry)
+
+        raw = self._decode_columns(data, "hourly", variables, days * 24)
+        times = raw.pop("time")
+        columns = {name: agg.to_column(values) for name, values in raw.items()}
+        window = window if 0 < window <= len(times) else 0
+        rolling = {name: agg.rolling_mean(column, window) for name, column in columns.items()} if window else {}
+
+        result = HourlyForecastResult(
+            location=f"{lat},{lon}",
+            hours=len(times),
+            window_hours=window,
+            units=data.get("hourly_units", {}),
+            place=place,
+        )
+
+        if output in ("summary", "both"):
+            result.dates, bounds = agg.day_bounds(times)
+            result.summary = {}
+            for name, column in columns.items():
+                mins, maxs, means = agg.daily_stats(column, bounds)
+                summary = HourlyVariableSummary(
+                    daily_min=agg.to_json_values(mins),
+                    daily_max=agg.to_json_values(maxs),
+                    daily_mean=agg.to_json_values(means),
+                )
+                if window:
+                    index, value = agg.peak(rolling[name])
+                    if index is not None:
+                        summary.peak_window_mean = round(value, 2)
+                        summary.peak_window_start = times[index]
+                result.summary[name] = summary
+
+        if output in ("columnar", "both"):
+            result.columns = {"time": times}
+            for name, column in columns.items():
+                result.columns[name] = agg.to_json_values(column)
+            for name, column in rolling.items():
+                result.columns[f"{name}_mean_{window}h"] = agg.to_json_values(column)
+
+        for name, threshold in thresholds.items():
+            hours, crossings = agg.threshold_crossings(columns[name], float(threshold))
+            result.thresholds.append(HourlyThresholdEvent(
+                variable=name,
+                threshold=float(threshold),
+                first_time=times[crossings[0]] if crossings else None,
+                hours_at_or_above=hours,
+                crossings=[times[index] for index in crossings],
+            ))
+
+        return result
+
+    def _decode_columns(self, data: dict, block: str, names: list[str], rows: int) -> dict[str, list]:
+        """
+        The "time" column and the ``names`` columns of an Open-Meteo block,
+        at most ``rows`` long.
+        """
+        columns = data.get(block)
+        if not columns:
+            raise ValueError(f"No {block} forecast data found for the given location.")
+        missing = [name for name in names if name not in columns]
+        if missing:
+            raise ValueError(f"Open-Meteo returned no {block} data for: {', '.join(missing)}")
+        return {name: columns[name][:rows] for name in ("time", *names)}
+
+    def _column(self, block: dict, name: str, rows: int, default) -> list:
+        # A missing or short column is padded with ``default``.
+        values = block.get(name) or []
+        return values[:rows] + [default] * (rows - len(values))
+
+    def _current_expiry(self, payload: dict) -> float:
+        return self.grid_cache.current_expiry(payload)
+
+    def _forecast_expiry(self, payload: dict) -> float:
+        return self.grid_cache.forecast_expiry()
+
+    def _fetch_locations(
+        self,
+        coords: list[tuple[float, float]],
+        params: dict,
+        expiry: Callable[[dict], float],
+    ) -> tuple[list[dict], int]:
+        """
+        Fetches ``params`` for every (lat, lon) in ``coords`` with Open-Meteo
+        list queries of up to ``weather_batch_size`` locations each.
+        Returns one payload per entry of ``coords`` (in order) and the number
+        of upstream requests made.
+
+        Coordinates in the same grid cell (or repeated, without the grid
+        cache) are fetched once; cached cells are not fetched at all, and
+        fetched ones are cached until ``expiry(payload)``.
+        """
+        url = f"{self.settings.open_meteo_url}/forecast"
+        cache = self.grid_cache
+        query = canonical_arguments(params)
+        keys = [cache.key(query, lat, lon) if cache is not None else (lat, lon) for lat, lon in coords]
+
+        payloads: dict = {}
+        missing: dict = {}
+        for key, coord in zip(keys, coords):
+            if key in payloads or key in missing:
+                continue
+            cached = cache.get(key) if cache is not None else None
+            if cached is not None:
+                payloads[key] = cached
+            else:
+                missing[key] = coord
+
+        pending = list(missing.items())
+        size = max(self.settings.weather_batch_size, 1)
+        requests = 0
+        for start in range(0, len(pending), size):
+            chunk = pending[start:start + size]
+            resp = get_http_client().get(url, params={
+                **params,
+                "latitude": ",".join(str(lat) for _, (lat, _) in chunk),
+                "longitude": ",".join(str(lon) for _, (_, lon) in chunk),
+            })
+            requests += 1
+            data = resp.json()
+
+            # A single location comes back as an object, several as an array
+            # in request order; errors as {"error": true, "reason": "..."}.
+            if isinstance(data, dict):
+                if data.get("error"):
+                    raise ValueError(f"Open-Meteo error: {data.get('reason', 'unknown error')}")
+                data = [data]
+            if len(data) != len(chunk):
+                raise ValueError(f"Open-Meteo returned {len(data)} locations for {len(chunk)} requested.")
+            for (key, _), payload in zip(chunk, data):
+                payloads[key] = payload
+                if cache is not None:
+                    cache.put(key, payload, expiry(payload))
+
+        return [payloads[key] for key in keys], requests
@@ -0,0 +1,131 @@
+"""
+Column-wise aggregation of Open-Meteo hourly forecasts.
+
+Each variable is held as one ``array('d')`` (missing values as NaN), so a
+16-day forecast (384 hours) never turns into per-hour dicts. Aggregates are
+taken with builtins that run over a whole slice in C (``min``, ``max``,
+``math.fsum``, ``map``, ``accumulate``); the interpreter loops per day or
+per result, not per hour, except on the NaN fallback paths.
+"""
+
+import math
+import operator
+from array import array
+from itertools import accumulate, compress, repeat
+from typing import Optional, Sequence
+
+NAN = float("nan")
+
+
+def to_column(values: Sequence[Optional[float]]) -> array:
+    """
+    Open-Meteo values (None where missing) as a float column, NaN for missing.
+    """
+    try:
+        return array("d", values)
+    except TypeError:  # some values are None
+        return array("d", (NAN if value is None else value for value in values))
+
+
+def to_json_values(column: Sequence[float], digits: int = 2) -> list[Optional[float]]:
+    """
+    The column rounded for output, NaN as None (JSON has no NaN).
+    """
+    return [None if math.isnan(value) else round(value, digits) for value in column]
+
+
+def day_bounds(times: Sequence[str]) -> tuple[list[str], list[tuple[int, int]]]:
+    """
+    Dates of an hourly "time" column ("YYYY-MM-DDTHH:MM") and the
+    [start, end) index range of each.
+    """
+    dates: list[str] = []
+    starts: list[int] = []
+    for index, stamp in enumerate(times):
+        date = stamp[:10]
+        if not dates or dates[-1] != date:
+            dates.append(date)
+            starts.append(index)
+    ends = starts[1:] + [len(times)]
+    return dates, list(zip(starts, ends))
+
+
+def has_nan(column: Sequence[float]) -> bool:
+    """
+    Whether any value of the column is missing (NaN).
+    """
+    return any(map(math.isnan, column))
+
+
+def daily_stats(column: array, bounds: Sequence[tuple[int, int]]) -> tuple[array, array, array]:
+    """
+    Minimum, maximum and mean of each day's slice, ignoring NaN (NaN for a
+    day without values).
+    """
+    mins, maxs, means = array("d"), array("d"), array("d")
+    for start, end in bounds:
+        values = column[start:end]
+        total = math.fsum(values)
+        if math.isnan(total):
+            # min/max are unreliable with NaN in the slice: drop it first.
+            values = [value for value in values if not math.isnan(value)]
+            total = math.fsum(values)
+        if values:
+            mins.append(min(values))
+            maxs.append(max(values))
+            means.append(total / len(values))
+        else:
+            mins.append(NAN)
+            maxs.append(NAN)
+            means.append(NAN)
+    return mins, maxs, means
+
+
+def rolling_mean(column: array, window: int) -> array:
+    """
+    Mean of each ``window``-hour span, aligned to the span's first hour
+    (so the result is ``window - 1`` shorter than the column); NaN values
+    are skipped. From prefix sums, O(n) whatever the window.
+    """
+    n = len(column)
+    if window < 1 or window > n:
+        return array("d")
+    if not has_nan(column):
+        totals = array("d", accumulate(column, initial=0.0))
+        sums = map(operator.sub, totals[window:], totals[:n - window + 1])
+        return array("d", map(operator.truediv, sums, repeat(float(window))))
+
+    totals = array("d", accumulate((0.0 if math.isnan(value) else value for value in column), initial=0.0))
+    counts = array("d", accumulate((0.0 if math.isnan(value) else 1.0 for value in column), initial=0.0))
+    result = array("d")
+    for start in range(n - window + 1):
+        count = counts[start + window] - counts[start]
+        result.append((totals[start + window] - totals[start]) / count if count else NAN)
+    return result
+
+
+def peak(column: array) -> tuple[Optional[int], float]:
+    """
+    Index and value of the column's maximum (None, NaN if all NaN).
+    """
+    if not column:
+        return None, NAN
+    if not has_nan(column):
+        best = max(column)
+        return column.index(best), best
+    best_index, best = None, NAN
+    for index, value in enumerate(column):
+        if not math.isnan(value) and (best_index is None or value > best):
+            best_index, best = index, value
+    return best_index, best
+
+
+def threshold_crossings(column: array, threshold: float) -> tuple[int, list[int]]:
+    """
+    Hours at or above ``threshold``, and the indices where the column
+    reaches it from below (index 0 counts if it starts there).
+    """
+    # NaN compares false, so missing hours never count as above.
+    above = list(map(float(threshold).__le__, column))
+    crossings = list(compress(range(len(above)), map(operator.gt, above, [False, *above])))
+    return sum(above), crossings
@@ -0,0 +1,132 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from mcpagentai.defs import WeatherCacheStats, WeatherGridCell
+
+# Open-Meteo refreshes current conditions every 15 minutes.
+CURRENT_WEATHER_INTERVAL = 900
+# Expiry never falls closer than this, so data published late (or a skewed
+# upstream clock) does not turn every request into a miss.
+MIN_TTL = 60.0
+
+# (query, lat cell, lon cell)
+GridKey = tuple[str, int, int]
+
+
+class _Entry:
+    __slots__ = ("payload", "expires_at", "hits")
+
+    def __init__(self, payload: dict, expires_at: float):
+        self.payload = payload
+        self.expires_at = expires_at
+        self.hits = 0
+
+
+class WeatherGridCache:
+    """
+    Cache of Open-Meteo per-location payloads keyed on a lat/lon grid cell,
+    so nearby coordinates (37.7749,-122.4194 and 37.775,-122.419) share one
+    upstream fetch.
+
+    Entries expire when the upstream data does: current conditions at the
+    end of their ``current_weather.time`` interval, forecasts at the next
+    model update (``forecast_update_interval``, aligned to UTC). Bounded to
+    ``max_entries`` with LRU eviction; safe to use from several threads.
+    """
+
+    def __init__(self, grid: float, max_entries: int = 4096, forecast_update_interval: float = 3600.0):
+        if grid <= 0:
+            raise ValueError("grid must be > 0 degrees.")
+        self.grid = grid
+        self.max_entries = max(max_entries, 1)
+        self.forecast_update_interval = max(forecast_update_interval, MIN_TTL)
+        self._entries: OrderedDict[GridKey, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+
+    def key(self, query: str, lat: float, lon: float) -> GridKey:
+        return query, round(lat / self.grid), round(lon / self.grid)
+
+    def get(self, key: GridKey) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now >= entry.expires_at:
+                del self._entries[key]
+                self._expired += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            self._hits += 1
+            return entry.payload
+
+    def put(self, key: GridKey, payload: dict, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = _Entry(payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def current_expiry(self, payload: dict) -> float:
+        """
+        When a current-weather payload is superseded: its observation time
+        (local to the location) plus the update interval.
+        """
+        now = time.time()
+        current = payload.get("current_weather") or {}
+        interval = current.get("interval") or CURRENT_WEATHER_INTERVAL
+        try:
+            observed = datetime.fromisoformat(current["time"]).replace(tzinfo=timezone.utc)
+        except (KeyError, TypeError, ValueError):
+            return now + interval
+        observed -= timedelta(seconds=payload.get("utc_offset_seconds") or 0)
+        expires_at = observed.timestamp() + interval
+        return min(max(expires_at, now + MIN_TTL), now + interval)
+
+    def forecast_expiry(self) -> float:
+        """
+        Start of the next forecast update period, but at least ``MIN_TTL`` away.
+        """
+        now = time.time()
+        interval = self.forecast_update_interval
+        return max((math.floor(now / interval) + 1) * interval, now + MIN_TTL)
+
+    def stats(self, top: int = 10) -> WeatherCacheStats:
+        with self._lock:
+            lookups = self._hits + self._misses
+            cells = {(lat, lon) for _, lat, lon in self._entries}
+            hottest = sorted(self._entries.items(), key=lambda item: item[1].hits, reverse=True)[:top]
+            return WeatherCacheStats(
+                grid_degrees=self.grid,
+                entries=len(self._entries),
+                cells=len(cells),
+                hits=self._hits,
+                misses=self._misses,
+                expired=self._expired,
+                evictions=self._evictions,
+                hit_rate=round(self._hits / lookups, 4) if lookups else 0.0,
+                hottest_cells=[
+                    WeatherGridCell(
+                        query=query,
+                        latitude=round(lat * self.grid, 6),
+                        longitude=round(lon * self.grid, 6),
+                        hits=entry.hits,
+                        expires_in_seconds=round(max(entry.expires_at - time.time(), 0.0), 1),
+                    )
+                    for (query, lat, lon), entry in hottest
+                ],
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)